@@ -0,0 +1,145 @@
+"""Benchmarks for the operators of handle_manipulator.py on synthetic actions.
+
+Runs headless from the repository root:
+
+    blender --background --factory-startup --python benchmarks/bench_operators.py -- \\
+        --bones 500 --channels 10 --keys 2000 --json results.json
+
+Without Blender the same runs on the bpy stand-in in fake_bpy.py:
+
+    python benchmarks/bench_operators.py --bones 500 --channels 10 --keys 2000
+
+Its RNA writes are plain numpy copies, so those numbers show the cost of
+the addon's own Python and numpy work, not Blender's.
+
+For every drag operator a session is scripted and replayed with
+replay.py: invoke, ``--ticks`` mouse moves to the right and a confirming
+LEFTMOUSE, every modal step measured on its own. The keyframe operators
+without a modal part (selection stepping, set to cursor) are timed per
+execute().
+
+Timings come from a pass without tracemalloc; a second pass measures the
+peak of the Python and numpy allocations of a whole session. Memory
+allocated by Blender itself for RNA writes is not included.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import BenchContext, build_action, operator_proxy  # noqa: E402
+from replay import replay, scripted_drag  # noqa: E402
+
+import handle_manipulator  # noqa: E402
+
+EXECUTE_OPERATORS = [
+    handle_manipulator.GRAPH_OT_select_next_keys,
+    handle_manipulator.GRAPH_OT_select_previous_keys,
+    handle_manipulator.GRAPH_OT_add_next_keys,
+    handle_manipulator.GRAPH_OT_subtract_keys,
+    handle_manipulator.OBJECT_OT_move_keys_to_cursor,
+]
+
+
+def drag_operators():
+    """Alle Operator-Klassen, die auf der Modal-Transform-Engine laufen."""
+    return [value for value in vars(handle_manipulator).values()
+            if isinstance(value, type) and issubclass(value, handle_manipulator.KeyframeTransformOperator)
+            and hasattr(value, 'bl_idname')]
+
+
+def run_drag_session(operator_class, context, ticks, step=3):
+    """Invoke, ticks mouse moves and confirm; returns (invoke, [tick, ...], confirm) in seconds."""
+    result = replay(operator_class, context, scripted_drag(ticks, step, start=(context.window.width // 2, 500)))
+    if 'FINISHED' not in result.result:
+        raise RuntimeError(f"{operator_class.__name__} did not finish: {result.result}")
+    return result.invoke, result.ticks, result.finish
+
+
+def run_execute(operator_class, context):
+    operator = operator_proxy(operator_class)()
+    start = time.perf_counter()
+    operator.execute(context)
+    return time.perf_counter() - start
+
+
+def peak_memory(function, *args):
+    """Spitze der Python/numpy-Allokationen während function(*args), in Bytes."""
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _ms(seconds):
+    return round(seconds * 1000.0, 3)
+
+
+def benchmark(context, ticks, repeat):
+    results = {}
+    for operator_class in drag_operators():
+        sessions = [run_drag_session(operator_class, context, ticks) for _ in range(repeat)]
+        tick_times = [tick for _, session_ticks, _ in sessions for tick in session_ticks]
+        results[operator_class.__name__] = {
+            'invoke_ms': _ms(statistics.median(invoke for invoke, _, _ in sessions)),
+            'tick_ms': _ms(statistics.median(tick_times)),
+            'tick_max_ms': _ms(max(tick_times)),
+            'confirm_ms': _ms(statistics.median(confirm for _, _, confirm in sessions)),
+            'peak_mb': round(peak_memory(run_drag_session, operator_class, context, ticks) / 2 ** 20, 2),
+        }
+
+    for operator_class in EXECUTE_OPERATORS:
+        results[operator_class.__name__] = {
+            'execute_ms': _ms(statistics.median(run_execute(operator_class, context) for _ in range(repeat))),
+            'peak_mb': round(peak_memory(run_execute, operator_class, context) / 2 ** 20, 2),
+        }
+    return results
+
+
+def print_table(results):
+    columns = ['invoke_ms', 'tick_ms', 'tick_max_ms', 'confirm_ms', 'execute_ms', 'peak_mb']
+    print(f"{'operator':<48}" + "".join(f"{column:>13}" for column in columns))
+    for name, values in results.items():
+        print(f"{name:<48}" + "".join(f"{values[column]:>13}" if column in values else f"{'-':>13}"
+                                      for column in columns))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bones', type=int, default=50)
+    parser.add_argument('--channels', type=int, default=10)
+    parser.add_argument('--keys', type=int, default=2000, help="keys per F-Curve")
+    parser.add_argument('--selected', type=int, default=200, help="selected keys per F-Curve")
+    parser.add_argument('--ticks', type=int, default=30, help="mouse moves per drag session")
+    parser.add_argument('--repeat', type=int, default=3, help="sessions per operator")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    obj = build_action(bones=args.bones, channels=args.channels, keys=args.keys,
+                       selected=args.selected, seed=args.seed)
+    print(f"{args.bones} bones x {args.channels} channels x {args.keys} keys "
+          f"built in {time.perf_counter() - start:.2f} s")
+
+    results = benchmark(BenchContext(obj), args.ticks, args.repeat)
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'config': vars(args), 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    # Unter Blender stehen die eigenen Argumente hinter "--"
+    main(sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:])
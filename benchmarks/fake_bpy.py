@@ -0,0 +1,677 @@
+"""In-process stand-in for the part of bpy that handle_manipulator.py uses.
+
+With it, the addon imports and its operators run in plain Python, without
+a Blender install:
+
+    import fake_bpy
+    fake_bpy.install()
+    import handle_manipulator
+
+The tests in tests/ drive the drag operators on it (python -m pytest tests).
+
+Covered are the data the operators work on, and what module import and
+register() need:
+
+- bpy.data.actions / bpy.data.objects, Object.animation_data, Action.fcurves
+- FCurve with data_path, array_index, group, select, hide and update()
+- FCurve.keyframe_points with add/insert/remove, indexing, iteration and
+  foreach_get/foreach_set. Keyframe co, handle_left/right, handle types,
+  interpolation and the select flags are views into numpy arrays, the
+  same layout foreach_get exposes.
+- Scene with frame_start/frame_end/frame_current and properties registered
+  by assigning bpy.props to bpy.types.Scene, as the addon does.
+- bpy.context with scene, selected_objects, active_object,
+  selected_visible_fcurves and temp_override(). As in ``blender
+  --background`` there is no window, screen or area.
+- bpy.props, bpy.types, bpy.utils, bpy.app.timers/handlers, bpy.msgbus,
+  bpy.path.abspath and mathutils.Vector.
+
+Deliberately not modelled: Blender's automatic handle calculation
+(update() only sorts the keys, handles keep their values), drivers,
+NLA, the depsgraph and bpy.ops. Operators raise when called, except
+ed.undo_push, which only records its message in ``undo_pushes``. Its poll
+needs a window and a screen in bpy.context, like in Blender; calling it
+while the poll fails raises RuntimeError.
+"""
+import contextlib
+import os
+import sys
+import time
+import types as _types
+
+import numpy as np
+
+# RNA-Enum-Werte, wie foreach_get sie liefert (siehe HANDLE_TYPE_CODES im Addon)
+HANDLE_TYPES = {'FREE': 0, 'AUTO': 1, 'VECTOR': 2, 'ALIGNED': 3, 'AUTO_CLAMPED': 4}
+INTERPOLATIONS = {'CONSTANT': 0, 'LINEAR': 1, 'BEZIER': 2}
+
+# Keyframe-Attribut -> (dtype, Breite, Enum-Items, Standardwert neuer Keys)
+KEYFRAME_ATTRIBUTES = {
+    'co': (np.float32, 2, None, 0.0),
+    'handle_left': (np.float32, 2, None, 0.0),
+    'handle_right': (np.float32, 2, None, 0.0),
+    'handle_left_type': (np.int32, 1, HANDLE_TYPES, HANDLE_TYPES['AUTO_CLAMPED']),
+    'handle_right_type': (np.int32, 1, HANDLE_TYPES, HANDLE_TYPES['AUTO_CLAMPED']),
+    'interpolation': (np.int32, 1, INTERPOLATIONS, INTERPOLATIONS['BEZIER']),
+    'select_control_point': (np.bool_, 1, None, True),
+    'select_left_handle': (np.bool_, 1, None, True),
+    'select_right_handle': (np.bool_, 1, None, True),
+}
+
+
+# mathutils
+
+class Vector:
+    """mathutils.Vector; vectors of RNA properties write through to their owner."""
+    __slots__ = ('_data',)
+
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        self._data = np.array(seq, dtype=np.float64).ravel()
+
+    @classmethod
+    def _bound(cls, view):
+        vector = cls.__new__(cls)
+        vector._data = view
+        return vector
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [float(value) for value in self._data[index]]
+        return float(self._data[index])
+
+    def __setitem__(self, index, value):
+        self._data[index] = value
+
+    def __iter__(self):
+        return (float(value) for value in self._data)
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"Vector(({', '.join(f'{value:.4f}' for value in self)}))"
+
+    def _component(index):
+        def get(self):
+            return float(self._data[index])
+
+        def set(self, value):
+            self._data[index] = value
+        return property(get, set)
+
+    x = _component(0)
+    y = _component(1)
+    z = _component(2)
+    del _component
+
+    def __add__(self, other):
+        return Vector(self._data + np.asarray(list(other)))
+
+    def __sub__(self, other):
+        return Vector(self._data - np.asarray(list(other)))
+
+    def __mul__(self, scalar):
+        return Vector(self._data * scalar)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return Vector(self._data / scalar)
+
+    def __neg__(self):
+        return Vector(-self._data)
+
+    def __matmul__(self, other):
+        return float(np.dot(self._data, list(other)))
+
+    dot = __matmul__
+
+    @property
+    def length(self):
+        return float(np.linalg.norm(self._data))
+
+    def normalized(self):
+        length = self.length
+        return Vector(self._data / length if length else self._data)
+
+    def copy(self):
+        return Vector(self._data)
+
+    def to_tuple(self, precision=-1):
+        return tuple(self if precision < 0 else (round(value, precision) for value in self))
+
+
+class bpy_struct:
+    pass
+
+
+# Keyframes
+
+class Keyframe(bpy_struct):
+    """One key of a KeyframePoints collection; reads and writes the collection's arrays."""
+    __slots__ = ('_points', '_index')
+
+    def __init__(self, points, index):
+        self._points = points
+        self._index = index
+
+    def __eq__(self, other):
+        return isinstance(other, Keyframe) and other._points is self._points and other._index == self._index
+
+    def __hash__(self):
+        return hash((id(self._points), self._index))
+
+    def _vector(name):
+        def get(self):
+            return Vector._bound(self._points._arrays[name][self._index])
+
+        def set(self, value):
+            self._points._arrays[name][self._index] = tuple(value)
+        return property(get, set)
+
+    def _enum(name):
+        items = KEYFRAME_ATTRIBUTES[name][2]
+        names = {code: item for item, code in items.items()}
+
+        def get(self):
+            return names[int(self._points._arrays[name][self._index])]
+
+        def set(self, value):
+            if value not in items:
+                raise TypeError(f'bpy_struct: item.attr = val: enum "{value}" not found in {tuple(items)}')
+            self._points._arrays[name][self._index] = items[value]
+        return property(get, set)
+
+    def _flag(name):
+        def get(self):
+            return bool(self._points._arrays[name][self._index])
+
+        def set(self, value):
+            self._points._arrays[name][self._index] = bool(value)
+        return property(get, set)
+
+    co = _vector('co')
+    handle_left = _vector('handle_left')
+    handle_right = _vector('handle_right')
+    handle_left_type = _enum('handle_left_type')
+    handle_right_type = _enum('handle_right_type')
+    interpolation = _enum('interpolation')
+    select_control_point = _flag('select_control_point')
+    select_left_handle = _flag('select_left_handle')
+    select_right_handle = _flag('select_right_handle')
+    del _vector, _enum, _flag
+
+
+class KeyframePoints:
+    """FCurve.keyframe_points, stored as one numpy array per attribute."""
+
+    def __init__(self, fcurve):
+        self._fcurve = fcurve
+        self._arrays = {name: np.empty((0, width) if width > 1 else 0, dtype=dtype)
+                        for name, (dtype, width, _, _) in KEYFRAME_ATTRIBUTES.items()}
+
+    def __len__(self):
+        return len(self._arrays['co'])
+
+    def __getitem__(self, index):
+        count = len(self)
+        if isinstance(index, slice):
+            return [Keyframe(self, i) for i in range(*index.indices(count))]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(f"bpy_prop_collection[index]: index {index} out of range, size {count}")
+        return Keyframe(self, index)
+
+    def __iter__(self):
+        return (Keyframe(self, index) for index in range(len(self)))
+
+    def _attribute(self, attribute):
+        if attribute not in self._arrays:
+            raise TypeError(f"foreach_get/set(attr, sequence) unknown attribute '{attribute}'")
+        return self._arrays[attribute]
+
+    def foreach_get(self, attribute, seq):
+        values = self._attribute(attribute).reshape(-1)
+        if len(seq) != len(values):
+            raise RuntimeError(f"internal error setting the array: size {len(seq)} != {len(values)}")
+        seq[:] = values if isinstance(seq, np.ndarray) else values.tolist()
+
+    def foreach_set(self, attribute, seq):
+        target = self._attribute(attribute).reshape(-1)
+        values = np.asarray(seq).reshape(-1)
+        if len(values) != len(target):
+            raise RuntimeError(f"internal error setting the array: size {len(values)} != {len(target)}")
+        items = KEYFRAME_ATTRIBUTES[attribute][2]
+        if items is not None and not np.isin(values, list(items.values())).all():
+            raise TypeError(f"foreach_set: invalid enum value for '{attribute}'")
+        target[:] = values
+
+    def add(self, count=1):
+        """Appends ``count`` keys at frame 0, selected, like Blender's keyframe_points.add()."""
+        for name, (dtype, width, _, default) in KEYFRAME_ATTRIBUTES.items():
+            new = np.full((count, width) if width > 1 else count, default, dtype=dtype)
+            self._arrays[name] = np.concatenate((self._arrays[name], new))
+
+    def insert(self, frame, value, options=set(), keyframe_type='KEYFRAME'):
+        """Inserts a key or replaces the value of the key on ``frame``; handles lie flat, one frame long."""
+        frames = self._arrays['co'][:, 0]
+        index = int(np.searchsorted(frames, frame))
+        if index >= len(frames) or frames[index] != np.float32(frame):
+            self.add(1)
+            for array in self._arrays.values():
+                array[index + 1:] = array[index:-1].copy()
+        key = Keyframe(self, index)
+        key.co = (frame, value)
+        key.handle_left = (frame - 1.0, value)
+        key.handle_right = (frame + 1.0, value)
+        return key
+
+    def remove(self, keyframe, fast=False):
+        for name, array in self._arrays.items():
+            self._arrays[name] = np.delete(array, keyframe._index, axis=0)
+
+    def clear(self):
+        for name, array in self._arrays.items():
+            self._arrays[name] = array[:0].copy()
+
+    def _sort(self):
+        order = np.argsort(self._arrays['co'][:, 0], kind='stable')
+        if (order != np.arange(len(order))).any():
+            for name, array in self._arrays.items():
+                self._arrays[name] = array[order]
+
+
+class ActionGroup:
+    def __init__(self, name):
+        self.name = name
+        self.select = False
+
+
+class FCurve(bpy_struct):
+    def __init__(self, action, data_path, array_index, group=None):
+        self.id_data = action
+        self.data_path = data_path
+        self.array_index = array_index
+        self.group = group
+        self.select = True
+        self.hide = False
+        self.lock = False
+        self.mute = False
+        self.keyframe_points = KeyframePoints(self)
+
+    def __repr__(self):
+        return f'bpy.data.actions["{self.id_data.name}"].fcurves["{self.data_path}"][{self.array_index}]'
+
+    def update(self):
+        """Sorts the keys by frame. Unlike Blender no handles are recalculated."""
+        self.keyframe_points._sort()
+
+
+class ActionFCurves(list):
+    def __init__(self, action):
+        super().__init__()
+        self._action = action
+
+    def new(self, data_path, index=0, action_group=""):
+        if self.find(data_path, index=index) is not None:
+            raise RuntimeError(f'F-Curve "{data_path}[{index}]" already exists in action "{self._action.name}"')
+        group = None
+        if action_group:
+            group = self._action.groups.get(action_group)
+            if group is None:
+                group = self._action.groups[action_group] = ActionGroup(action_group)
+        fcurve = FCurve(self._action, data_path, index, group)
+        self.append(fcurve)
+        return fcurve
+
+    def find(self, data_path, index=0):
+        return next((fcurve for fcurve in self if fcurve.data_path == data_path and fcurve.array_index == index), None)
+
+    def remove(self, fcurve):
+        super().remove(fcurve)
+
+
+class Action:
+    def __init__(self, name):
+        self.name = name
+        self.fcurves = ActionFCurves(self)
+        self.groups = {}
+        self.id_root = 'OBJECT'
+
+    @property
+    def frame_range(self):
+        frames = [fcurve.keyframe_points._arrays['co'][:, 0] for fcurve in self.fcurves if len(fcurve.keyframe_points)]
+        if not frames:
+            return Vector((0.0, 0.0))
+        frames = np.concatenate(frames)
+        return Vector((frames.min(), frames.max()))
+
+    def update_tag(self, refresh=set()):
+        pass
+
+
+# Objekte, Szene, Context
+
+class AnimData:
+    def __init__(self):
+        self.action = None
+
+
+class Object:
+    def __init__(self, name, data=None):
+        self.name = name
+        self.data = data
+        self.type = 'EMPTY' if data is None else getattr(data, 'type', 'MESH')
+        self.animation_data = None
+        self.pose = None
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData()
+        return self.animation_data
+
+    def animation_data_clear(self):
+        self.animation_data = None
+
+
+class _IDCollection(dict):
+    """bpy.data.<collection>: by name, iterable over the datablocks."""
+
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+
+    def __iter__(self):
+        return iter(list(self.values()))
+
+    def new(self, name, *args):
+        unique, number = name, 0
+        while unique in self:
+            number += 1
+            unique = f"{name}.{number:03d}"
+        self[unique] = datablock = self._factory(unique, *args)
+        return datablock
+
+    def remove(self, datablock):
+        del self[datablock.name]
+
+
+class _CollectionObjects(list):
+    def link(self, obj):
+        if obj in self:
+            raise RuntimeError(f"Object '{obj.name}' already in collection")
+        self.append(obj)
+
+    def unlink(self, obj):
+        self.remove(obj)
+
+
+class Collection:
+    def __init__(self, name):
+        self.name = name
+        self.objects = _CollectionObjects()
+
+
+class Scene:
+    """bpy.types.Scene; bpy.props assigned to the class become properties of every scene."""
+
+    def __init__(self, name="Scene"):
+        self.name = name
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.collection = Collection("Scene Collection")
+
+    @property
+    def objects(self):
+        return list(self.collection.objects)
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = int(frame)
+
+
+class KeyConfigurations:
+    # Wie in blender --background: keine Addon-Keyconfig
+    addon = None
+
+
+class WindowManager:
+    def __init__(self):
+        self.keyconfigs = KeyConfigurations()
+
+
+class Context:
+    """bpy.context of a background session: scene and selection, no UI."""
+
+    def __init__(self):
+        self.scene = Scene()
+        self.window_manager = WindowManager()
+        self.window = None
+        self.screen = None
+        self.area = None
+        self.region = None
+        self.mode = 'OBJECT'
+        self.selected_objects = []
+        self.active_object = None
+        self._selected_visible_fcurves = None
+
+    @property
+    def object(self):
+        return self.active_object
+
+    @property
+    def selected_visible_fcurves(self):
+        """Selected, not hidden F-Curves of the selected objects, unless set explicitly."""
+        if self._selected_visible_fcurves is not None:
+            return self._selected_visible_fcurves
+        return [fcurve for obj in self.selected_objects
+                if obj.animation_data and obj.animation_data.action
+                for fcurve in obj.animation_data.action.fcurves
+                if fcurve.select and not fcurve.hide]
+
+    @selected_visible_fcurves.setter
+    def selected_visible_fcurves(self, fcurves):
+        self._selected_visible_fcurves = fcurves
+
+    @contextlib.contextmanager
+    def temp_override(self, **overrides):
+        """Context.temp_override: the given attributes for the duration of the with block."""
+        previous = {name: getattr(self, name) for name in overrides}
+        for name, value in overrides.items():
+            setattr(self, name, value)
+        try:
+            yield self
+        finally:
+            for name, value in previous.items():
+                setattr(self, name, value)
+
+
+# bpy.props / bpy.types
+
+class _PropertyDeferred:
+    """Result of a bpy.props function, like bpy.props._PropertyDeferred.
+
+    Assigned to a class such as bpy.types.Scene it acts as a descriptor
+    holding the value per instance and calling the update callback.
+    """
+    __slots__ = ('function', 'keywords')
+
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__.get(self, self.keywords.get('default'))
+
+    def __set__(self, instance, value):
+        instance.__dict__[self] = value
+        update = self.keywords.get('update')
+        if update is not None:
+            update(instance, context)
+
+
+def _property_function(name):
+    def function(**keywords):
+        return _PropertyDeferred(function, keywords)
+    function.__name__ = function.__qualname__ = name
+    return function
+
+
+class Operator(bpy_struct):
+    """Operator base; unlike Blender, subclasses can be instantiated directly."""
+    bl_idname = ""
+    bl_label = ""
+    bl_options = {'REGISTER'}
+
+    def __init__(self):
+        self.reports = []
+        for base in reversed(type(self).__mro__):
+            for name, prop in vars(base).get('__annotations__', {}).items():
+                if isinstance(prop, _PropertyDeferred):
+                    setattr(self, name, prop.keywords.get('default'))
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class LayerObjects(bpy_struct):
+    pass
+
+
+# bpy.app
+
+class Timers:
+    """bpy.app.timers; process() runs the due callbacks, which Blender's event loop does."""
+
+    def __init__(self):
+        self._due = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self._due[function] = time.monotonic() + first_interval
+
+    def unregister(self, function):
+        if function not in self._due:
+            raise ValueError("Error: function is not registered")
+        del self._due[function]
+
+    def is_registered(self, function):
+        return function in self._due
+
+    def process(self, now=None):
+        """Calls every timer due at ``now`` (default: the current time, None: all) once."""
+        now = time.monotonic() if now is None else now
+        for function, due in list(self._due.items()):
+            if due > now or function not in self._due:
+                continue
+            interval = function()
+            if interval is None:
+                self._due.pop(function, None)
+            else:
+                self._due[function] = now + interval
+
+
+def _persistent(function):
+    function._bpy_persist = True
+    return function
+
+
+def _undo_push(message=""):
+    # Ohne Undo-Stack nur zählen, wie oft ein Schritt gesetzt wurde
+    if not _undo_push_poll():
+        raise RuntimeError("Operator bpy.ops.ed.undo_push.poll() failed, context is incorrect")
+    undo_pushes.append(message)
+    return {'FINISHED'}
+
+
+def _undo_push_poll():
+    # ED_undo_push braucht wie in Blender ein Fenster mit Screen
+    return context.window is not None and context.screen is not None
+
+
+# Operatoren, die der Stand-in nachbildet
+undo_pushes = []
+_OPERATORS = {'bpy.ops.ed.undo_push': _undo_push}
+_POLLS = {'bpy.ops.ed.undo_push': _undo_push_poll}
+
+
+class _Ops:
+    def __init__(self, path="bpy.ops"):
+        self._path = path
+
+    def __getattr__(self, name):
+        return _Ops(f"{self._path}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        operator = _OPERATORS.get(self._path)
+        if operator is None:
+            raise RuntimeError(f"{self._path}() is not available without Blender")
+        return operator(*args, **kwargs)
+
+    def poll(self):
+        poll = _POLLS.get(self._path)
+        if poll is None:
+            raise RuntimeError(f"{self._path}.poll() is not available without Blender")
+        return poll()
+
+
+def _abspath(path, start=None, library=None):
+    # "//" ist in Blender relativ zur .blend-Datei; ohne Datei relativ zum Arbeitsverzeichnis
+    if path.startswith("//"):
+        path = os.path.join(start or os.getcwd(), path[2:])
+    return os.path.abspath(path)
+
+
+def _module(name, **attributes):
+    module = _types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+context = Context()
+
+props = _module('bpy.props', **{name: _property_function(name) for name in (
+    'BoolProperty', 'IntProperty', 'FloatProperty', 'StringProperty', 'EnumProperty',
+    'FloatVectorProperty', 'IntVectorProperty', 'BoolVectorProperty', 'PointerProperty',
+    'CollectionProperty')})
+
+types = _module('bpy.types', bpy_struct=bpy_struct, Operator=Operator, Panel=Panel, Scene=Scene,
+                Object=Object, Action=Action, FCurve=FCurve, Keyframe=Keyframe,
+                LayerObjects=LayerObjects, Context=Context)
+
+_registered_classes = set()
+utils = _module('bpy.utils', register_class=_registered_classes.add, unregister_class=_registered_classes.discard)
+
+handlers = _module('bpy.app.handlers', persistent=_persistent, depsgraph_update_pre=[], depsgraph_update_post=[],
+                   load_pre=[], load_post=[], frame_change_post=[], frame_change_pre=[], undo_pre=[], redo_pre=[])
+timers = Timers()
+app = _module('bpy.app', timers=timers, handlers=handlers, background=True, version=(4, 1, 0))
+
+msgbus = _module('bpy.msgbus', subscribe_rna=lambda **keywords: None, clear_by_owner=lambda owner: None,
+                 publish_rna=lambda **keywords: None)
+
+data = _module('bpy.data', actions=_IDCollection(Action), objects=_IDCollection(Object))
+
+path = _module('bpy.path', abspath=_abspath)
+
+bpy = _module('bpy', props=props, types=types, utils=utils, app=app, msgbus=msgbus, data=data,
+              context=context, path=path, ops=_Ops())
+
+mathutils = _module('mathutils', Vector=Vector)
+
+
+def install():
+    """Registers the stand-in as ``bpy`` and ``mathutils`` in sys.modules and returns bpy."""
+    sys.modules.update({'bpy': bpy, 'bpy.props': props, 'bpy.types': types, 'bpy.utils': utils,
+                        'bpy.app': app, 'bpy.app.handlers': handlers, 'bpy.msgbus': msgbus, 'bpy.path': path,
+                        'mathutils': mathutils})
+    return bpy
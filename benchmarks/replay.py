@@ -0,0 +1,189 @@
+"""Replays mouse events into the modal operators of handle_manipulator.py.
+
+An event sequence is either scripted (scripted_drag) or recorded in
+Blender with record() and saved as JSON. replay() feeds it into a fresh
+operator, the first event to invoke(), the rest to modal(), and measures
+every call. Together with the synthetic actions of synthetic.py this
+gives reproducible per-tick latency distributions:
+
+    python benchmarks/replay.py OBJECT_OT_manipulate_right_handles --ticks 300 --wheel-every 50
+    python benchmarks/replay.py OBJECT_OT_extrude_handles_between_frames --events drag.json
+
+Recording, in the Python console of an interactive Blender session:
+
+    import replay, handle_manipulator
+    replay.record(handle_manipulator.OBJECT_OT_extrude_handles_between_frames, "/tmp/drag.json")
+
+The next run of the operator is written to the file when it finishes.
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import BenchContext, BenchEvent, build_action, operator_proxy  # noqa: E402
+
+import bpy  # noqa: E402
+import handle_manipulator  # noqa: E402
+
+EVENT_FIELDS = ('type', 'value', 'mouse_x', 'mouse_y', 'alt', 'shift', 'ctrl')
+FINISH_EVENTS = {'confirm': ('LEFTMOUSE', 'RELEASE'), 'cancel': ('ESC', 'PRESS')}
+
+
+def scripted_drag(ticks=100, step_x=3, step_y=0, start=(800, 500), wheel_every=0, finish='confirm', alt=False):
+    """Invoke at ``start``, ``ticks`` mouse moves by (step_x, step_y), a wheel step every ``wheel_every`` moves.
+
+    Ends with a LEFTMOUSE release (``finish='confirm'``) or ESC (``'cancel'``).
+    """
+    x, y = start
+    events = [BenchEvent('LEFTMOUSE', 'PRESS', x, y)]
+    for tick in range(1, ticks + 1):
+        x += step_x
+        y += step_y
+        events.append(BenchEvent('MOUSEMOVE', 'NOTHING', x, y, alt=alt))
+        if wheel_every and tick % wheel_every == 0:
+            events.append(BenchEvent('WHEELUPMOUSE', 'PRESS', x, y, alt=alt))
+    events.append(BenchEvent(*FINISH_EVENTS[finish], x, y))
+    return events
+
+
+def load_events(path):
+    """Events of a recording written by record()."""
+    with open(path) as file:
+        recording = json.load(file)
+    return [BenchEvent(**{field: event[field] for field in EVENT_FIELDS}) for event in recording['events']]
+
+
+def record(operator_class, path):
+    """Records the events of the next run of ``operator_class`` to ``path`` (inside Blender)."""
+    invoke, modal = operator_class.invoke, operator_class.modal
+    events = []
+    start = [0.0]
+
+    def entry(event):
+        return dict({field: getattr(event, field) for field in EVENT_FIELDS}, t=time.perf_counter() - start[0])
+
+    def finish(result):
+        if 'RUNNING_MODAL' in result:
+            return result
+        operator_class.invoke, operator_class.modal = invoke, modal
+        with open(path, 'w') as file:
+            json.dump({'operator': operator_class.__name__, 'events': events}, file, indent=1)
+        return result
+
+    @functools.wraps(invoke)
+    def recording_invoke(self, context, event):
+        start[0] = time.perf_counter()
+        events.append(entry(event))
+        return finish(invoke(self, context, event))
+
+    @functools.wraps(modal)
+    def recording_modal(self, context, event):
+        if event.type != 'TIMER':
+            events.append(entry(event))
+        return finish(modal(self, context, event))
+
+    operator_class.invoke, operator_class.modal = recording_invoke, recording_modal
+
+
+class ReplayResult:
+    """Latencies of one replay in seconds: invoke, every modal tick, and the finishing event."""
+
+    def __init__(self, invoke, ticks, finish, result):
+        self.invoke = invoke
+        self.ticks = ticks
+        self.finish = finish
+        self.result = result
+
+    def percentiles(self, q=(50, 95, 99)):
+        return dict(zip(q, np.percentile(self.ticks, q).tolist())) if self.ticks else {}
+
+
+def _process_timers():
+    # bpy.app.timers laufen in Blender zwischen den Events; nur der Stand-in lässt sie hier laufen
+    process = getattr(bpy.app.timers, 'process', None)
+    if process is not None:
+        process()
+
+
+def replay(operator_class, context, events):
+    """Invokes a new ``operator_class`` with events[0] and feeds the rest to modal().
+
+    A mouse move the ModalScheduler deferred is applied within the same
+    tick by the TIMER event Blender would send after the tick budget.
+    Events after the operator finished are ignored.
+    """
+    operator = operator_proxy(operator_class)()
+
+    start = time.perf_counter()
+    result = operator.invoke(context, events[0])
+    invoke_time = time.perf_counter() - start
+    if 'RUNNING_MODAL' not in result:
+        return ReplayResult(invoke_time, [], 0.0, result)
+
+    ticks = []
+    finish_time = 0.0
+    for event in events[1:]:
+        start = time.perf_counter()
+        result = operator.modal(context, event)
+        scheduler = getattr(operator, '_scheduler', None)
+        if scheduler is not None and scheduler.pending is not None:
+            result = operator.modal(context, BenchEvent('TIMER'))
+        duration = time.perf_counter() - start
+
+        if 'RUNNING_MODAL' not in result:
+            finish_time = duration
+            break
+        ticks.append(duration)
+        _process_timers()
+    return ReplayResult(invoke_time, ticks, finish_time, result)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('operator', help="class name, e.g. OBJECT_OT_manipulate_right_handles")
+    parser.add_argument('--events', help="recording written by record(); default: a scripted drag")
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--step-x', type=int, default=3)
+    parser.add_argument('--step-y', type=int, default=0)
+    parser.add_argument('--wheel-every', type=int, default=0)
+    parser.add_argument('--cancel', action='store_true', help="end the scripted drag with ESC")
+    parser.add_argument('--bones', type=int, default=50)
+    parser.add_argument('--channels', type=int, default=10)
+    parser.add_argument('--keys', type=int, default=2000)
+    parser.add_argument('--selected', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    operator_class = getattr(handle_manipulator, args.operator)
+    if args.events:
+        events = load_events(args.events)
+    else:
+        events = scripted_drag(args.ticks, args.step_x, args.step_y, wheel_every=args.wheel_every,
+                               finish='cancel' if args.cancel else 'confirm')
+
+    obj = build_action(bones=args.bones, channels=args.channels, keys=args.keys,
+                       selected=args.selected, seed=args.seed)
+    result = replay(operator_class, BenchContext(obj), events)
+
+    print(f"{args.operator}: {set(result.result)} after {len(result.ticks)} ticks")
+    print(f"  invoke  {result.invoke * 1000.0:9.3f} ms")
+    for q, value in result.percentiles().items():
+        print(f"  p{q:<6} {value * 1000.0:9.3f} ms")
+    if result.ticks:
+        print(f"  max     {max(result.ticks) * 1000.0:9.3f} ms")
+    print(f"  finish  {result.finish * 1000.0:9.3f} ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:])
@@ -0,0 +1,179 @@
+"""Synthetic actions and a headless operator context for the benchmarks.
+
+Everything here works on real bpy data inside ``blender --background``
+or on the stand-in in fake_bpy.py: the action, its F-Curves and the scene
+come from bpy, only the UI parts an operator touches (window, window
+manager, screen, Graph Editor area) are replaced by the small stand-ins
+below, since a background session has no windows to invoke modal
+operators in.
+"""
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    # Ohne Blender: der Stand-in aus fake_bpy.py
+    import fake_bpy
+    bpy = fake_bpy.install()
+
+# Kanäle eines Pose-Knochens in der Reihenfolge, in der sie angelegt werden
+BONE_CHANNELS = [('location', index) for index in range(3)] + \
+                [('rotation_quaternion', index) for index in range(4)] + \
+                [('scale', index) for index in range(3)]
+
+
+def _channel(bone_name, channel):
+    if channel < len(BONE_CHANNELS):
+        attribute, array_index = BONE_CHANNELS[channel]
+        return f'pose.bones["{bone_name}"].{attribute}', array_index
+    # Mehr Kanäle als ein Knochen hat: Custom Properties
+    return f'pose.bones["{bone_name}"]["bench_{channel}"]', 0
+
+
+def build_action(name="Bench", bones=50, channels=10, keys=2000, selected=200, seed=0):
+    """Object with an action of bones x channels F-Curves with ``keys`` keys each.
+
+    Keys sit on every second frame with smooth random values. On every
+    curve the ``selected`` keys in the middle of the range are selected.
+    Returns the new object, linked to the scene.
+    """
+    rng = np.random.default_rng(seed)
+    action = bpy.data.actions.new(name)
+    frames = np.arange(keys, dtype=np.float64) * 2.0
+    first_selected = max(0, (keys - selected) // 2)
+    select = np.zeros(keys, dtype=bool)
+    select[first_selected:first_selected + selected] = True
+
+    for bone in range(bones):
+        bone_name = f"Bone_{bone:04d}"
+        for channel in range(channels):
+            data_path, array_index = _channel(bone_name, channel)
+            fcurve = action.fcurves.new(data_path, index=array_index, action_group=bone_name)
+            phase, amplitude = rng.uniform(0.0, 6.28), rng.uniform(0.2, 2.0)
+            values = amplitude * np.sin(frames * 0.05 + phase) + rng.normal(0.0, 0.05, keys)
+
+            points = fcurve.keyframe_points
+            points.add(keys)
+            points.foreach_set('co', np.column_stack((frames, values)).astype(np.float32).ravel())
+            # Flache Handles über ein Drittel des Key-Abstands; update() berechnet AUTO_CLAMPED in Blender neu
+            points.foreach_set('handle_left', np.column_stack((frames - 0.66, values)).astype(np.float32).ravel())
+            points.foreach_set('handle_right', np.column_stack((frames + 0.66, values)).astype(np.float32).ravel())
+            points.foreach_set('select_control_point', select)
+            fcurve.update()
+
+    obj = bpy.data.objects.new(name, None)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.animation_data_create().action = action
+    return obj
+
+
+class _Window:
+    width = 1920
+    height = 1080
+
+    def cursor_set(self, cursor):
+        pass
+
+    def cursor_warp(self, x, y):
+        pass
+
+
+class _WindowManager:
+    def modal_handler_add(self, operator):
+        return True
+
+    def event_timer_add(self, time_step, window=None):
+        return object()
+
+    def event_timer_remove(self, timer):
+        pass
+
+
+class _View2D:
+    def __init__(self, start, end, width):
+        self._start = start
+        self._end = end
+        self._width = width
+
+    def region_to_view(self, x, y):
+        return self._start + (self._end - self._start) * x / self._width, 0.0
+
+
+class _Region:
+    def __init__(self, region_type, start, end, width=1600, height=900):
+        self.type = region_type
+        self.width = width
+        self.height = height
+        self.view2d = _View2D(start, end, width)
+
+
+class _Area:
+    def __init__(self, area_type, start=0.0, end=250.0):
+        self.type = area_type
+        self.regions = [_Region('UI', start, end), _Region('WINDOW', start, end)]
+
+    def tag_redraw(self):
+        pass
+
+
+class _Screen:
+    def __init__(self, areas):
+        self.areas = areas
+        self.is_animation_playing = False
+
+
+class BenchContext:
+    """The context attributes the operators read, for one object and its visible curves."""
+
+    def __init__(self, obj, view_range=(0.0, 250.0)):
+        self.scene = bpy.context.scene
+        self.active_object = obj
+        self.selected_objects = [obj]
+        self.selected_visible_fcurves = list(obj.animation_data.action.fcurves)
+        self.mode = 'POSE'
+        self.window = _Window()
+        self.window_manager = _WindowManager()
+        self.area = _Area('GRAPH_EDITOR', *view_range)
+        self.region = self.area.regions[1]
+        self.screen = _Screen([self.area, _Area('VIEW_3D')])
+
+
+class BenchEvent:
+    __slots__ = ('type', 'value', 'mouse_x', 'mouse_y', 'alt', 'shift', 'ctrl')
+
+    def __init__(self, type='MOUSEMOVE', value='NOTHING', mouse_x=800, mouse_y=500, alt=False, shift=False, ctrl=False):
+        self.type = type
+        self.value = value
+        self.mouse_x = mouse_x
+        self.mouse_y = mouse_y
+        self.alt = alt
+        self.shift = shift
+        self.ctrl = ctrl
+
+
+def operator_proxy(operator_class):
+    """Plain Python class with the behaviour of ``operator_class``, instantiable outside the operator stack.
+
+    Registered operator classes can only be instantiated by Blender. The
+    proxy copies the methods and attributes of every class in the MRO except
+    bpy.types.Operator, turns RNA properties into plain attributes with
+    their default value and collects report() calls in ``reports``.
+    """
+    namespace = {}
+    for base in reversed(operator_class.__mro__):
+        if base in (object, bpy.types.Operator):
+            continue
+        namespace.update((name, value) for name, value in vars(base).items()
+                         if name not in ('__dict__', '__weakref__', '__annotations__'))
+        for name, prop in getattr(base, '__annotations__', {}).items():
+            namespace[name] = getattr(prop, 'keywords', {}).get('default')
+
+    def __init__(self):
+        self.reports = []
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+
+    namespace['__init__'] = __init__
+    namespace['report'] = report
+    return type(operator_class.__name__, (), namespace)
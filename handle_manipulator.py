@@ -1,6 +1,14 @@
 import bpy
+import cProfile
+import functools
 import math
+import os
 import random
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+import numpy as np
 from bpy.props import IntProperty
 
 # Properties
@@ -42,6 +50,87 @@ bpy.types.Scene.keep_framerange = bpy.props.BoolProperty(
     default=False 
 )
 
+bpy.types.Scene.background_redraw_rate = bpy.props.IntProperty(
+    name="Other Views Rate",
+    description="Redraws per second of 3D Views and other Graph Editors while dragging. "
+                "The Graph Editor in use redraws every update, all views redraw on confirm",
+    default=10,
+    min=1,
+    max=60
+)
+
+bpy.types.Scene.modal_tick_budget = bpy.props.FloatProperty(
+    name="Tick Budget",
+    description="Minimum time in milliseconds between two recomputes while dragging. "
+                "Mouse moves in between are merged, ticks that take longer are reported",
+    default=1000.0 / 60.0,
+    min=1.0,
+    max=200.0
+)
+
+bpy.types.Scene.preview_visible_keys = bpy.props.BoolProperty(
+    name="Cull Preview",
+    description="While dragging, only update keys inside the visible Graph Editor frame range. "
+                "All keys are applied on confirm",
+    default=False
+)
+
+bpy.types.Scene.progressive_preview_keys = bpy.props.IntProperty(
+    name="Progressive Above",
+    description="Selections with more keys than this update an evenly spaced subset per mouse move "
+                "and fill in the rest while idle. All keys are applied on confirm. 0 disables it",
+    default=20000,
+    min=0
+)
+
+bpy.types.Scene.coalesce_navigation_undo = bpy.props.BoolProperty(
+    name="Merge Navigation Undo",
+    description="Merge a burst of key navigation presses (next, previous, add, subtract) into one undo step, "
+                "pushed once no key was pressed for the merge delay. Undo, redo and the next change to the scene "
+                "push it earlier. An operator run within the delay still gets its undo step before the merged one",
+    default=False
+)
+
+bpy.types.Scene.navigation_undo_delay = bpy.props.FloatProperty(
+    name="Merge Delay",
+    description="Seconds without a navigation press after which the merged undo step is pushed",
+    default=0.5,
+    min=0.05,
+    max=2.0,
+    subtype='TIME_ABSOLUTE',
+    unit='TIME_ABSOLUTE'
+)
+
+bpy.types.Scene.record_operator_timings = bpy.props.BoolProperty(
+    name="Record Timings",
+    description="Measure invoke, update and confirm/cancel times of the operators. "
+                "Updates are split into compute, write-back and redraw tagging. Shown in the Performance panel",
+    default=False
+)
+
+bpy.types.Scene.profile_next_session = bpy.props.BoolProperty(
+    name="Profile Next Drag",
+    description="Run the next drag of a Handle Manipulator operator under cProfile and tracemalloc, "
+                "from invoke to confirm or cancel. Switches itself off afterwards",
+    default=False
+)
+
+bpy.types.Scene.profile_output_dir = bpy.props.StringProperty(
+    name="Profile Directory",
+    description="Directory for the .prof file and allocation report of a profiled drag. "
+                "Empty: the system temp directory",
+    default="",
+    subtype='DIR_PATH'
+)
+
+bpy.types.Scene.profile_top_allocations = bpy.props.IntProperty(
+    name="Top Allocations",
+    description="Number of source lines listed in the allocation report of a profiled drag",
+    default=25,
+    min=1,
+    max=500
+)
+
 def update_isolate_bones(self, context):
     is_isolated = self.is_bones_isolated
     
@@ -74,6 +163,7 @@ class OBJECT_OT_toggle_bones_isolation(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
+        navigation_undo.flush()
         context.scene.is_bones_isolated = not context.scene.is_bones_isolated
         self.report({'INFO'}, f"Bones isolation: {'On' if context.scene.is_bones_isolated else 'Off'}")
         return {'FINISHED'}
@@ -116,107 +206,1238 @@ def filter_fcurves(self, context):
             area.tag_redraw()
 
 
-def set_handles_aligned(context, initial_types):
-    """Setzt die Handles der Keyframes auf den Typ 'ALIGNED'."""
-    for (data_path, keyframe_index, array_index), types in initial_types.items():
-        fcurve = None
-        for fc in context.active_object.animation_data.action.fcurves:
-            if fc.data_path == data_path and fc.array_index == array_index:
-                fcurve = fc
-                break
-        
-        if fcurve and keyframe_index < len(fcurve.keyframe_points):
-            keyframe = fcurve.keyframe_points[keyframe_index]
-            keyframe.interpolation = 'BEZIER'
-            keyframe.handle_left_type = 'ALIGNED'
-            keyframe.handle_right_type = 'ALIGNED'
-
-def reset_handles(context, initial_vectors, initial_types, initial_coords):
-    """Setzt die Handles auf ihre ursprüngliche Position und ihren Typ zurück."""
-    for (data_path, keyframe_index, array_index), initial_vectors in initial_vectors.items():
-        fcurve = None
-        for fc in context.active_object.animation_data.action.fcurves:
-            if fc.data_path == data_path and fc.array_index == array_index:
-                fcurve = fc
-                break
-
-        if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-            continue
-        
-        keyframe = fcurve.keyframe_points[keyframe_index]
-        initial_coord = initial_coords[(data_path, keyframe_index, array_index)]
-        
-        vec_right_initial = initial_vectors['right']
-        keyframe.handle_right[0] = initial_coord['co_x'] + vec_right_initial[0]
-        keyframe.handle_right[1] = initial_coord['co_y'] + vec_right_initial[1]
+# Zeitmessung der Operatoren (opt-in über scene.record_operator_timings)
 
-        vec_left_initial = initial_vectors['left']
-        keyframe.handle_left[0] = initial_coord['co_x'] + vec_left_initial[0]
-        keyframe.handle_left[1] = initial_coord['co_y'] + vec_left_initial[1]
-        
-        types = initial_types[(data_path, keyframe_index, array_index)]
-        keyframe.handle_left_type = types['left']
-        keyframe.handle_right_type = types['right']
+# Anzahl der Messwerte pro Operator und Phase
+TIMING_BUFFER_SIZE = 256
 
+# bl_idname -> {Phase: deque der letzten Dauern in ms}
+operator_timings = OrderedDict()
 
-# --- NEUE FUNKTION: Setzt den Timeline-Bereich basierend auf den ausgewählten Keyframes ---
-def set_timeline_range_to_selected(context):
-    selected_frames = []
-    all_visible_frames = set()
-    found_multi_key_selection = False
 
-    for fcurve in context.selected_visible_fcurves:
-        selected_keyframes_in_fcurve = [kf for kf in fcurve.keyframe_points if kf.select_control_point]
-        
-        if len(selected_keyframes_in_fcurve) > 1:
-            found_multi_key_selection = True
-            
-        for kf in fcurve.keyframe_points:
-            all_visible_frames.add(kf.co[0])
-            if kf.select_control_point:
-                selected_frames.append(kf.co[0])
+class OperatorTimer:
+    """Misst aufeinanderfolgende Phasen eines Operator-Laufs (start(), lap(phase)) in operator_timings."""
+    __slots__ = ('_samples', '_start')
 
-    if not selected_frames:
-        return
+    def __init__(self, bl_idname):
+        self._samples = operator_timings.setdefault(bl_idname, OrderedDict())
+        self._start = time.perf_counter()
 
-    min_frame_selected = min(selected_frames)
-    max_frame_selected = max(selected_frames)
-    
-    preframes = context.scene.additional_preframes
-    postframes = context.scene.additional_postframes
+    def start(self):
+        self._start = time.perf_counter()
 
-    if not found_multi_key_selection:
-        # Fall 1: Nur ein Key pro F-Kurve wurde ausgewählt.
-        # Finde die benachbarten Keys der gesamten Auswahl.
-        sorted_visible_frames = sorted(list(all_visible_frames))
-        
-        # Finde den Index des ersten und letzten ausgewählten Frames.
-        # Fallback, wenn Frame nicht gefunden wird.
-        try:
-            min_index = sorted_visible_frames.index(min_frame_selected)
-            max_index = sorted_visible_frames.index(max_frame_selected)
-        except ValueError:
-            context.scene.frame_start = int(min_frame_selected - preframes)
-            context.scene.frame_end = int(max_frame_selected + postframes)
+    def lap(self, phase):
+        now = time.perf_counter()
+        samples = self._samples.get(phase)
+        if samples is None:
+            samples = self._samples[phase] = deque(maxlen=TIMING_BUFFER_SIZE)
+        samples.append((now - self._start) * 1000.0)
+        self._start = now
+
+
+class _NoTimer:
+    """Stand-in für OperatorTimer bei ausgeschalteter Zeitmessung."""
+    __slots__ = ()
+
+    def start(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+
+NO_TIMER = _NoTimer()
+
+
+def operator_timer(context, operator):
+    """OperatorTimer für ``operator``, NO_TIMER bei ausgeschalteter Zeitmessung."""
+    if context.scene.record_operator_timings:
+        return OperatorTimer(operator.bl_idname)
+    return NO_TIMER
+
+
+def timing_summary(samples):
+    """(letzter, Mittel, p95) eines Ringpuffers in ms."""
+    values = np.fromiter(samples, dtype=np.float64, count=len(samples))
+    return float(values[-1]), float(values.mean()), float(np.percentile(values, 95))
+
+
+def timed_execute(execute):
+    """Dekorator für execute(): misst die Phase 'execute' bei eingeschalteter Zeitmessung."""
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        timer = operator_timer(context, self)
+        result = execute(self, context)
+        timer.lap('execute')
+        return result
+    return wrapper
+
+
+class SessionProfiler:
+    """Führt eine Operator-Sitzung unter cProfile und tracemalloc aus, stop() schreibt die Berichte."""
+    __slots__ = ('bl_idname', 'directory', 'top', '_profile', '_started_tracemalloc')
+
+    def __init__(self, bl_idname, directory, top):
+        self.bl_idname = bl_idname
+        self.directory = bpy.path.abspath(directory) if directory else tempfile.gettempdir()
+        self.top = top
+        self._profile = cProfile.Profile()
+        self._started_tracemalloc = False
+
+    def start(self):
+        # Läuft tracemalloc schon (z.B. vom Benutzer gestartet), bleibt es nach stop() an
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._profile.enable()
+
+    def stop(self, result):
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{self.bl_idname}_{time.strftime('%Y%m%d_%H%M%S')}")
+        self._profile.dump_stats(base + ".prof")
+        with open(base + "_allocations.txt", 'w') as report:
+            report.write(f"{self.bl_idname} {', '.join(sorted(result))}\n")
+            report.write(f"traced memory: {current / 1024:.1f} KiB at exit, {peak / 1024:.1f} KiB peak\n\n")
+            for statistic in snapshot.statistics('lineno')[:self.top]:
+                report.write(f"{statistic}\n")
+        return base + ".prof", base + "_allocations.txt"
+
+
+def session_profiler(context, operator):
+    """SessionProfiler für ``operator``, wenn scene.profile_next_session gesetzt ist; setzt den Schalter zurück."""
+    scene = context.scene
+    if not scene.profile_next_session:
+        return None
+    scene.profile_next_session = False
+    return SessionProfiler(operator.bl_idname, scene.profile_output_dir, scene.profile_top_allocations)
+
+
+# Keyframe snapshots: Bulk-Lesen der keyframe_points mit foreach_get
+
+# RNA-Werte der Enums handle_left_type/handle_right_type, wie foreach_get sie liefert.
+HANDLE_TYPE_CODES = {'FREE': 0, 'AUTO': 1, 'VECTOR': 2, 'ALIGNED': 3, 'AUTO_CLAMPED': 4}
+INTERPOLATION_BEZIER = 2
+
+
+def _read_keyframe_attribute(keyframe_points, attribute, count, dtype, width=1):
+    buffer = np.empty(count * width, dtype=dtype)
+    keyframe_points.foreach_get(attribute, buffer)
+    if width > 1:
+        return buffer.reshape(count, width)
+    return buffer
+
+
+class CurveSnapshot:
+    """Zusammenhängende Kopie der keyframe_points einer F-Curve, ein foreach_get pro Attribut."""
+    __slots__ = ('fcurve', 'co', 'handle_left', 'handle_right', 'select',
+                 'handle_left_type', 'handle_right_type', 'interpolation')
+
+    def __init__(self, fcurve):
+        points = fcurve.keyframe_points
+        count = len(points)
+        self.fcurve = fcurve
+        self.co = _read_keyframe_attribute(points, 'co', count, np.float32, 2).astype(np.float64)
+        self.handle_left = _read_keyframe_attribute(points, 'handle_left', count, np.float32, 2).astype(np.float64)
+        self.handle_right = _read_keyframe_attribute(points, 'handle_right', count, np.float32, 2).astype(np.float64)
+        self.select = _read_keyframe_attribute(points, 'select_control_point', count, np.bool_)
+        self.handle_left_type = _read_keyframe_attribute(points, 'handle_left_type', count, np.int32).astype(np.int8)
+        self.handle_right_type = _read_keyframe_attribute(points, 'handle_right_type', count, np.int32).astype(np.int8)
+        self.interpolation = _read_keyframe_attribute(points, 'interpolation', count, np.int32).astype(np.int8)
+
+    def __len__(self):
+        return len(self.co)
+
+    @property
+    def data_path(self):
+        return self.fcurve.data_path
+
+    @property
+    def array_index(self):
+        return self.fcurve.array_index
+
+    def selected_indices(self):
+        return np.flatnonzero(self.select)
+
+    def selected_bounds(self):
+        """Indizes des ersten und letzten ausgewählten Keys nach Frame, None bei weniger als zwei."""
+        selected = self.selected_indices()
+        if len(selected) < 2:
+            return None
+        ordered = selected[np.argsort(self.co[selected, 0], kind='stable')]
+        return int(ordered[0]), int(ordered[-1])
+
+
+def snapshot_curves(fcurves):
+    return [CurveSnapshot(fcurve) for fcurve in fcurves]
+
+
+def neighbour_differs(values, epsilon=1e-6):
+    """Maske der Keys, deren vorheriger oder nächster Nachbar um mehr als epsilon abweicht."""
+    mask = np.zeros(len(values), dtype=bool)
+    changed = np.abs(np.diff(values)) > epsilon
+    mask[1:] |= changed
+    mask[:-1] |= changed
+    return mask
+
+
+class CurveFrameIndex:
+    """Sortierte Frames der Keys einer F-Curve für Bisect-Suchen nach Nachbar-Keys."""
+    __slots__ = ('fcurve', 'frames', 'select', '_sorted_frames', '_order', '_changed', '_frame_starts')
+
+    def __init__(self, fcurve, frames=None, select=None):
+        points = fcurve.keyframe_points
+        count = len(points)
+        self.fcurve = fcurve
+        if frames is None:
+            frames = _read_keyframe_attribute(points, 'co', count, np.float32, 2)[:, 0].astype(np.float64)
+            select = _read_keyframe_attribute(points, 'select_control_point', count, np.bool_)
+        self.frames = frames
+        self.select = select
+        if count < 2 or (np.diff(self.frames) >= 0).all():
+            self._order = None
+            self._sorted_frames = self.frames
+        else:
+            # Stabil: Keys auf demselben Frame behalten ihre keyframe_points-Reihenfolge
+            self._order = np.argsort(self.frames, kind='stable')
+            self._sorted_frames = self.frames[self._order]
+        self._changed = None
+        self._frame_starts = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot.fcurve, snapshot.co[:, 0].copy(), snapshot.select.copy())
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def sorted_frames(self):
+        return self._sorted_frames
+
+    def _keyframe_index(self, position):
+        return int(position if self._order is None else self._order[position])
+
+    def first(self):
+        """Index des Keys mit dem kleinsten Frame."""
+        return self._keyframe_index(0)
+
+    def last(self):
+        """Index des Keys mit dem größten Frame."""
+        return self._keyframe_index(len(self) - 1)
+
+    def next_after(self, frame):
+        """Index des nächsten Keys rechts von frame, None wenn es keinen gibt."""
+        position = int(np.searchsorted(self._sorted_frames, frame, side='right'))
+        if position == len(self):
+            return None
+        return self._keyframe_index(position)
+
+    def selected_range(self):
+        """(min_frame, max_frame) der ausgewählten Keys, None ohne Auswahl."""
+        selected_frames = self.frames[self.select]
+        if not len(selected_frames):
+            return None
+        return float(selected_frames.min()), float(selected_frames.max())
+
+    def first_selected_at(self, frame):
+        """Index des ersten ausgewählten Keys auf frame."""
+        return int(np.flatnonzero(self.select & (self.frames == frame))[0])
+
+    def _distinct_frame_starts(self):
+        # Sortierte Positionen, an denen ein neuer Frame beginnt (erster Key jedes Frames)
+        if self._frame_starts is None:
+            starts = np.ones(len(self), dtype=bool)
+            starts[1:] = self._sorted_frames[1:] != self._sorted_frames[:-1]
+            self._frame_starts = np.flatnonzero(starts)
+        return self._frame_starts
+
+    def step_selection(self, steps=1, forward=True, until_frame=None):
+        """Auswahl um ``steps`` Einzelschritte verschieben; (Index des neuen vordersten Keys, Schritte) oder None."""
+        frames = self._sorted_frames
+        sorted_select = self.select if self._order is None else self.select[self._order]
+        positions = np.flatnonzero(sorted_select)
+        starts = self._distinct_frame_starts()
+
+        # Erste Keys der Frames jenseits der Auswahl, in Schrittreihenfolge
+        if forward:
+            first = int(np.searchsorted(starts, np.searchsorted(frames, frames[positions[-1]], side='right')))
+            if until_frame is not None:
+                steps = int(np.searchsorted(frames[starts], until_frame, side='right')) - first
+            added = starts[first:first + max(steps, 0)]
+        else:
+            last = int(np.searchsorted(starts, np.searchsorted(frames, frames[positions[0]], side='left')))
+            if until_frame is not None:
+                steps = last - int(np.searchsorted(frames[starts], until_frame, side='left'))
+            added = starts[max(last - max(steps, 0), 0):last][::-1]
+            # Abgewählt wird vom größten Frame abwärts, auf einem Frame in keyframe_points-Reihenfolge
+            positions = positions[np.lexsort((positions, -frames[positions]))]
+        if not len(added):
+            return None
+
+        # Jeder Schritt nimmt einen Key hinzu und den ältesten weg; schon ausgewählte Keys bleiben unberührt
+        stepped = np.concatenate((positions, added))
+        if self._order is not None:
+            stepped = self._order[stepped]
+        self.select_key(stepped[:len(added)], False)
+        self.select_key(stepped[max(len(added), len(positions)):], True)
+        return int(stepped[-1]), len(added)
+
+    def select_key(self, index, state=True):
+        """(De)selektiert Punkt und Handles von Key index (auch ein Index-Array); geschrieben wird erst in write_selection()."""
+        if self._changed is None:
+            self._changed = np.zeros(len(self), dtype=bool)
+        self.select[index] = state
+        self._changed[index] = True
+
+    def write_selection(self):
+        """Schreibt die mit select_key() geänderte Auswahl zurück. False, wenn sich nichts geändert hat."""
+        if self._changed is None:
+            return False
+        points = self.fcurve.keyframe_points
+        points.foreach_set('select_control_point', self.select)
+        # Handle-Auswahl der übrigen Keys bleibt erhalten
+        for attribute in ('select_left_handle', 'select_right_handle'):
+            handles = _read_keyframe_attribute(points, attribute, len(self), np.bool_)
+            handles[self._changed] = self.select[self._changed]
+            points.foreach_set(attribute, handles)
+        self._changed = None
+        return True
+
+
+class TimelineFrameIndex:
+    """Frames der Keys aller sichtbaren F-Curves in einem sortierten Array, dazu die Auswahl."""
+    __slots__ = ('frames', 'selected_range', 'multi_key_selection')
+
+    def __init__(self, frame_indices):
+        frame_indices = list(frame_indices)
+        # Die stabile Sortierung verschmilzt die bereits sortierten Läufe der einzelnen Kurven
+        self.frames = np.sort(np.concatenate([frame_index.sorted_frames for frame_index in frame_indices]
+                                             or [np.empty(0)]), kind='stable')
+        ranges = [frame_index.selected_range() for frame_index in frame_indices]
+        ranges = [selected_range for selected_range in ranges if selected_range is not None]
+        self.selected_range = (min(start for start, _ in ranges), max(end for _, end in ranges)) if ranges else None
+        self.multi_key_selection = any(np.count_nonzero(frame_index.select) > 1 for frame_index in frame_indices)
+
+    @classmethod
+    def from_snapshots(cls, snapshots):
+        return cls(CurveFrameIndex.from_snapshot(snapshot) for snapshot in snapshots)
+
+    def previous_before(self, frame):
+        """Größter Frame links von frame, None wenn es keinen gibt."""
+        position = int(np.searchsorted(self.frames, frame, side='left'))
+        return float(self.frames[position - 1]) if position > 0 else None
+
+    def next_after(self, frame):
+        """Kleinster Frame rechts von frame, None wenn es keinen gibt."""
+        position = int(np.searchsorted(self.frames, frame, side='right'))
+        return float(self.frames[position]) if position < len(self.frames) else None
+
+    def timeline_range(self):
+        """(start, end) der Timeline ohne Vor- und Nachlauf, None ohne Auswahl."""
+        if self.selected_range is None:
+            return None
+        start, end = self.selected_range
+        # Mehrere Keys auf einer Kurve: nur die Auswahl, sonst bis zu den Nachbar-Keys der gesamten Auswahl
+        if self.multi_key_selection:
+            return start, end
+        previous_frame = self.previous_before(start)
+        next_frame = self.next_after(end)
+        return (start if previous_frame is None else previous_frame,
+                end if next_frame is None else next_frame)
+
+
+def tag_redraw_key_editors(context):
+    # foreach_set löst keine Notifier aus: Editoren mit Key-Auswahl selbst neu zeichnen
+    for area in context.screen.areas:
+        if area.type in {'GRAPH_EDITOR', 'DOPESHEET_EDITOR'}:
+            area.tag_redraw()
+
+
+class KeyframeWriteBack:
+    """Sammelt die in einem Modal-Schritt geänderten CurveSnapshots und schreibt sie gebündelt zurück."""
+    __slots__ = ('_dirty',)
+
+    def __init__(self):
+        self._dirty = {}
+
+    def mark(self, snapshot, *attributes):
+        entry = self._dirty.get(id(snapshot))
+        if entry is None:
+            entry = self._dirty[id(snapshot)] = (snapshot, set())
+        entry[1].update(attributes)
+
+    def flush(self, update=True):
+        """Schreibt alle geänderten F-Curves zurück; update=False markiert sie nur, ohne Keys neu zu sortieren."""
+        for snapshot, attributes in self._dirty.values():
+            points = snapshot.fcurve.keyframe_points
+            for attribute in attributes:
+                values = getattr(snapshot, attribute)
+                if values.dtype == np.int8:
+                    points.foreach_set(attribute, values.astype(np.int32))
+                else:
+                    points.foreach_set(attribute, values.astype(np.float32).ravel())
+            if update:
+                snapshot.fcurve.update()
+            else:
+                snapshot.fcurve.id_data.update_tag()
+        self._dirty.clear()
+
+
+class KeyframeSelection:
+    """Struct-of-Arrays-Kopie der Keys, mit denen ein Modal-Operator arbeitet, eine Zeile pro Key."""
+    __slots__ = ('curves', 'curve_id', 'index', 'co', 'handle_left_vec', 'handle_right_vec',
+                 'handle_left_type', 'handle_right_type', 'preview_rows', '_groups', '_write_back', '_deferred')
+
+    def __init__(self, entries, write_back):
+        grouped = {}
+        for snapshot, keyframe_index in entries:
+            grouped.setdefault(id(snapshot), (snapshot, []))[1].append(keyframe_index)
+
+        self.curves = [snapshot for snapshot, _ in grouped.values()]
+        indices = [np.asarray(keyframe_indices, dtype=np.int32) for _, keyframe_indices in grouped.values()]
+        counts = [len(keyframe_indices) for keyframe_indices in indices]
+
+        self.curve_id = np.repeat(np.arange(len(self.curves), dtype=np.int32), counts)
+        self.index = np.concatenate(indices) if indices else np.empty(0, dtype=np.int32)
+        self.co = self._gather('co', indices)
+        self.handle_left_vec = self._gather('handle_left', indices) - self.co
+        self.handle_right_vec = self._gather('handle_right', indices) - self.co
+        self.handle_left_type = self._gather('handle_left_type', indices)
+        self.handle_right_type = self._gather('handle_right_type', indices)
+
+        bounds = np.concatenate(([0], np.cumsum(counts))).tolist()
+        self._groups = [(snapshot, keyframe_indices, start, stop)
+                        for snapshot, keyframe_indices, start, stop in zip(self.curves, indices, bounds, bounds[1:])]
+        self._write_back = write_back
+        self.preview_rows = None
+        self._deferred = {}
+
+    def _gather(self, attribute, indices):
+        if not indices:
+            return np.empty((0, 2) if attribute in ('co', 'handle_left', 'handle_right') else 0)
+        return np.concatenate([getattr(snapshot, attribute)[keyframe_indices]
+                               for snapshot, keyframe_indices in zip(self.curves, indices)])
+
+    def __len__(self):
+        return len(self.index)
+
+    def data_paths(self):
+        """data_path jeder Zeile, z.B. für die Zufallswerte pro Knochen."""
+        paths = [snapshot.data_path for snapshot in self.curves]
+        return [paths[curve_id] for curve_id in self.curve_id.tolist()]
+
+    def neighbour_co(self, offset):
+        """(co, valid) des Keys ``offset`` Positionen weiter auf derselben F-Curve, für jede Zeile."""
+        co = np.empty_like(self.co)
+        valid = np.zeros(len(self), dtype=bool)
+        for snapshot, keyframe_indices, selected in self._groups_for(None):
+            neighbour = keyframe_indices + offset
+            valid[selected] = (neighbour >= 0) & (neighbour < len(snapshot))
+            co[selected] = snapshot.co[np.clip(neighbour, 0, len(snapshot) - 1)]
+        return co, valid
+
+    @property
+    def handle_left(self):
+        return self.co + self.handle_left_vec
+
+    @property
+    def handle_right(self):
+        return self.co + self.handle_right_vec
+
+    def _groups_for(self, rows):
+        for snapshot, keyframe_indices, start, stop in self._groups:
+            if rows is None:
+                yield snapshot, keyframe_indices, slice(start, stop)
+            else:
+                group_rows = np.flatnonzero(rows[start:stop])
+                if len(group_rows):
+                    yield snapshot, keyframe_indices[group_rows], group_rows + start
+
+    def _preview(self, rows, **arrays):
+        # Ohne explizite Zeilen nur die Vorschau-Zeilen schreiben, die vollen Arrays für apply_deferred() merken
+        if rows is not None or self.preview_rows is None:
+            return rows
+        self._deferred.update((name, values) for name, values in arrays.items() if values is not None)
+        return self.preview_rows
+
+    def write_co(self, co, rows=None):
+        rows = self._preview(rows, co=co)
+        for snapshot, keyframe_indices, selected in self._groups_for(rows):
+            snapshot.co[keyframe_indices] = co[selected]
+            self._write_back.mark(snapshot, 'co')
+
+    def write_handles(self, left=None, right=None, rows=None):
+        """Setzt absolute Handle-Positionen, (n, 2) Arrays über alle Zeilen der Auswahl."""
+        rows = self._preview(rows, left=left, right=right)
+        free = HANDLE_TYPE_CODES['FREE']
+        for snapshot, keyframe_indices, selected in self._groups_for(rows):
+            if left is not None:
+                snapshot.handle_left[keyframe_indices] = left[selected]
+                self._write_back.mark(snapshot, 'handle_left')
+            if right is not None:
+                snapshot.handle_right[keyframe_indices] = right[selected]
+                self._write_back.mark(snapshot, 'handle_right')
+            if (snapshot.handle_left_type[keyframe_indices] != free).any() or \
+                    (snapshot.handle_right_type[keyframe_indices] != free).any():
+                snapshot.handle_left_type[keyframe_indices] = free
+                snapshot.handle_right_type[keyframe_indices] = free
+                self._write_back.mark(snapshot, 'handle_left_type', 'handle_right_type')
+
+    def write_deferred(self, rows):
+        """Schreibt die zuletzt gesetzten vollen Arrays in rows (boolesche Maske über alle Zeilen)."""
+        deferred = self._deferred
+        if 'co' in deferred:
+            self.write_co(deferred['co'], rows)
+        if 'left' in deferred or 'right' in deferred:
+            self.write_handles(deferred.get('left'), deferred.get('right'), rows)
+
+    def apply_deferred(self):
+        """Schreibt die zuletzt gesetzten Werte auch in die Zeilen außerhalb von preview_rows."""
+        if self.preview_rows is None:
             return
+        self.write_deferred(~self.preview_rows)
+        self.preview_rows = None
+        self._deferred = {}
+
+    def write_handle_types(self, left, right, bezier=False):
+        for snapshot, keyframe_indices, selected in self._groups_for(None):
+            snapshot.handle_left_type[keyframe_indices] = left[selected] if np.ndim(left) else left
+            snapshot.handle_right_type[keyframe_indices] = right[selected] if np.ndim(right) else right
+            self._write_back.mark(snapshot, 'handle_left_type', 'handle_right_type')
+            if bezier:
+                snapshot.interpolation[keyframe_indices] = INTERPOLATION_BEZIER
+                self._write_back.mark(snapshot, 'interpolation')
+
+    def confirm(self, bezier=False):
+        """Setzt die Handles der Keys auf den Typ 'ALIGNED' (optional mit Bezier-Interpolation)."""
+        aligned = HANDLE_TYPE_CODES['ALIGNED']
+        self.write_handle_types(aligned, aligned, bezier)
+
+    def restore(self):
+        """Setzt Keys und Handles auf ihre ursprüngliche Position und ihren Typ zurück."""
+        self.preview_rows = None
+        self._deferred = {}
+        self.write_co(self.co)
+        for snapshot, keyframe_indices, selected in self._groups_for(None):
+            snapshot.handle_left[keyframe_indices] = self.co[selected] + self.handle_left_vec[selected]
+            snapshot.handle_right[keyframe_indices] = self.co[selected] + self.handle_right_vec[selected]
+            self._write_back.mark(snapshot, 'handle_left', 'handle_right')
+        self.write_handle_types(self.handle_left_type, self.handle_right_type)
+
+    def flush(self, update=True):
+        self._write_back.flush(update)
+
+
+def select_keyframes(entries, write_back=None):
+    """Baut eine KeyframeSelection aus (CurveSnapshot, keyframe_index)-Paaren."""
+    return KeyframeSelection(entries, write_back if write_back is not None else KeyframeWriteBack())
+
+
+def _polar(vectors):
+    length = np.hypot(vectors[:, 0], vectors[:, 1])
+    angle = np.arctan2(vectors[:, 1], vectors[:, 0])
+    unit = np.divide(vectors, length[:, None], out=np.zeros_like(vectors), where=length[:, None] > 0)
+    return length, angle, unit
+
+
+class HandlePolar:
+    """Polarform der anfänglichen Handle-Vektoren einer KeyframeSelection, einmal in invoke() berechnet."""
+    __slots__ = ('left_length', 'left_angle', 'left_unit', 'right_length', 'right_angle', 'right_unit')
+
+    def __init__(self, selection):
+        self.left_length, self.left_angle, self.left_unit = _polar(selection.handle_left_vec)
+        self.right_length, self.right_angle, self.right_unit = _polar(selection.handle_right_vec)
+
+
+def polar_handles(co, length, angle):
+    """Absolute Handle-Positionen aus Länge und Winkel relativ zu den Keys."""
+    return co + np.column_stack((length * np.cos(angle), length * np.sin(angle)))
+
+
+def _bone_name(data_path):
+    # 'pose.bones["BoneName"].location' -> "BoneName", None für nicht-Knochen-Pfade
+    try:
+        return data_path.split('"')[1]
+    except IndexError:
+        return None
+
+
+class RandomDraws:
+    """Zufallswerte in [-1, 1] für jede Zeile einer KeyframeSelection, pro Seed gecacht."""
+    __slots__ = ('_data_paths', '_bone_paths_only', '_groups', '_cache', '_maxsize')
+
+    def __init__(self, selection, bone_paths_only=False, maxsize=8):
+        self._data_paths = selection.data_paths()
+        self._bone_paths_only = bone_paths_only
+        self._groups = {}
+        self._cache = OrderedDict()
+        self._maxsize = maxsize
+
+    def _groups_for(self, per_bone):
+        groups = self._groups.get(per_bone)
+        if groups is None:
+            if per_bone:
+                bone_ids = {}
+                groups = [-1 if self._bone_paths_only and not data_path.startswith('pose.bones[')
+                          else bone_ids.setdefault(_bone_name(data_path), len(bone_ids))
+                          for data_path in self._data_paths]
+            else:
+                groups = range(len(self._data_paths))
+            groups = self._groups[per_bone] = np.array(groups, dtype=np.int32)
+        return groups
 
-        new_frame_start = min_frame_selected
-        if min_index > 0:
-            new_frame_start = sorted_visible_frames[min_index - 1]
-            
-        new_frame_end = max_frame_selected
-        if max_index < len(sorted_visible_frames) - 1:
-            new_frame_end = sorted_visible_frames[max_index + 1]
+    def unit(self, seed, per_bone=False):
+        key = (seed, per_bone)
+        draws = self._cache.get(key)
+        if draws is not None:
+            self._cache.move_to_end(key)
+            return draws
 
-        context.scene.frame_start = int(new_frame_start - preframes)
-        context.scene.frame_end = int(new_frame_end + postframes)
-    
+        groups = self._groups_for(per_bone)
+        rng = random.Random(seed)
+        group_count = int(groups.max()) + 1 if len(groups) else 0
+        # Der angehängte 0.0-Wert ist das Ziel von Gruppe -1 (Zeilen ohne Zufallswert)
+        group_draws = np.array([rng.uniform(-1.0, 1.0) for _ in range(group_count)] + [0.0])
+        draws = self._cache[key] = group_draws[groups]
+        if len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+        return draws
+
+
+# Poll-Cache: Zusammenfassung der Key-Auswahl, geteilt von allen poll()-Methoden
+
+class SelectionSummary:
+    """Was die poll()-Methoden über die ausgewählten Keys einer Menge F-Curves wissen müssen."""
+    __slots__ = ('has_selected_keys', 'max_selected_per_curve')
+
+    def __init__(self, fcurves):
+        counts = [int(np.count_nonzero(_read_keyframe_attribute(
+                      fcurve.keyframe_points, 'select_control_point', len(fcurve.keyframe_points), np.bool_)))
+                  for fcurve in fcurves]
+        self.max_selected_per_curve = max(counts, default=0)
+        self.has_selected_keys = self.max_selected_per_curve > 0
+
+
+# Gilt bis zum nächsten Redraw des Panels oder einer Änderung der Auswahl, Schlüssel ist all_fcurves
+_selection_summaries = {}
+
+
+def invalidate_selection_summary(*args):
+    """Verwirft die gecachten SelectionSummaries (Panel-Redraw, depsgraph-Handler, Auswahl-Operatoren)."""
+    _selection_summaries.clear()
+
+
+def _polled_by_sidebar(context):
+    region, area = context.region, context.area
+    return region is not None and region.type == 'UI' and area is not None and area.type == 'GRAPH_EDITOR'
+
+
+def selection_summary(context, all_fcurves=False):
+    """SelectionSummary der sichtbaren, ausgewählten F-Curves (all_fcurves: aller F-Curves der Auswahl)."""
+    # Klick-Auswahl im Graph Editor sendet nur Notifier, die Sidebar zeichnet daraufhin neu und verwirft den Cache.
+    # Keymap-Polls haben keinen solchen Redraw vor sich und lesen immer direkt.
+    cached = _polled_by_sidebar(context)
+    if cached:
+        summary = _selection_summaries.get(all_fcurves)
+        if summary is not None:
+            return summary
+
+    if all_fcurves:
+        fcurves = [fcurve for obj in context.selected_objects if obj.animation_data and obj.animation_data.action
+                   for fcurve in obj.animation_data.action.fcurves]
     else:
-        # Fall 2: Auf mindestens einer F-Kurve wurden mehrere Keys ausgewählt.
-        # Beschränke den Bereich auf die Auswahl selbst.
-        context.scene.frame_start = int(min_frame_selected - preframes)
-        context.scene.frame_end = int(max_frame_selected + postframes)
-            
+        fcurves = context.selected_visible_fcurves or []
+    summary = SelectionSummary(fcurves)
+    if cached:
+        _selection_summaries[all_fcurves] = summary
+    return summary
+
+
+@bpy.app.handlers.persistent
+def _selection_summary_depsgraph_handler(scene, depsgraph=None):
+    invalidate_selection_summary()
+
+
+# Undo der Key-Navigation: gehaltene Tasten ergeben einen Undo-Schritt
+
+class NavigationUndo:
+    """Setzt die Undo-Schritte der Key-Navigation, auf Wunsch einen pro gehaltener Taste."""
+    __slots__ = ('message', 'frame_changing', '_window', '_screen', '_callback')
+
+    def __init__(self):
+        self.message = None
+        self.frame_changing = False
+        self._window = None
+        self._screen = None
+        # Gebundene Methode einmal merken: is_registered/unregister brauchen dasselbe Objekt
+        self._callback = self._push
+
+    @property
+    def pending(self):
+        return self.message is not None
+
+    def push(self, context, message):
+        scene = context.scene
+        if not scene.coalesce_navigation_undo:
+            self.flush()
+            self._undo_push(message)
+            return
+
+        # Verschiedene Operatoren in einem Schub: allgemeiner Name
+        self.message = message if self.message in (None, message) else "Key Navigation"
+        self._window = context.window
+        self._screen = context.screen
+        if bpy.app.timers.is_registered(self._callback):
+            bpy.app.timers.unregister(self._callback)
+        bpy.app.timers.register(self._callback, first_interval=scene.navigation_undo_delay)
+
+    def set_frame(self, scene, frame):
+        """Frame der Navigation setzen, ohne dass dessen Depsgraph-Update den Undo-Schritt setzt."""
+        self.frame_changing = True
+        scene.frame_current = frame
+
+    def flush(self):
+        """Ausstehenden Undo-Schritt sofort setzen."""
+        if self.pending:
+            self.cancel_timer()
+            self._push()
+
+    def cancel(self):
+        """Ausstehenden Undo-Schritt verwerfen."""
+        self.message = None
+        self.frame_changing = False
+        self._window = self._screen = None
+        self.cancel_timer()
+
+    def cancel_timer(self):
+        if bpy.app.timers.is_registered(self._callback):
+            bpy.app.timers.unregister(self._callback)
+
+    def _push(self):
+        message, self.message = self.message, None
+        window, screen = self._window, self._screen
+        self._window = self._screen = None
+        if message is None:
+            return None
+        if window is None:
+            self._undo_push(message)
+        else:
+            # Timer laufen ohne Fenster und Screen im Kontext, der Poll von ed.undo_push braucht beide
+            with bpy.context.temp_override(window=window, screen=screen):
+                self._undo_push(message)
+        return None
+
+    @staticmethod
+    def _undo_push(message):
+        # blender --background hat weder Fenster noch Undo-Verlauf: ed.undo_push würde an seinem Poll scheitern
+        if bpy.app.background or not bpy.ops.ed.undo_push.poll():
+            return
+        bpy.ops.ed.undo_push(message=message)
+
+
+navigation_undo = NavigationUndo()
+
+
+@bpy.app.handlers.persistent
+def _navigation_flush_handler(*args):
+    # Undo/Redo: den ausstehenden Schritt zuerst setzen, sonst nimmt Strg+Z den Schritt davor zurück
+    navigation_undo.flush()
+
+
+@bpy.app.handlers.persistent
+def _navigation_depsgraph_handler(*args):
+    # Andere Änderungen an der Szene bekommen ihren Schritt nach der Navigation, außer dem eigenen Framewechsel
+    if not navigation_undo.frame_changing:
+        navigation_undo.flush()
+
+
+@bpy.app.handlers.persistent
+def _navigation_frame_change_handler(*args):
+    navigation_undo.frame_changing = False
+
+
+@bpy.app.handlers.persistent
+def _navigation_cancel_handler(*args):
+    # Laden: ausstehende Undo-Schritte der Navigation verwerfen
+    navigation_undo.cancel()
+
+
+NAVIGATION_UNDO_HANDLERS = (
+    ('undo_pre', _navigation_flush_handler),
+    ('redo_pre', _navigation_flush_handler),
+    ('depsgraph_update_pre', _navigation_depsgraph_handler),
+    ('frame_change_post', _navigation_frame_change_handler),
+    ('load_pre', _navigation_cancel_handler),
+)
+
+
+# Modal-Scheduling: MOUSEMOVE-Events bündeln, höchstens eine Neuberechnung pro Tick-Budget
+
+class MouseMoveEvent:
+    """Kopie der Event-Felder, die modal() liest, für ein zurückgestelltes MOUSEMOVE."""
+    __slots__ = ('type', 'value', 'mouse_x', 'mouse_y', 'alt', 'shift', 'ctrl')
+
+    def __init__(self, event):
+        self.type = 'MOUSEMOVE'
+        self.value = event.value
+        self.mouse_x = event.mouse_x
+        self.mouse_y = event.mouse_y
+        self.alt = event.alt
+        self.shift = event.shift
+        self.ctrl = event.ctrl
+
+
+class ModalScheduler:
+    """Fasst die MOUSEMOVE-Events eines Zieh-Operators auf eine Neuberechnung pro Tick-Budget zusammen."""
+    __slots__ = ('budget', 'pending', 'ticks', 'over_budget', 'slowest', '_last_tick', '_timer',
+                 '_background_interval', '_last_background_redraw')
+
+    def __init__(self, context):
+        self.budget = context.scene.modal_tick_budget / 1000.0
+        self.pending = None
+        self.ticks = 0
+        self.over_budget = 0
+        self.slowest = 0.0
+        self._last_tick = None
+        self._timer = context.window_manager.event_timer_add(self.budget, window=context.window)
+        self._background_interval = 1.0 / context.scene.background_redraw_rate
+        self._last_background_redraw = None
+
+    def due(self):
+        return self._last_tick is None or time.perf_counter() - self._last_tick >= self.budget
+
+    def run(self, modal, operator, context, event):
+        start = time.perf_counter()
+        result = modal(operator, context, event)
+        self._last_tick = time.perf_counter()
+
+        duration = self._last_tick - start
+        self.ticks += 1
+        self.slowest = max(self.slowest, duration)
+        if duration > self.budget:
+            self.over_budget += 1
+        return result
+
+    def redraw(self, context):
+        """Graph Editor des Operators bei jedem Tick, alle anderen höchstens mit background_redraw_rate."""
+        now = time.perf_counter()
+        if context.area is None or self._last_background_redraw is None or \
+                now - self._last_background_redraw >= self._background_interval:
+            self._last_background_redraw = now
+            tag_redraw_animation_areas(context)
+        else:
+            context.area.tag_redraw()
+
+    def finish(self, operator, context):
+        context.window_manager.event_timer_remove(self._timer)
+        tag_redraw_animation_areas(context)
+        if self.over_budget:
+            operator.report({'WARNING'}, f"{self.over_budget} of {self.ticks} updates exceeded the "
+                                         f"{self.budget * 1000.0:.1f} ms budget (slowest {self.slowest * 1000.0:.1f} ms)")
+
+
+def tag_redraw_animation_areas(context):
+    for area in context.screen.areas:
+        if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
+            area.tag_redraw()
+
+
+def redraw_areas(operator, context):
+    """Redraw nach einem Modal-Schritt, gedrosselt über den ModalScheduler des Operators."""
+    scheduler = getattr(operator, '_scheduler', None)
+    if scheduler is None:
+        tag_redraw_animation_areas(context)
+    else:
+        scheduler.redraw(context)
+
+
+def coalesce_mousemove(modal):
+    """Dekorator für modal(): bündelt MOUSEMOVE-Events über einen ModalScheduler."""
+    @functools.wraps(modal)
+    def wrapper(self, context, event):
+        scheduler = getattr(self, '_scheduler', None)
+        if scheduler is None:
+            scheduler = self._scheduler = ModalScheduler(context)
+
+        if event.type == 'MOUSEMOVE':
+            if not scheduler.due():
+                scheduler.pending = MouseMoveEvent(event)
+                return {'RUNNING_MODAL'}
+            scheduler.pending = None
+            result = scheduler.run(modal, self, context, event)
+        elif event.type == 'TIMER' and scheduler.pending is not None:
+            pending, scheduler.pending = scheduler.pending, None
+            result = scheduler.run(modal, self, context, pending)
+        else:
+            # Ausstehende Mausbewegung vor dem Event anwenden; beim Abbrechen wird sie verworfen
+            pending, scheduler.pending = scheduler.pending, None
+            result = {'RUNNING_MODAL'}
+            if pending is not None and event.type not in {'RIGHTMOUSE', 'ESC'}:
+                result = scheduler.run(modal, self, context, pending)
+            if 'RUNNING_MODAL' in result:
+                result = modal(self, context, event)
+
+        if 'RUNNING_MODAL' not in result:
+            scheduler.finish(self, context)
+            self._scheduler = None
+        return result
+    return wrapper
+
+
+# --- NEUE FUNKTION: Setzt den Timeline-Bereich basierend auf den ausgewählten Keyframes ---
+def set_timeline_range_to_selected(context, snapshots=None):
+    """Setzt den Timeline-Bereich auf die Auswahl; mit snapshots ohne erneutes Lesen der F-Curves."""
+    if snapshots is not None:
+        timeline = TimelineFrameIndex.from_snapshots(snapshots)
+    else:
+        timeline = TimelineFrameIndex(CurveFrameIndex(fcurve) for fcurve in context.selected_visible_fcurves)
+    frame_range = timeline.timeline_range()
+    if frame_range is None:
+        return
+
+    new_frame_start, new_frame_end = frame_range
+    context.scene.frame_start = int(new_frame_start - context.scene.additional_preframes)
+    context.scene.frame_end = int(new_frame_end + context.scene.additional_postframes)
+
+
+# Modal-Transform-Engine: gemeinsamer Ablauf aller Operatoren, die Keys per Maus ziehen
+
+# Anteil der sichtbaren Breite, um den der Vorschau-Bereich auf beiden Seiten erweitert wird
+PREVIEW_VIEW_MARGIN = 0.25
+
+
+def visible_frame_range(context, margin=PREVIEW_VIEW_MARGIN):
+    """Sichtbarer Frame-Bereich des Graph Editors plus margin, None außerhalb eines Graph Editors."""
+    area = context.area
+    if area is None or area.type != 'GRAPH_EDITOR':
+        return None
+    # Auch aus der Sidebar aufgerufen zählt der Hauptbereich des Editors
+    region = next((region for region in area.regions if region.type == 'WINDOW'), None)
+    if region is None:
+        return None
+
+    start, _ = region.view2d.region_to_view(0, 0)
+    end, _ = region.view2d.region_to_view(region.width, 0)
+    padding = (end - start) * margin
+    return start - padding, end + padding
+
+
+def selected_keyframes(snapshots, mask=None):
+    """(CurveSnapshot, keyframe_index)-Paare der ausgewählten Keys.
+
+    mask(snapshot) kann die Auswahl pro F-Curve mit einem booleschen Array weiter einschränken.
+    """
+    entries = []
+    for snapshot in snapshots:
+        selected = snapshot.select if mask is None else snapshot.select & mask(snapshot)
+        entries.extend((snapshot, keyframe_index) for keyframe_index in np.flatnonzero(selected))
+    return entries
+
+
+def select_keyframe_bounds(snapshots):
+    """Erster und letzter ausgewählter Key jeder F-Curve als zwei KeyframeSelections, None ohne solche Kurve."""
+    first_keyframes = []
+    last_keyframes = []
+    for snapshot in snapshots:
+        bounds = snapshot.selected_bounds()
+        if bounds is not None:
+            first_keyframes.append((snapshot, bounds[0]))
+            last_keyframes.append((snapshot, bounds[1]))
+    if not first_keyframes:
+        return None
+
+    write_back = KeyframeWriteBack()
+    return select_keyframes(first_keyframes, write_back), select_keyframes(last_keyframes, write_back)
+
+
+class ProgressivePreview:
+    """Schreibt die bei einem Zieh-Schritt übersprungenen Zeilen stückweise nach, während Blender untätig ist."""
+    __slots__ = ('selections', 'fill_rows', 'chunk', 'update', '_screen', '_pending', '_callback')
+
+    def __init__(self, selections, fill_rows, chunk, update, screen):
+        self.selections = selections
+        self.fill_rows = fill_rows
+        self.chunk = chunk
+        self.update = update
+        self._screen = screen
+        self._pending = []
+        # Gebundene Methode einmal merken: is_registered/unregister brauchen dasselbe Objekt
+        self._callback = self._step
+
+    def restart(self):
+        self._pending = [(selection, rows) for selection, rows in zip(self.selections, self.fill_rows)]
+        if not bpy.app.timers.is_registered(self._callback):
+            bpy.app.timers.register(self._callback, first_interval=0.0)
+
+    def cancel(self):
+        self._pending = []
+        if bpy.app.timers.is_registered(self._callback):
+            bpy.app.timers.unregister(self._callback)
+
+    def _step(self):
+        if not self._pending:
+            return None
+        selection, rows = self._pending.pop()
+        row_indices = np.flatnonzero(rows)
+        if len(row_indices) > self.chunk:
+            # Rest für den nächsten Aufruf zurücklegen
+            rest = rows.copy()
+            rest[row_indices[:self.chunk]] = False
+            self._pending.append((selection, rest))
+            rows = rows & ~rest
+        try:
+            selection.write_deferred(rows)
+            selection.flush(self.update)
+        except ReferenceError:
+            # F-Curves wurden während des Ziehens entfernt (z.B. Datei neu geladen)
+            self._pending = []
+            return None
+        for area in self._screen.areas:
+            if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
+                area.tag_redraw()
+        return 0.0 if self._pending else None
+
+
+class KeyframeTransformOperator:
+    """Gemeinsamer Modal-Ablauf der Operatoren, die ausgewählte Keys mit der Maus ziehen."""
+    # Mindestanzahl ausgewählter Keys auf einer F-Curve für poll()
+    min_selected_per_curve = 1
+    # Cursor auch am oberen und unteren Fensterrand umbrechen
+    warp_y = False
+    # Erst beim Loslassen der linken Maustaste bestätigen (Click-Drag-Operatoren)
+    confirm_on_release = False
+    # confirm() setzt zusätzlich Bezier-Interpolation
+    confirm_bezier = False
+    # False für Operatoren, die Keys auf X verschieben: fcurve.update() würde sie neu sortieren
+    update_curves = True
+    # Timeline beim Start auf die Auswahl setzen; sonst passt transform() sie selbst an
+    follow_selection_range = True
+    drag_cursor = 'SCROLL_X'
+    # Weitere Attribute, die nur während einer Sitzung gelten und am Ende freigegeben werden
+    session_attributes = ('_selection',)
+    # Beim Start während der Wiedergabe auf den Anfang des Timeline-Bereichs springen
+    jump_to_frame_start = True
+
+    _selection = None
+    _selections = ()
+    _progressive = None
+    _timings = NO_TIMER
+    _profiler = None
+    _initial_frame_start = None
+    _initial_frame_end = None
+    initial_mouse_x = None
+    initial_mouse_y = None
+
+    @classmethod
+    def poll(cls, context):
+        if not (context.active_object and
+                context.active_object.animation_data and
+                context.active_object.animation_data.action and
+                context.selected_visible_fcurves):
+            return False
+
+        return selection_summary(context).max_selected_per_curve >= cls.min_selected_per_curve
+
+    def prepare(self, context, snapshots):
+        """KeyframeSelections der Sitzung, None nach einer Meldung; Standard: alle ausgewählten Keys."""
+        entries = selected_keyframes(snapshots)
+        if not entries:
+            self.report({'WARNING'}, "Keine Keyframes ausgewählt.")
+            return None
+        self._selection = select_keyframes(entries)
+        return (self._selection,)
+
+    def transform(self, context, event, delta_x, delta_y):
+        """Schreibt die Keys für den aktuellen Mausversatz; Standard: keine Änderung."""
+        pass
+
+    def wheel(self, context, event):
+        pass
+
+    def confirm(self, context):
+        """Setzt die Handles aller Keys auf 'ALIGNED'."""
+        for selection in self._selections:
+            selection.confirm(bezier=self.confirm_bezier)
+
+    def _warp_cursor(self, context, event):
+        # Am Fensterrand auf die andere Seite springen; der Startwert wandert mit, die Bewegung läuft nahtlos weiter
+        if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
+            new_x = context.window.width - 10 if event.mouse_x < 5 else 10
+            self.initial_mouse_x += new_x - event.mouse_x
+            context.window.cursor_warp(new_x, event.mouse_y)
+
+        if self.warp_y and (event.mouse_y < 5 or event.mouse_y > context.window.height - 5):
+            new_y = context.window.height - 10 if event.mouse_y < 5 else 10
+            self.initial_mouse_y += new_y - event.mouse_y
+            context.window.cursor_warp(event.mouse_x, new_y)
+
+    def _setup_preview(self, context):
+        # Während des Ziehens nur Keys im sichtbaren Bereich aktualisieren
+        frame_range = visible_frame_range(context) if context.scene.preview_visible_keys else None
+        previewed = []
+        for selection in self._selections:
+            frames = selection.co[:, 0]
+            if frame_range is None:
+                previewed.append(np.ones(len(frames), dtype=bool))
+            else:
+                previewed.append((frames >= frame_range[0]) & (frames <= frame_range[1]))
+
+        # Große Auswahl: pro Tick nur jeden stride-ten Key, der Rest folgt im Leerlauf
+        threshold = context.scene.progressive_preview_keys
+        count = sum(int(np.count_nonzero(rows)) for rows in previewed)
+        stride = math.ceil(count / threshold) if threshold and count > threshold else 1
+
+        fill_rows = []
+        for selection, rows in zip(self._selections, previewed):
+            if stride > 1:
+                subset = rows & ((np.cumsum(rows) - 1) % stride == 0)
+                fill_rows.append(rows & ~subset)
+                rows = subset
+            if not rows.all():
+                selection.preview_rows = rows
+        if stride > 1:
+            self._progressive = ProgressivePreview(self._selections, fill_rows, threshold,
+                                                   self.update_curves, context.screen)
+
+    def _finish(self, context, result):
+        if self._progressive is not None:
+            self._progressive.cancel()
+            self._progressive = None
+        # Wie bei jedem Schritt: update() berechnet auch die Auto-Handles der Nachbarn wieder aus den alten Positionen
+        self._selections[0].flush(update=self.update_curves)
+        self._selections = ()
+        for attribute in self.session_attributes:
+            setattr(self, attribute, None)
+
+        context.scene.frame_start = self._initial_frame_start
+        context.scene.frame_end = self._initial_frame_end
+        context.window.cursor_set('DEFAULT')
+        self._stop_profiler(result)
+        return result
+
+    def _stop_profiler(self, result):
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return
+        try:
+            paths = profiler.stop(result)
+        except OSError as error:
+            self.report({'WARNING'}, f"Profile not written: {error}")
+        else:
+            self.report({'INFO'}, f"Profile written to {paths[0]}")
+
+    @coalesce_mousemove
+    def modal(self, context, event):
+        timings = self._timings
+        timings.start()
+        if event.type == 'MOUSEMOVE':
+            self._warp_cursor(context, event)
+            self.transform(context, event, event.mouse_x - self.initial_mouse_x, event.mouse_y - self.initial_mouse_y)
+
+        elif event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
+            self.wheel(context, event)
+
+        elif event.type == 'LEFTMOUSE' and (event.value == 'RELEASE' or not self.confirm_on_release):
+            # Beim Bestätigen auch die Keys außerhalb der Vorschau, zusammen mit den Handle-Typen in einem Durchgang
+            for selection in self._selections:
+                selection.apply_deferred()
+            self.confirm(context)
+            result = self._finish(context, {'FINISHED'})
+            timings.lap('confirm')
+            return result
+
+        elif event.type in {'RIGHTMOUSE', 'ESC'}:
+            for selection in self._selections:
+                selection.restore()
+            result = self._finish(context, {'CANCELLED'})
+            timings.lap('cancel')
+            return result
+
+        else:
+            return {'RUNNING_MODAL'}
+        timings.lap('compute')
+
+        # Alle Selections teilen sich einen Write-Back: ein foreach_set pro geändertem Attribut und F-Curve
+        self._selections[0].flush(update=self.update_curves)
+        if self._progressive is not None:
+            self._progressive.restart()
+        timings.lap('write_back')
+        redraw_areas(self, context)
+        timings.lap('redraw')
+        return {'RUNNING_MODAL'}
+
+    def invoke(self, context, event):
+        # Ein ausstehender Navigations-Undo-Schritt gehört vor den dieses Operators
+        navigation_undo.flush()
+        self._profiler = session_profiler(context, self)
+        if self._profiler is not None:
+            self._profiler.start()
+        self._timings = operator_timer(context, self)
+        snapshots = snapshot_curves(context.selected_visible_fcurves or [])
+        selections = self.prepare(context, snapshots)
+        if not selections:
+            self._timings.lap('invoke')
+            self._stop_profiler({'CANCELLED'})
+            return {'CANCELLED'}
+        self._selections = tuple(selections)
+        self._setup_preview(context)
+
+        self._initial_frame_start = context.scene.frame_start
+        self._initial_frame_end = context.scene.frame_end
+        if self.follow_selection_range and context.screen.is_animation_playing:
+            if not context.scene.keep_framerange:
+                set_timeline_range_to_selected(context, snapshots)
+            if self.jump_to_frame_start:
+                context.scene.frame_current = context.scene.frame_start
+
+        self.initial_mouse_x = event.mouse_x
+        self.initial_mouse_y = event.mouse_y
+
+        context.window.cursor_set(self.drag_cursor)
+        context.window_manager.modal_handler_add(self)
+        self._timings.lap('invoke')
+        return {'RUNNING_MODAL'}
+
+
+class KeyframeRandomizeOperator(KeyframeTransformOperator):
+    """Zufalls-Operatoren: die Maus bestimmt die Stärke, das Mausrad den Seed."""
+    session_attributes = ('_selection', '_random_draws')
+
+    _selection = None
+    _random_draws = None
+    _current_strength = 0.0
+    _current_seed = 0
+    # Faktor auf die Mausbewegung, bevor sie zur Stärke wird
+    _delta_scale = 1.0
+
+    def prepare(self, context, snapshots):
+        selections = super().prepare(context, snapshots)
+        if selections:
+            self._random_draws = RandomDraws(self._selection)
+        return selections
+
+    def randomize(self, context):
+        """Schreibt die Keys für Stärke und Seed; Standard: keine Änderung."""
+        pass
+
+    def transform(self, context, event, delta_x, delta_y):
+        # Quadratisch mit der Mausbewegung nach rechts, ALT für feinere Kontrolle
+        base_divisor = 1000.0 if event.alt else 200.0
+        self._current_strength = (max(0.0, delta_x * self._delta_scale) / base_divisor) ** 2.0
+        self.randomize(context)
+
+    def wheel(self, context, event):
+        self._current_seed += 1 if event.type == 'WHEELUPMOUSE' else -1
+        self.randomize(context)
+        self.report({'INFO'}, f"Seed: {self._current_seed}")
+
+
 # Eine globale Variable, um den Zustand zu speichern.
 _is_hidden = False
 
@@ -226,12 +1447,26 @@ class GRAPH_OT_select_next_keys(bpy.types.Operator):
     """Selects next keyframes of f-curves"""
     bl_idname = "graph.select_next_keys"
     bl_label = "Nächster Keyframe (Mehrfachauswahl)"
-    bl_options = {'UNDO'}
+    # Undo-Schritte setzt navigation_undo, bei gehaltener Taste zusammengefasst
+    bl_options = set()
+
+    steps: bpy.props.IntProperty(
+        name="Steps",
+        description="Number of keys the selection moves in one go",
+        default=1,
+        min=1
+    )
+    to_cursor: bpy.props.BoolProperty(
+        name="To Cursor",
+        description="Move the selection until its last key is the last key at or before the current frame",
+        default=False
+    )
     
     @classmethod
     def poll(cls, context):
         return context.area and context.area.type == 'GRAPH_EDITOR'
 
+    @timed_execute
     def execute(self, context):
         selected_objects_with_action = [obj for obj in context.selected_objects if obj.animation_data and obj.animation_data.action]
         
@@ -241,6 +1476,7 @@ class GRAPH_OT_select_next_keys(bpy.types.Operator):
 
         all_new_selection_frames = []
         has_selected_fcurves = False
+        until_frame = context.scene.frame_current if self.to_cursor else None
 
         for obj in selected_objects_with_action:
             # Korrigierte Logik: Schleife nur über die ausgewählten F-Kurven
@@ -250,47 +1486,40 @@ class GRAPH_OT_select_next_keys(bpy.types.Operator):
                 has_selected_fcurves = True
             
             for curve in selected_fcurves:
-                selected_keys = [k for k in curve.keyframe_points if k.select_control_point]
-                
-                if not selected_keys:
-                    sorted_keys = sorted(curve.keyframe_points, key=lambda k: k.co.x)
-                    if sorted_keys:
-                        last_key = sorted_keys[-1]
-                        last_key.select_control_point = True
-                        last_key.select_left_handle = True
-                        last_key.select_right_handle = True
-                        all_new_selection_frames.append(last_key.co.x)
+                frame_index = CurveFrameIndex(curve)
+                if not len(frame_index):
                     continue
                 
-                min_frame = min([k.co.x for k in selected_keys])
-                first_key = next((k for k in selected_keys if k.co.x == min_frame), None)
-                max_frame = max([k.co.x for k in selected_keys])
+                selected_range = frame_index.selected_range()
+                
+                if selected_range is None:
+                    frame_index.select_key(frame_index.last())
+                    frame_index.write_selection()
+                    all_new_selection_frames.append((1, frame_index.frames[frame_index.last()]))
+                    continue
                 
-                next_key = None
-                for key in curve.keyframe_points:
-                    if key.co.x > max_frame:
-                        if next_key is None or key.co.x < next_key.co.x:
-                            next_key = key
+                # Alle Schritte auf einmal: eine Auswertung, ein Undo-Schritt, ein Framewechsel
+                stepped = frame_index.step_selection(self.steps, forward=True, until_frame=until_frame)
                 
-                if next_key:
-                    if first_key:
-                        first_key.select_control_point = False
-                        first_key.select_left_handle = False
-                        first_key.select_right_handle = False
-                    
-                    next_key.select_control_point = True
-                    next_key.select_left_handle = True
-                    next_key.select_right_handle = True
-                    all_new_selection_frames.append(next_key.co.x)
+                if stepped is not None:
+                    next_index, steps = stepped
+                    frame_index.write_selection()
+                    all_new_selection_frames.append((steps, frame_index.frames[next_index]))
 
         if not has_selected_fcurves:
             self.report({'WARNING'}, "No curve channels selected")
             return {'CANCELLED'}
 
+        invalidate_selection_summary()
+        tag_redraw_key_editors(context)
+
         if all_new_selection_frames and not context.screen.is_animation_playing and not context.scene.keep_framerange:
-            min_frame_new_selection = max(all_new_selection_frames)
-            context.scene.frame_current = int(min_frame_new_selection)
+            # Wie bei Einzelschritten zählen nur die Kurven, die im letzten Schritt noch weiterkamen
+            last_step = max(steps for steps, _ in all_new_selection_frames)
+            min_frame_new_selection = max(frame for steps, frame in all_new_selection_frames if steps == last_step)
+            navigation_undo.set_frame(context.scene, int(min_frame_new_selection))
 
+        navigation_undo.push(context, self.bl_label)
         return {'FINISHED'}
 
 
@@ -301,13 +1530,27 @@ class GRAPH_OT_select_previous_keys(bpy.types.Operator):
     """Selects previous keyframes of f-curves"""
     bl_idname = "graph.select_previous_keys"
     bl_label = "Vorheriger Keyframe (Mehrfachauswahl)"
-    bl_options = {'UNDO'}
+    # Undo-Schritte setzt navigation_undo, bei gehaltener Taste zusammengefasst
+    bl_options = set()
+
+    steps: bpy.props.IntProperty(
+        name="Steps",
+        description="Number of keys the selection moves in one go",
+        default=1,
+        min=1
+    )
+    to_cursor: bpy.props.BoolProperty(
+        name="To Cursor",
+        description="Move the selection until its first key is the first key at or after the current frame",
+        default=False
+    )
     
     @classmethod
     def poll(cls, context):
         # Operator ist nur verfügbar, wenn der aktuelle Bereich der Graph-Editor ist
         return context.area and context.area.type == 'GRAPH_EDITOR'
 
+    @timed_execute
     def execute(self, context):
         selected_objects_with_action = [obj for obj in context.selected_objects if obj.animation_data and obj.animation_data.action]
         
@@ -317,6 +1560,7 @@ class GRAPH_OT_select_previous_keys(bpy.types.Operator):
 
         all_new_selection_frames = []
         has_selected_fcurves = False
+        until_frame = context.scene.frame_current if self.to_cursor else None
 
         for obj in selected_objects_with_action:
             # Filtere nur die F-Kurven, die im Graph-Editor ausgewählt sind
@@ -326,47 +1570,38 @@ class GRAPH_OT_select_previous_keys(bpy.types.Operator):
                 has_selected_fcurves = True
             
             for curve in selected_fcurves:
-                selected_keys = [k for k in curve.keyframe_points if k.select_control_point]
-                
-                if not selected_keys:
-                    sorted_keys = sorted(curve.keyframe_points, key=lambda k: k.co.x)
-                    if sorted_keys:
-                        first_key = sorted_keys[0]
-                        first_key.select_control_point = True
-                        first_key.select_left_handle = True
-                        first_key.select_right_handle = True
-                        all_new_selection_frames.append(first_key.co.x)
+                frame_index = CurveFrameIndex(curve)
+                if not len(frame_index):
                     continue
                 
-                min_frame = min([k.co.x for k in selected_keys])
+                selected_range = frame_index.selected_range()
                 
-                previous_key = None
-                for key in curve.keyframe_points:
-                    if key.co.x < min_frame:
-                        if previous_key is None or key.co.x > previous_key.co.x:
-                            previous_key = key
+                if selected_range is None:
+                    frame_index.select_key(frame_index.first())
+                    frame_index.write_selection()
+                    all_new_selection_frames.append((1, frame_index.frames[frame_index.first()]))
+                    continue
                 
-                if previous_key:
-                    max_frame = max([k.co.x for k in selected_keys])
-                    last_key = next((k for k in selected_keys if k.co.x == max_frame), None)
-                    if last_key:
-                        last_key.select_control_point = False
-                        last_key.select_left_handle = False
-                        last_key.select_right_handle = False
-                    
-                    previous_key.select_control_point = True
-                    previous_key.select_left_handle = True
-                    previous_key.select_right_handle = True
-                    all_new_selection_frames.append(previous_key.co.x)
+                stepped = frame_index.step_selection(self.steps, forward=False, until_frame=until_frame)
+                
+                if stepped is not None:
+                    previous_index, steps = stepped
+                    frame_index.write_selection()
+                    all_new_selection_frames.append((steps, frame_index.frames[previous_index]))
 
         if not has_selected_fcurves:
             self.report({'WARNING'}, "No curve channels selected")
             return {'CANCELLED'}
 
+        invalidate_selection_summary()
+        tag_redraw_key_editors(context)
+
         if all_new_selection_frames and not context.screen.is_animation_playing and not context.scene.keep_framerange:
-            min_frame_new_selection = min(all_new_selection_frames)
-            context.scene.frame_current = int(min_frame_new_selection)
+            last_step = max(steps for steps, _ in all_new_selection_frames)
+            min_frame_new_selection = min(frame for steps, frame in all_new_selection_frames if steps == last_step)
+            navigation_undo.set_frame(context.scene, int(min_frame_new_selection))
 
+        navigation_undo.push(context, self.bl_label)
         return {'FINISHED'}
 
 
@@ -374,23 +1609,19 @@ class GRAPH_OT_add_next_keys(bpy.types.Operator):
     """add keyframe to selection on the right"""
     bl_idname = "graph.add_next_keys"
     bl_label = "Keyframe rechts hinzufügen"
-    bl_options = {'UNDO'}
+    # Undo-Schritte setzt navigation_undo, bei gehaltener Taste zusammengefasst
+    bl_options = set()
 
     @classmethod
     def poll(cls, context):
         """Überprüft, ob der Operator ausgeführt werden kann."""
         # Überprüfen, ob der aktuelle Bereich der Graph-Editor ist.
-        if context.area and context.area.type == 'GRAPH_EDITOR':
-            # Überprüfen, ob ausgewählte Objekte existieren.
-            for obj in context.selected_objects:
-                # Überprüfen, ob Animationsdaten und eine Action vorhanden sind.
-                if obj.animation_data and obj.animation_data.action:
-                    # Überprüfen, ob Keyframes in irgendeiner F-Kurve ausgewählt sind.
-                    for curve in obj.animation_data.action.fcurves:
-                        if any(k.select_control_point for k in curve.keyframe_points):
-                            return True
-        return False
+        if not (context.area and context.area.type == 'GRAPH_EDITOR'):
+            return False
+        # Überprüfen, ob Keyframes in irgendeiner F-Kurve der ausgewählten Objekte ausgewählt sind.
+        return selection_summary(context, all_fcurves=True).has_selected_keys
 
+    @timed_execute
     def execute(self, context):
         """Führt die Operation aus."""
         area = context.area
@@ -405,28 +1636,23 @@ class GRAPH_OT_add_next_keys(bpy.types.Operator):
             if obj.animation_data and obj.animation_data.action:
                 # Iteriere durch alle F-Kurven der Action.
                 for curve in obj.animation_data.action.fcurves:
-                    # Filtere die aktuell ausgewählten Keyframes.
-                    selected_keys = [k for k in curve.keyframe_points if k.select_control_point]
+                    frame_index = CurveFrameIndex(curve)
+                    selected_range = frame_index.selected_range()
                     
-                    if not selected_keys:
+                    if selected_range is None:
                         continue
                     
-                    # Finde den am weitesten rechts liegenden (höchsten) ausgewählten Keyframe.
-                    max_frame = max([k.co.x for k in selected_keys])
-                    
-                    next_key = None
-                    # Finde den ersten Keyframe, der rechts von max_frame liegt.
-                    for key in curve.keyframe_points:
-                        if key.co.x > max_frame:
-                            if next_key is None or key.co.x < next_key.co.x:
-                                next_key = key
+                    # Finde den ersten Keyframe, der rechts vom am weitesten rechts liegenden ausgewählten Keyframe liegt.
+                    next_index = frame_index.next_after(selected_range[1])
                     
                     # Füge den nächsten Keyframe und seine Handles zur Auswahl hinzu, falls er existiert.
-                    if next_key:
-                        next_key.select_control_point = True
-                        next_key.select_left_handle = True
-                        next_key.select_right_handle = True
+                    if next_index is not None:
+                        frame_index.select_key(next_index)
+                        frame_index.write_selection()
         
+        invalidate_selection_summary()
+        tag_redraw_key_editors(context)
+        navigation_undo.push(context, self.bl_label)
         return {'FINISHED'}
     
 
@@ -435,20 +1661,18 @@ class GRAPH_OT_subtract_keys(bpy.types.Operator):
     """subtract keyframe from selection on the right"""
     bl_idname = "graph.subtract_keys"
     bl_label = "Keyframe rechts entfernen"
-    bl_options = {'UNDO'}
+    # Undo-Schritte setzt navigation_undo, bei gehaltener Taste zusammengefasst
+    bl_options = set()
 
     @classmethod
     def poll(cls, context):
         """Überprüft, ob der Operator ausgeführt werden kann."""
-        if context.area and context.area.type == 'GRAPH_EDITOR':
-            for obj in context.selected_objects:
-                if obj.animation_data and obj.animation_data.action:
-                    for curve in obj.animation_data.action.fcurves:
-                        if any(k.select_control_point for k in curve.keyframe_points):
-                            # Nur aktiv, wenn mindestens ein Keyframe in der Kurve ausgewählt ist.
-                            return True
-        return False
+        if not (context.area and context.area.type == 'GRAPH_EDITOR'):
+            return False
+        # Nur aktiv, wenn mindestens ein Keyframe in einer Kurve ausgewählt ist.
+        return selection_summary(context, all_fcurves=True).has_selected_keys
 
+    @timed_execute
     def execute(self, context):
         """Führt die Operation aus."""
         area = context.area
@@ -460,19 +1684,18 @@ class GRAPH_OT_subtract_keys(bpy.types.Operator):
         for obj in context.selected_objects:
             if obj.animation_data and obj.animation_data.action:
                 for curve in obj.animation_data.action.fcurves:
-                    selected_keys = [k for k in curve.keyframe_points if k.select_control_point]
+                    frame_index = CurveFrameIndex(curve)
                     
                     # Bedingung: Prüfen, ob mehr als ein Keyframe ausgewählt ist.
                     # Nur dann darf der letzte Keyframe entfernt werden.
-                    if len(selected_keys) > 1:
-                        max_frame = max([k.co.x for k in selected_keys])
-                        last_key = next((k for k in selected_keys if k.co.x == max_frame), None)
-                        
-                        if last_key:
-                            last_key.select_control_point = False
-                            last_key.select_left_handle = False
-                            last_key.select_right_handle = False
+                    if np.count_nonzero(frame_index.select) > 1:
+                        max_frame = frame_index.selected_range()[1]
+                        frame_index.select_key(frame_index.first_selected_at(max_frame), False)
+                        frame_index.write_selection()
                     
+        invalidate_selection_summary()
+        tag_redraw_key_editors(context)
+        navigation_undo.push(context, self.bl_label)
         return {'FINISHED'}
 
 
@@ -487,7 +1710,9 @@ class BONES_OT_toggle_unselected_bones(bpy.types.Operator):
         # Der Operator ist nur aktiv, wenn eine Armatur ausgewählt ist
         return context.active_object and context.active_object.type == 'ARMATURE'
 
+    @timed_execute
     def execute(self, context):
+        navigation_undo.flush()
         global _is_hidden
 
         # Umschalten des Zustands
@@ -525,7 +1750,9 @@ class GRAPH_OT_decimate_unselected(bpy.types.Operator):
                 context.active_object.animation_data and
                 context.active_object.animation_data.action)
 
+    @timed_execute
     def execute(self, context):
+        navigation_undo.flush()
         if not (context.active_object and context.active_object.animation_data and context.active_object.animation_data.action):
             self.report({'WARNING'}, "Keine aktive Animation gefunden.")
             return {'CANCELLED'}
@@ -567,3220 +1794,887 @@ class GRAPH_OT_decimate_unselected(bpy.types.Operator):
 
 
 
-class GRAPH_OT_scale_keyframes_x(bpy.types.Operator):
+class GRAPH_OT_scale_keyframes_x(KeyframeTransformOperator, bpy.types.Operator):
     """Scale keyframes X value, relative to leftmost selected keyframe"""
     bl_idname = "graph.scale_keyframes_x"
     bl_label = "Scale Keys"
     bl_options = {'REGISTER', 'UNDO'}
-    
-    _timer = None
-    _first_mouse_x = None
-    _origin_frame = None
-    _keyframes_initial_data = []
-    _keyframes_after_data = [] # Wichtig: Diese Liste muss in der Klasse definiert werden
-    _initial_frame_start = None
-    _initial_frame_end = None
-    _initial_frame_current = None
-    _last_unselected_frame = None # Wichtig: Diese Variable muss auch hier definiert werden
-
-    @classmethod
-    def poll(cls, context):
-        if not (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves):
-            return False
-        
-        # Check if there's at least one fcurve with two or more selected keyframes
-        for fcurve in context.selected_visible_fcurves:
-            selected_keyframes_in_fcurve = [kf for kf in fcurve.keyframe_points if kf.select_control_point]
-            if len(selected_keyframes_in_fcurve) >= 2:
-                return True
-                
-        return False
-    
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            # 1. Maus-Warping-Logik
-            window_width = context.window.width
-            mouse_x = event.mouse_x
-            
-            # Speichere die ursprüngliche Mausposition
-            original_mouse_x = mouse_x
 
-            if mouse_x < 5 or mouse_x > window_width - 5:
-                new_x = mouse_x
-                if mouse_x < 5:
-                    new_x = window_width - 10
-                else:
-                    new_x = 10
-                
-                self._first_mouse_x += new_x - mouse_x
-                context.window.cursor_warp(new_x, event.mouse_y)
+    min_selected_per_curve = 2
+    confirm_on_release = True
+    update_curves = False
+    follow_selection_range = False
+    session_attributes = ('_selection', '_following')
 
-            delta_x = event.mouse_x - self._first_mouse_x
-            scale_factor = 1.0 + delta_x * 0.005
-            
-            new_frame_positions = []
-            
-            # Skalierung der ausgewählten Keyframes
-            for keyframe_data in self._keyframes_initial_data:
-                keyframe = keyframe_data['keyframe']
-                initial_frame = keyframe_data['frame']
-                initial_handle_left_x = keyframe_data['handle_left_x']
-                initial_handle_right_x = keyframe_data['handle_right_x']
-
-                new_frame = self._origin_frame + (initial_frame - self._origin_frame) * scale_factor
-                
-                handle_left_dx = (initial_handle_left_x - initial_frame) * scale_factor
-                handle_right_dx = (initial_handle_right_x - initial_frame) * scale_factor
+    _selection = None
+    # Nicht ausgewählte Keys rechts vom letzten ausgewählten, sie werden mitverschoben
+    _following = None
+    _origin_frame = None
+    _last_selected_frame = None
+    _last_unselected_frame = None
 
-                keyframe.co[0] = new_frame
-                keyframe.handle_left[0] = new_frame + handle_left_dx
-                keyframe.handle_right[0] = new_frame + handle_right_dx
-                
-                new_frame_positions.append(new_frame)
-            
-            # Verschiebung der nachfolgenden Keyframes und der rechten Timeline-Grenze
-            if self._keyframes_after_data:
-                # Berechne die Verschiebung basierend auf der Skalierung des letzten ausgewählten Keyframes
-                last_selected_frame_initial = self._keyframes_initial_data[-1]['frame']
-                last_selected_frame_new = self._origin_frame + (last_selected_frame_initial - self._origin_frame) * scale_factor
-                displacement_factor = last_selected_frame_new - last_selected_frame_initial
-
-                for keyframe_data in self._keyframes_after_data:
-                    keyframe = keyframe_data['keyframe']
-                    keyframe.co[0] = keyframe_data['initial_frame'] + displacement_factor
-                    keyframe.handle_left[0] = keyframe_data['initial_handle_left_x'] + displacement_factor
-                    keyframe.handle_right[0] = keyframe_data['initial_handle_right_x'] + displacement_factor
-
-                # NEUE LOGIK HIER: Anpassung der Timeline-Grenzen
-                if context.screen.is_animation_playing and not context.scene.keep_framerange:
-                    if self._last_unselected_frame is not None:
-                        new_unselected_frame = self._last_unselected_frame + displacement_factor
-                        context.scene.frame_end = int(new_unselected_frame + context.scene.additional_postframes)
-                    else:
-                        # Falls keine nachfolgenden Keyframes existieren, verwende den letzten ausgewählten
-                        if new_frame_positions:
-                            context.scene.frame_end = int(max(new_frame_positions) + context.scene.additional_postframes)
-            
+    def prepare(self, context, snapshots):
+        entries = selected_keyframes(snapshots)
+        if not entries:
+            self.report({'WARNING'}, "Keine Keyframes ausgewählt.")
+            return None
+
+        write_back = KeyframeWriteBack()
+        self._selection = select_keyframes(entries, write_back)
+
+        # Der erste ausgewählte Keyframe dient als Ursprung, der letzte bestimmt die nachfolgenden Keyframes
+        self._origin_frame = float(self._selection.co[:, 0].min())
+        self._last_selected_frame = float(self._selection.co[:, 0].max())
+
+        following = [(snapshot, keyframe_index) for snapshot in snapshots
+                     for keyframe_index in np.flatnonzero(~snapshot.select & (snapshot.co[:, 0] > self._last_selected_frame))]
+        self._following = select_keyframes(following, write_back)
+        # Erster davon, um das Ende der Timeline korrekt zu setzen
+        self._last_unselected_frame = float(self._following.co[:, 0].min()) if following else None
+        return self._selection, self._following
+
+    def transform(self, context, event, delta_x, delta_y):
+        scale_factor = 1.0 + delta_x * 0.005
+
+        # Skalierung der ausgewählten Keyframes, Handles behalten ihre Y-Werte
+        selection = self._selection
+        scale = (scale_factor, 1.0)
+        co = selection.co.copy()
+        co[:, 0] = self._origin_frame + (co[:, 0] - self._origin_frame) * scale_factor
+        selection.write_co(co)
+        selection.write_handles(co + selection.handle_left_vec * scale, co + selection.handle_right_vec * scale)
+
+        # Verschiebung der nachfolgenden Keyframes um die Verschiebung des letzten ausgewählten
+        last_selected_frame_new = self._origin_frame + (self._last_selected_frame - self._origin_frame) * scale_factor
+        displacement = last_selected_frame_new - self._last_selected_frame
+        following = self._following
+        following_co = following.co + (displacement, 0.0)
+        following.write_co(following_co)
+        following.write_handles(following_co + following.handle_left_vec, following_co + following.handle_right_vec)
+
+        if context.screen.is_animation_playing and not context.scene.keep_framerange:
+            # Die Skalierung um den Ursprung bildet die äußeren Keys auf die äußeren ab: kein Scan über co
+            first_frame = min(self._origin_frame, last_selected_frame_new)
+            if self._last_unselected_frame is not None:
+                end_frame = self._last_unselected_frame + displacement
             else:
-                # Falls keine nachfolgenden Keyframes existieren
-                if context.screen.is_animation_playing and not context.scene.keep_framerange:
-                    if new_frame_positions:
-                        context.scene.frame_end = int(max(new_frame_positions) + context.scene.additional_postframes)
-
-            # Anpassung der linken Timeline-Grenze (Diese Logik ist bereits korrekt)
-            if new_frame_positions and context.screen.is_animation_playing and not context.scene.keep_framerange:
-                min_frame = min(new_frame_positions)
-                context.scene.frame_start = int(min_frame - context.scene.additional_preframes)
-                
-                # Passe den aktuellen Frame an, wenn die Skalierung ihn außerhalb der sichtbaren
-                # Region verschiebt
-                if context.scene.frame_current < context.scene.frame_start:
-                    context.scene.frame_current = context.scene.frame_start
-                elif context.scene.frame_current > context.scene.frame_end:
-                    context.scene.frame_current = context.scene.frame_end
+                end_frame = max(self._origin_frame, last_selected_frame_new)
+            context.scene.frame_end = int(end_frame + context.scene.additional_postframes)
+            context.scene.frame_start = int(first_frame - context.scene.additional_preframes)
 
+            # Passe den aktuellen Frame an, wenn die Skalierung ihn außerhalb der sichtbaren Region verschiebt
+            if context.scene.frame_current < context.scene.frame_start:
+                context.scene.frame_current = context.scene.frame_start
+            elif context.scene.frame_current > context.scene.frame_end:
+                context.scene.frame_current = context.scene.frame_end
 
-            context.area.tag_redraw()
+    def confirm(self, context):
+        # Nur die Positionen ändern sich, die Handle-Typen bleiben erhalten
+        for selection in self._selections:
+            selection.write_handle_types(selection.handle_left_type, selection.handle_right_type)
 
-        elif event.type == 'LEFTMOUSE' and event.value == 'RELEASE':
-            # Endet den Operator und stellt die Timeline-Grenzen zurück
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            return {'FINISHED'}
 
-        elif event.type in {'RIGHTMOUSE', 'ESC'}:
-            # Bricht ab und setzt alle Keyframes und Timeline-Grenzen zurück
-            for keyframe_data in self._keyframes_initial_data:
-                keyframe = keyframe_data['keyframe']
-                keyframe.co[0] = keyframe_data['frame']
-                keyframe.handle_left[0] = keyframe_data['handle_left_x']
-                keyframe.handle_right[0] = keyframe_data['handle_right_x']
-            
-            for keyframe_data in self._keyframes_after_data:
-                keyframe = keyframe_data['keyframe']
-                keyframe.co[0] = keyframe_data['initial_frame']
-                keyframe.handle_left[0] = keyframe_data['initial_handle_left_x']
-                keyframe.handle_right[0] = keyframe_data['initial_handle_right_x']
-
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            return {'CANCELLED'}
 
-        return {'RUNNING_MODAL'}
 
-    def invoke(self, context, event):
-        selected_keyframes = []
-        # Sammelt alle ausgewählten Keyframes in einer Liste
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe in fcurve.keyframe_points:
-                if keyframe.select_control_point:
-                    selected_keyframes.append(keyframe)
-        
-        if not selected_keyframes:
-            self.report({'WARNING'}, "Keine Keyframes ausgewählt.")
-            return {'CANCELLED'}
 
-        # Sortiert die Keyframes nach ihrem Frame, um den ersten und letzten zu finden
-        selected_keyframes.sort(key=lambda kf: kf.co[0])
-        
-        # Holt den letzten Keyframe, um die nachfolgenden Keyframes zu bestimmen
-        last_selected_keyframe = selected_keyframes[-1]
-        
-        # Hier wird der erste ausgewählte Keyframe gefunden, der als Ursprung dient.
-        origin_keyframe = min(selected_keyframes, key=lambda kf: kf.co[0])
-        self._origin_frame = origin_keyframe.co[0]
 
-        # Speichert die ursprünglichen Timeline-Grenzen
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        # Initialisiert die Variable für den nicht-ausgewählten End-Frame
-        self._last_unselected_frame = None
 
-        # Finde alle Keyframes, die rechts vom letzten ausgewählten Keyframe liegen
-        self._keyframes_after_data.clear()
-        last_selected_frame = last_selected_keyframe.co[0]
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe in fcurve.keyframe_points:
-                # Berücksichtige nur nicht-ausgewählte Keyframes, die nach dem letzten kommen
-                if not keyframe.select_control_point and keyframe.co[0] > last_selected_frame:
-                    self._keyframes_after_data.append({
-                        'keyframe': keyframe,
-                        'initial_frame': keyframe.co[0],
-                        'initial_handle_left_x': keyframe.handle_left[0],
-                        'initial_handle_right_x': keyframe.handle_right[0]
-                    })
-        
-        # Suche den ersten nicht-ausgewählten Keyframe nach dem letzten ausgewählten
-        # Diese Logik ist nötig, um das Ende der Timeline korrekt zu setzen.
-        all_keyframes = []
-        for fcurve in context.selected_visible_fcurves:
-            all_keyframes.extend(fcurve.keyframe_points)
 
-        self._last_unselected_frame = None
-        for keyframe in all_keyframes:
-            if not keyframe.select_control_point and keyframe.co[0] > last_selected_keyframe.co[0]:
-                if self._last_unselected_frame is None or keyframe.co[0] < self._last_unselected_frame:
-                    self._last_unselected_frame = keyframe.co[0]
-
-        # Speichert die initialen Daten aller ausgewählten Keyframes
-        self._keyframes_initial_data.clear()
-        for keyframe in selected_keyframes:
-            self._keyframes_initial_data.append({
-                'keyframe': keyframe,
-                'frame': keyframe.co[0],
-                'handle_left_x': keyframe.handle_left[0],
-                'handle_right_x': keyframe.handle_right[0]
-            })
-        
-        self._first_mouse_x = event.mouse_x
-        
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+class GRAPH_OT_move_keyframes_x(KeyframeTransformOperator, bpy.types.Operator):
+    """Move keyframes X value"""
+    bl_idname = "graph.move_keyframes_x"
+    bl_label = "Move keys"
+    bl_options = {'REGISTER', 'UNDO'}
 
+    confirm_on_release = True
+    update_curves = False
+    follow_selection_range = False
+    drag_cursor = 'MOVE_X'
+    session_attributes = ('_selection',)
+
+    _selection = None
+    # Letzter nicht ausgewählter Key vor und erster nach der Auswahl, sie begrenzen die Timeline
+    _first_unselected_frame = None
+    _last_unselected_frame = None
+    # Erster und letzter ausgewählter Key vor dem Verschieben
+    _first_selected_frame = None
+    _last_selected_frame = None
+
+    def prepare(self, context, snapshots):
+        entries = selected_keyframes(snapshots)
+        if not entries:
+            self.report({'WARNING'}, "Keine Keyframes ausgewählt.")
+            return None
+        self._selection = select_keyframes(entries)
 
+        first_selected_frame = self._first_selected_frame = float(self._selection.co[:, 0].min())
+        last_selected_frame = self._last_selected_frame = float(self._selection.co[:, 0].max())
+        self._first_unselected_frame = None
+        self._last_unselected_frame = None
+        for snapshot in snapshots:
+            unselected_frames = snapshot.co[~snapshot.select, 0]
+            before = unselected_frames[unselected_frames < first_selected_frame]
+            if len(before):
+                if self._first_unselected_frame is None or before.max() > self._first_unselected_frame:
+                    self._first_unselected_frame = float(before.max())
+            after = unselected_frames[unselected_frames > last_selected_frame]
+            if len(after):
+                if self._last_unselected_frame is None or after.min() < self._last_unselected_frame:
+                    self._last_unselected_frame = float(after.min())
+        return (self._selection,)
+
+    def transform(self, context, event, delta_x, delta_y):
+        selection = self._selection
+        shift = delta_x * 0.1
+        co = selection.co + (shift, 0.0)
+        selection.write_co(co)
+        selection.write_handles(co + selection.handle_left_vec, co + selection.handle_right_vec)
+
+        if context.screen.is_animation_playing and not context.scene.keep_framerange:
+            # Alle Keys verschieben sich um shift, die Grenzen der Auswahl also auch
+            new_start_frame = self._first_unselected_frame
+            if new_start_frame is None:
+                new_start_frame = self._first_selected_frame + shift
+            new_end_frame = self._last_unselected_frame
+            if new_end_frame is None:
+                new_end_frame = self._last_selected_frame + shift
+            context.scene.frame_start = int(new_start_frame - context.scene.additional_preframes)
+            context.scene.frame_end = int(new_end_frame + context.scene.additional_postframes)
+
+    def confirm(self, context):
+        # Nur die Positionen ändern sich, die Handle-Typen bleiben erhalten
+        self._selection.write_handle_types(self._selection.handle_left_type, self._selection.handle_right_type)
+
+
+class OBJECT_OT_rotate_keys(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.rotate_keys"
+    bl_label = "Rotate Keyframes"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_description = "Mousewheel for sensitivity. Rotation direction and strength is dependant on next keyframe"
 
+    session_attributes = ('_selection', '_rotation_weights')
 
+    _selection = None
+    # Vorzeichenbehaftete Stärke pro Key (Richtung * Abstand zum Nachbar-Key), einmal in prepare berechnet
+    _rotation_weights = None
 
+    # Empfindlichkeit in Grad pro Pixel
+    _degrees_per_pixel = 10
 
+    @staticmethod
+    def _rotation_weights_for(selection):
+        """Richtung und Stärke der Rotation aus den Nachbar-Keys, als ein Faktor pro Zeile."""
+        co_y = selection.co[:, 1]
+        next_co, has_next = selection.neighbour_co(1)
+        previous_co, has_previous = selection.neighbour_co(-1)
+
+        # 1. Richtung und Stärke am nächsten Keyframe bestimmen
+        use_next = has_next & (next_co[:, 1] != co_y)
+        # 2. Wenn der nächste Keyframe nicht verfügbar oder auf gleicher Höhe ist, den vorherigen verwenden
+        use_previous = ~use_next & has_previous & (previous_co[:, 1] != co_y)
+
+        # direction * strength_multiplier: 0 für Keys ohne Richtung, die damit unverändert bleiben
+        return np.where(use_next, next_co[:, 1] - co_y,
+                        np.where(use_previous, co_y - previous_co[:, 1], 0.0))
+
+    def _apply_rotation(self, rotation_angle_degrees):
+        selection = self._selection
+        rotation_angle_radians = np.radians(rotation_angle_degrees * self._rotation_weights)
+        cos_angle = np.cos(rotation_angle_radians)
+        sin_angle = np.sin(rotation_angle_radians)
+
+        # Eine 2x2-Rotationsmatrix pro Key, auf alle Handle-Vektoren auf einmal angewendet
+        rotation = np.stack((np.stack((cos_angle, -sin_angle), axis=-1),
+                             np.stack((sin_angle, cos_angle), axis=-1)), axis=-2)
+        rotated_left = np.einsum('nij,nj->ni', rotation, selection.handle_left_vec)
+        rotated_right = np.einsum('nij,nj->ni', rotation, selection.handle_right_vec)
+
+        selection.write_handles(selection.co + rotated_left, selection.co + rotated_right)
+
+    def prepare(self, context, snapshots):
+        self.report({'INFO'}, f"Rotation Sensitivity: {self._degrees_per_pixel:.2f} ")
 
+        # Nur Keys, deren vorheriger oder nächster Keyframe einen anderen Wert hat
+        entries = selected_keyframes(snapshots, lambda snapshot: neighbour_differs(snapshot.co[:, 1]))
+        if not entries:
+            self.report({'WARNING'}, "Neighbouring keys have the same value")
+            return None
 
-class GRAPH_OT_move_keyframes_x(bpy.types.Operator):
-    """Move keyframes X value"""
-    bl_idname = "graph.move_keyframes_x"
-    bl_label = "Move keys"
-    bl_options = {'REGISTER', 'UNDO'}
+        self._selection = select_keyframes(entries)
+        self._rotation_weights = self._rotation_weights_for(self._selection)
+        return (self._selection,)
 
-    _first_mouse_x = None
-    _keyframes_initial_data = []
-    _initial_frame_start = None
-    _initial_frame_end = None
+    def transform(self, context, event, delta_x, delta_y):
+        self._apply_rotation(delta_x * 100 * self._degrees_per_pixel * 0.0001)
 
-    @classmethod
-    def poll(cls, context):
-        # Überprüft, ob ein aktives Objekt mit Animationsdaten und ausgewählten F-Kurven vorhanden ist.
-        # Dann wird geprüft, ob mindestens ein Keyframe in diesen F-Kurven ausgewählt ist.
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                any(kf.select_control_point for fc in context.selected_visible_fcurves for kf in fc.keyframe_points))
-                
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            if event.type == 'MOUSEMOVE':
-                # 1. Maus-Warping-Logik
-                window_width = context.window.width
-                mouse_x = event.mouse_x
-                
-                # Speichere die ursprüngliche Mausposition
-                original_mouse_x = mouse_x
+    def wheel(self, context, event):
+        if event.type == 'WHEELUPMOUSE':
+            self._degrees_per_pixel *= 1.5
+        else:
+            self._degrees_per_pixel = max(0.01, self._degrees_per_pixel / 1.5)
 
-                if mouse_x < 5 or mouse_x > window_width - 5:
-                    new_x = mouse_x
-                    if mouse_x < 5:
-                        new_x = window_width - 10
-                    else:
-                        new_x = 10
-                    
-                    self._first_mouse_x += new_x - mouse_x
-                    context.window.cursor_warp(new_x, event.mouse_y)
+        # Maus-Startwert neu setzen: die Rotation beginnt mit der neuen Empfindlichkeit bei 0
+        self.initial_mouse_x = event.mouse_x
+        self._apply_rotation(0.0)
+        self.report({'INFO'}, f"Rotation Sensitivity: {self._degrees_per_pixel:.2f} ")
 
-            delta_x = (event.mouse_x - self._first_mouse_x) * 0.1
-            
-            new_frame_positions = []
-            
-            for keyframe_data in self._keyframes_initial_data:
-                keyframe = keyframe_data['keyframe']
-                initial_frame = keyframe_data['frame']
-                initial_handle_left_x = keyframe_data['handle_left_x']
-                initial_handle_right_x = keyframe_data['handle_right_x']
 
-                new_frame = initial_frame + delta_x
-                
-                handle_left_x = initial_handle_left_x + delta_x
-                handle_right_x = initial_handle_right_x + delta_x
 
-                keyframe.co[0] = new_frame
-                keyframe.handle_left[0] = handle_left_x
-                keyframe.handle_right[0] = handle_right_x
-                
-                new_frame_positions.append(new_frame)
-                
-            if new_frame_positions and context.screen.is_animation_playing and not context.scene.keep_framerange:
-                # Für den Start-Frame
-                if self._first_unselected_frame is not None:
-                    new_start_frame = self._first_unselected_frame
-                else:
-                    new_start_frame = min(new_frame_positions)
+class OBJECT_OT_flatten_keys(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.flatten_keys"
+    bl_label = "Flatten Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_description = "Flatten, or exaggerate handle rotation"
 
-                # Für den End-Frame
-                if self._last_unselected_frame is not None:
-                    new_end_frame = self._last_unselected_frame
-                else:
-                    new_end_frame = max(new_frame_positions)
-                    
-                context.scene.frame_start = int(new_start_frame - context.scene.additional_preframes)
-                context.scene.frame_end = int(new_end_frame + context.scene.additional_postframes)
-                #context.scene.frame_current = int(new_start_frame - context.scene.additional_preframes)
-            
-            context.area.tag_redraw()
+    session_attributes = ('_selection',)
 
-        elif event.type == 'LEFTMOUSE' and event.value == 'RELEASE':
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            return {'FINISHED'}
+    _selection = None
+    _sensitivity = 0.002
 
-        elif event.type in {'RIGHTMOUSE', 'ESC'}:
-            for keyframe_data in self._keyframes_initial_data:
-                keyframe = keyframe_data['keyframe']
-                keyframe.co[0] = keyframe_data['frame']
-                keyframe.handle_left[0] = keyframe_data['handle_left_x']
-                keyframe.handle_right[0] = keyframe_data['handle_right_x']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            return {'CANCELLED'}
+    def prepare(self, context, snapshots):
+        entries = selected_keyframes(snapshots)
+        if not entries:
+            self.report({'WARNING'}, "Keine ausgewählten Keyframes gefunden.")
+            return None
+        self._selection = select_keyframes(entries)
+        return (self._selection,)
 
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        selected_keyframes = []
-        
-        # Sammelt alle ausgewählten Keyframes
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe in fcurve.keyframe_points:
-                if keyframe.select_control_point:
-                    selected_keyframes.append(keyframe)
-        
-        if not selected_keyframes:
-            self.report({'WARNING'}, "Keine Keyframes ausgewählt.")
-            return {'CANCELLED'}
-            
-        # Sortiert die ausgewählten Keyframes nach ihrem Frame-Wert
-        selected_keyframes.sort(key=lambda kf: kf.co[0])
-        
-        # Holt den ersten und letzten ausgewählten Keyframe
-        first_selected_keyframe = selected_keyframes[0]
-        last_selected_keyframe = selected_keyframes[-1] # Füge diese Zeile hinzu
+    def transform(self, context, event, delta_x, delta_y):
+        # Erlaubt negative Werte (Übertreibung), begrenzt positiv bei 1.0
+        flatten_factor = min(1.0, delta_x * self._sensitivity)
 
-        # Speichert die ursprünglichen Timeline-Grenzen
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
+        # Lineare Interpolation der Y-Komponente Richtung 0: vec_y * (1 - factor), X bleibt erhalten
+        selection = self._selection
+        scale = (1.0, 1.0 - flatten_factor)
+        selection.write_handles(selection.co + selection.handle_left_vec * scale,
+                                selection.co + selection.handle_right_vec * scale)
 
-        # Initialisiere die Variablen für die nicht-ausgewählten Frames
-        self._first_unselected_frame = None
-        self._last_unselected_frame = None # Füge diese Zeile hinzu
 
-        # Finde den letzten nicht-ausgewählten Keyframe vor dem ersten ausgewählten
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe in fcurve.keyframe_points:
-                if not keyframe.select_control_point and keyframe.co[0] < first_selected_keyframe.co[0]:
-                    if self._first_unselected_frame is None or keyframe.co[0] > self._first_unselected_frame:
-                        self._first_unselected_frame = keyframe.co[0]
-                # Füge diese Logik hinzu, um den ersten nicht-ausgewählten nach dem letzten ausgewählten zu finden
-                if not keyframe.select_control_point and keyframe.co[0] > last_selected_keyframe.co[0]:
-                    if self._last_unselected_frame is None or keyframe.co[0] < self._last_unselected_frame:
-                        self._last_unselected_frame = keyframe.co[0]
-
-        self._keyframes_initial_data.clear()
-        for keyframe in selected_keyframes:
-            self._keyframes_initial_data.append({
-                'keyframe': keyframe,
-                'frame': keyframe.co[0],
-                'handle_left_x': keyframe.handle_left[0],
-                'handle_right_x': keyframe.handle_right[0]
-            })
-
-        self._first_mouse_x = event.mouse_x
-        
-        context.window.cursor_set('MOVE_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+import bpy
+import math
 
 
-class OBJECT_OT_rotate_keys(bpy.types.Operator):
-    bl_idname = "object.rotate_keys"
-    bl_label = "Rotate Keyframes"
+
+class OBJECT_OT_manipulate_handles(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.handle_manipulator"
+    bl_label = "Manipulate Handles"
     bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for sensitivity. Rotation direction and strength is dependant on next keyframe"
-                 
+    bl_description = "Mousewheel for left or right. Extrude handles"
 
-    _initial_keyframe_data = {}
-    
-    initial_mouse_x = None
-    _strength_multiplier = 0.5
-    
-    # Empfindlichkeit in Grad pro Pixel
-    _degrees_per_pixel = 10
+    warp_y = True
+    session_attributes = ('_selection',)
 
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
-
-    def _apply_rotation(self, context, rotation_angle_degrees):
-        for (data_path, keyframe_index, array_index), initial_data in self._initial_keyframe_data.items():
-            fcurve = None
-            for fc in context.active_object.animation_data.action.fcurves:
-                if fc.data_path == data_path and fc.array_index == array_index:
-                    fcurve = fc
-                    break
-            
-            if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                continue
-            
-            keyframe = fcurve.keyframe_points[keyframe_index]
-            
-            direction = 0.0
-            strength_multiplier = 0.0
-            
-            # 1. Versuche, die Richtung und Stärke am nächsten Keyframe zu bestimmen
-            if keyframe_index + 1 < len(fcurve.keyframe_points):
-                next_keyframe = fcurve.keyframe_points[keyframe_index + 1]
-                if next_keyframe.co[1] != keyframe.co[1]:
-                    direction = 1.0 if next_keyframe.co[1] > keyframe.co[1] else -1.0
-                    strength_multiplier = abs(next_keyframe.co[1] - keyframe.co[1])
-            
-            # 2. Wenn der nächste Keyframe nicht verfügbar oder auf gleicher Höhe ist, versuche es mit dem vorherigen Keyframe
-            if direction == 0.0 and keyframe_index > 0:
-                previous_keyframe = fcurve.keyframe_points[keyframe_index - 1]
-                if previous_keyframe.co[1] != keyframe.co[1]:
-                    direction = 1.0 if previous_keyframe.co[1] < keyframe.co[1] else -1.0
-                    strength_multiplier = abs(previous_keyframe.co[1] - keyframe.co[1])
-            
-            # Wenn keine Richtung oder Stärke gefunden wurde, fahre mit dem nächsten Keyframe fort
-            if direction == 0.0 or strength_multiplier == 0.0:
-                continue
+    _selection = None
+    _mode = 'LEFT_HANDLE' # Starte im linken Modus
 
-            # Wende die Stärke und Richtung an
-            modified_rotation_degrees = rotation_angle_degrees * strength_multiplier * direction
-            rotation_angle_radians = math.radians(modified_rotation_degrees)
-            
-            cos_angle = math.cos(rotation_angle_radians)
-            sin_angle = math.sin(rotation_angle_radians)
-            
-            # ... (der Rest der Rotationslogik bleibt gleich)
-            x1, y1 = initial_data['handle_left_vec'][0], initial_data['handle_left_vec'][1]
-            rx1 = x1 * cos_angle - y1 * sin_angle
-            ry1 = x1 * sin_angle + y1 * cos_angle
-            
-            x2, y2 = initial_data['handle_right_vec'][0], initial_data['handle_right_vec'][1]
-            rx2 = x2 * cos_angle - y2 * sin_angle
-            ry2 = x2 * sin_angle + y2 * cos_angle
-            
-            keyframe.handle_left[0] = initial_data['co_x'] + rx1
-            keyframe.handle_left[1] = initial_data['co_y'] + ry1
-            keyframe.handle_right[0] = initial_data['co_x'] + rx2
-            keyframe.handle_right[1] = initial_data['co_y'] + ry2
-            
-        for area in context.screen.areas:
-            if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                area.tag_redraw()
+    def prepare(self, context, snapshots):
+        self._mode = 'LEFT_HANDLE'
+        self.report({'INFO'}, f"{self._mode}")
 
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-            delta_x = (event.mouse_x - self.initial_mouse_x) * 100
-            
-            # Korrigierte Berechnung der Drehstärke
-            rotation_strength_degrees = delta_x * self._degrees_per_pixel * 0.0001
-            
-            self._apply_rotation(context, rotation_strength_degrees)
-            # Ausgabe auf Grad ändern
-            #self.report({'INFO'}, f"Rotation Sensitivity: {self._degrees_per_pixel:.2f} ")
-            return {'RUNNING_MODAL'}
-            
-        elif event.type == 'WHEELUPMOUSE':
-            self._degrees_per_pixel *= 1.5
-            
-            # HIER wird der Maus-Startwert neu gesetzt
-            self.initial_mouse_x = event.mouse_x
+        entries = selected_keyframes(snapshots)
+        if not entries:
+            self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
+            return None
+        self._selection = select_keyframes(entries)
+        return (self._selection,)
 
-            delta_x = event.mouse_x - self.initial_mouse_x
-            rotation_strength_degrees = delta_x * self._degrees_per_pixel
-            self._apply_rotation(context, rotation_strength_degrees)
-            self.report({'INFO'}, f"Rotation Sensitivity: {self._degrees_per_pixel:.2f} ")
-            return {'RUNNING_MODAL'}
-            
-        elif event.type == 'WHEELDOWNMOUSE':
-            self._degrees_per_pixel /= 1.5
-            self._degrees_per_pixel = max(0.01, self._degrees_per_pixel)
-            
-            # HIER wird der Maus-Startwert neu gesetzt
-            self.initial_mouse_x = event.mouse_x
+    def transform(self, context, event, delta_x, delta_y):
+        selection = self._selection
 
-            delta_x = event.mouse_x - self.initial_mouse_x
-            rotation_strength_degrees = delta_x * self._degrees_per_pixel
-            self._apply_rotation(context, rotation_strength_degrees)
-            self.report({'INFO'}, f"Rotation Sensitivity: {self._degrees_per_pixel:.2f} ")
-            return {'RUNNING_MODAL'}
+        # Berechne den Skalierungsfaktor
+        # Die 200 ist ein beliebiger Wert für die Empfindlichkeit, du kannst sie anpassen
+        factor = 1.0 + (delta_x / 200.0)
 
-        elif event.type == 'LEFTMOUSE':
-            for (data_path, keyframe_index, array_index), initial_data in self._initial_keyframe_data.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
-
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-
-            context.window.cursor_set('DEFAULT')
-            return {'FINISHED'}
-        
-        
+        if self._mode == 'LEFT_HANDLE':
+            # Skaliere den linken Handle, der rechte bleibt im Ausgangszustand
+            selection.write_handles(selection.co + selection.handle_left_vec * factor, selection.handle_right)
+        else:
+            # Skaliere den rechten Handle, der linke bleibt im Ausgangszustand
+            selection.write_handles(selection.handle_left, selection.co + selection.handle_right_vec * factor)
 
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            for (data_path, keyframe_index, array_index), initial_data in self._initial_keyframe_data.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.handle_left[0] = initial_data['co_x'] + initial_data['handle_left_vec'][0]
-                    keyframe.handle_left[1] = initial_data['co_y'] + initial_data['handle_left_vec'][1]
-                    keyframe.handle_right[0] = initial_data['co_x'] + initial_data['handle_right_vec'][0]
-                    keyframe.handle_right[1] = initial_data['co_y'] + initial_data['handle_right_vec'][1]
-                    keyframe.handle_left_type = initial_data['handle_left_type']
-                    keyframe.handle_right_type = initial_data['handle_right_type']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            return {'CANCELLED'}
+    def wheel(self, context, event):
+        # Wechsle zwischen den Modi
+        self._mode = 'RIGHT_HANDLE' if self._mode == 'LEFT_HANDLE' else 'LEFT_HANDLE'
+        self.report({'INFO'}, f"{self._mode}")
+        self.initial_mouse_x = event.mouse_x
 
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        self.report({'INFO'}, f"Rotation Sensitivity: {self._degrees_per_pixel:.2f} ")
-        
-        # Filtern der Keyframes in der invoke-Methode
-        filtered_keyframes = []
-        
-        # Verwende eine Toleranz für den Vergleich der Werte
-        epsilon = 1e-6 
-        
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe.select_control_point:
-                    current_value = keyframe.co[1]
-                    has_different_neighbor = False
-                    
-                    # Prüfen auf vorherigen Keyframe
-                    if keyframe_index > 0:
-                        prev_keyframe = fcurve.keyframe_points[keyframe_index - 1]
-                        if abs(prev_keyframe.co[1] - current_value) > epsilon:
-                            has_different_neighbor = True
-                    
-                    # Prüfen auf nächsten Keyframe
-                    if not has_different_neighbor and keyframe_index < len(fcurve.keyframe_points) - 1:
-                        next_keyframe = fcurve.keyframe_points[keyframe_index + 1]
-                        if abs(next_keyframe.co[1] - current_value) > epsilon:
-                            has_different_neighbor = True
-                    
-                    if has_different_neighbor:
-                        filtered_keyframes.append(keyframe)
-        
-        if not filtered_keyframes:
-            self.report({'WARNING'}, "Neighbouring keys have the same value")
-            return {'CANCELLED'}
+    def confirm(self, context):
+        # FREE wird zu ALIGNED, alle anderen Typen bleiben erhalten
+        selection = self._selection
+        free = HANDLE_TYPE_CODES['FREE']
+        aligned = HANDLE_TYPE_CODES['ALIGNED']
+        selection.write_handle_types(
+            np.where(selection.handle_left_type == free, aligned, selection.handle_left_type),
+            np.where(selection.handle_right_type == free, aligned, selection.handle_right_type),
+            bezier=True)
 
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-            
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
 
-        self._initial_keyframe_data.clear()
-        self.initial_mouse_x = event.mouse_x
 
-        # Speichern nur der gefilterten Keyframes
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe in filtered_keyframes:
-                    key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-                    
-                    self._initial_keyframe_data[key] = {
-                        'co_x': keyframe.co[0],
-                        'co_y': keyframe.co[1],
-                        'handle_left_type': keyframe.handle_left_type,
-                        'handle_right_type': keyframe.handle_right_type,
-                        'handle_left_vec': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                        'handle_right_vec': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1])
-                    }
-
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+class OBJECT_OT_randomize_keys(KeyframeRandomizeOperator, bpy.types.Operator):
+    bl_idname = "object.randomize_keys"
+    bl_label = "Randomize Keyframes"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_description = "Mousewheel for seed. Randomize keyframes Y-Value"
 
+    confirm_bezier = True
 
+    def prepare(self, context, snapshots):
+        # Nur Keys, deren vorheriger oder nächster Keyframe einen anderen Wert hat
+        entries = selected_keyframes(snapshots, lambda snapshot: neighbour_differs(snapshot.co[:, 1]))
+        if not entries:
+            self.report({'WARNING'}, "Keine Keyframes gefunden, die unterschiedliche Nachbarwerte haben.")
+            return None
 
-class OBJECT_OT_flatten_keys(bpy.types.Operator):
-    bl_idname = "object.flatten_keys"
-    bl_label = "Flatten Keys"
-    bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Flatten, or exaggerate handle rotation"
-                    
-    _initial_keyframe_data = {}
-    _initial_mouse_x = None
-    _sensitivity = 0.002
-    
-    _initial_flatten_factor = 0.0
+        self._selection = select_keyframes(entries)
+        self._random_draws = RandomDraws(self._selection)
+        return (self._selection,)
 
-    _initial_frame_start = 0
-    _initial_frame_end = 0
+    def randomize(self, context):
+        # Zufalls-Offset pro Knochen oder pro Kanal, je nach Eigenschaft
+        selection = self._selection
+        random_offsets_y = self._current_strength * self._random_draws.unit(
+            self._current_seed, context.scene.use_bone_randomization)
 
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
-
-    def _apply_flattening(self, context, flatten_factor):
-        # **ÄNDERUNG HIER:** Erlaubt negative Werte, begrenzt positiv bei 1.0
-        flatten_factor = min(1.0, flatten_factor)
-
-        for (data_path, keyframe_index, array_index), initial_data in self._initial_keyframe_data.items():
-            fcurve = None
-            for fc in context.active_object.animation_data.action.fcurves:
-                if fc.data_path == data_path and fc.array_index == array_index:
-                    fcurve = fc
-                    break
-            
-            if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                continue
-            
-            keyframe = fcurve.keyframe_points[keyframe_index]
-            
-            initial_hl_vec_x, initial_hl_vec_y = initial_data['handle_left_vec']
-            flattened_hl_vec_x = initial_hl_vec_x
-            flattened_hl_vec_y = 0.0
-            
-            new_hl_vec_x = initial_hl_vec_x + (flattened_hl_vec_x - initial_hl_vec_x) * flatten_factor
-            new_hl_vec_y = initial_hl_vec_y + (flattened_hl_vec_y - initial_hl_vec_y) * flatten_factor
+        co = selection.co.copy()
+        co[:, 1] += random_offsets_y
+        selection.write_co(co)
 
-            keyframe.handle_left[0] = initial_data['co_x'] + new_hl_vec_x
-            keyframe.handle_left[1] = initial_data['co_y'] + new_hl_vec_y
-            
-            initial_hr_vec_x, initial_hr_vec_y = initial_data['handle_right_vec']
-            flattened_hr_vec_x = initial_hr_vec_x
-            flattened_hr_vec_y = 0.0
+        # Die Handle-Vektoren werden basierend auf der neuen Keyframe-Position neu berechnet.
+        selection.write_handles(co + selection.handle_left_vec, co + selection.handle_right_vec)
 
-            new_hr_vec_x = initial_hr_vec_x + (flattened_hr_vec_x - initial_hr_vec_x) * flatten_factor
-            new_hr_vec_y = initial_hr_vec_y + (flattened_hr_vec_y - initial_hr_vec_y) * flatten_factor
 
-            keyframe.handle_right[0] = initial_data['co_x'] + new_hr_vec_x
-            keyframe.handle_right[1] = initial_data['co_y'] + new_hr_vec_y
-            
-        for area in context.screen.areas:
-            if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                area.tag_redraw()
 
-    def modal(self, context, event):
-        # **ÄNDERUNG HIER:** Erlaubt negative Werte, begrenzt positiv bei 1.0
-        _flatten_factor = self._initial_flatten_factor + (event.mouse_x - self._initial_mouse_x) * self._sensitivity
-        _flatten_factor = min(1.0, _flatten_factor)
-        
-        if event.type == 'MOUSEMOVE':
-            # Hol dir die Breite des Fensters, in dem der Operator aktiv ist.
-            # Anstatt context.window.width, nutze besser die Bereichsgröße für mehr Flexibilität
-            window_width = context.window.width
-        
-            # Hol dir die Mausposition im Fenster-Koordinatensystem
-            mouse_x = event.mouse_x
-            
-            # Überprüfe, ob die Maus den linken oder rechten Rand erreicht hat (Puffer von 5 Pixeln)
-            if mouse_x < 5 or mouse_x > window_width - 5:
-                new_x = mouse_x
-                if mouse_x < 5:
-                    # Maus ist am linken Rand, teleportiere sie zum rechten Rand
-                    new_x = window_width - 10
-                else:
-                    # Maus ist am rechten Rand, teleportiere sie zum linken Rand
-                    new_x = 10
-                    
-                # Aktualisiere die Anfangsmausposition, um den Sprung auszugleichen
-                self._initial_mouse_x += new_x - mouse_x
 
-                # Setze den Cursor an die neue Position
-                context.window.cursor_warp(new_x, event.mouse_y)
-                
-            # Berechne die Delta-Werte basierend auf der aktuellen Mausposition und der initialen Mausposition
-            # Die initial_mouse_x wird durch das Warping korrekt angepasst,
-            # sodass die Bewegung nahtlos weiterläuft.
-            delta_x = event.mouse_x - self._initial_mouse_x
-            
-            _flatten_factor = self._initial_flatten_factor + delta_x * self._sensitivity
-            _flatten_factor = min(1.0, _flatten_factor)
-            
-            self._apply_flattening(context, _flatten_factor)
-            
-            return {'RUNNING_MODAL'}
-        elif event.type == 'LEFTMOUSE':
-            for (data_path, keyframe_index, array_index), initial_data in self._initial_keyframe_data.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
+class OBJECT_OT_random_x_pos(KeyframeRandomizeOperator, bpy.types.Operator):
+    bl_idname = "object.random_x_pos"
+    bl_label = "Randomize Keyframes"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_description = "Mousewheel for seed. Randomize keyframes X-Value"
 
-            context.window.cursor_set('DEFAULT')
-            return {'FINISHED'}
-            
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            for (data_path, keyframe_index, array_index), initial_data in self._initial_keyframe_data.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.handle_left[0] = initial_data['co_x'] + initial_data['handle_left_vec'][0]
-                    keyframe.handle_left[1] = initial_data['co_y'] + initial_data['handle_left_vec'][1]
-                    keyframe.handle_right[0] = initial_data['co_x'] + initial_data['handle_right_vec'][0]
-                    keyframe.handle_right[1] = initial_data['co_y'] + initial_data['handle_right_vec'][1]
-                    keyframe.handle_left_type = initial_data['handle_left_type']
-                    keyframe.handle_right_type = initial_data['handle_right_type']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            return {'CANCELLED'}
+    confirm_bezier = True
+    # Ohne fcurve.update(): die Keys dürfen sich während des Ziehens überholen,
+    # eine Neusortierung würde die gespeicherten Indizes ungültig machen.
+    update_curves = False
 
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        epsilon = 1e-6
-        selected_keyframes = []
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe in fcurve.keyframe_points:
-                if keyframe.select_control_point:
-                    selected_keyframes.append(keyframe)
-        
-        if not selected_keyframes:
-            self.report({'WARNING'}, "Keine ausgewählten Keyframes gefunden.")
-            return {'CANCELLED'}
+    def prepare(self, context, snapshots):
+        self.use_bone_randomization = context.scene.use_bone_randomization
 
-        self._initial_keyframe_data.clear()
-        
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-            if context.screen.is_animation_playing:
-                context.scene.frame_current = context.scene.frame_start
+        if self.use_bone_randomization:
+            # Bone-basierte Filterung
+            filtered_bones = set()
+            for snapshot in snapshots:
+                if not snapshot.data_path.startswith('pose.bones['): continue
+                if np.any(snapshot.select & neighbour_differs(snapshot.co[:, 0])):
+                    filtered_bones.add(snapshot.data_path.split('"')[1])
 
-        self._initial_mouse_x = event.mouse_x
-        self._flatten_factor = 0.0
-        self._initial_flatten_factor = self._flatten_factor
-        
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe in selected_keyframes:
-                    key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-                    
-                    self._initial_keyframe_data[key] = {
-                        'co_x': keyframe.co[0],
-                        'co_y': keyframe.co[1],
-                        'handle_left_type': keyframe.handle_left_type,
-                        'handle_right_type': keyframe.handle_right_type,
-                        'handle_left_vec': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                        'handle_right_vec': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1])
-                    }
-
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+            if not filtered_bones:
+                self.report({'WARNING'}, "Keine Keyframes von Bones mit unterschiedlichen Nachbarn gefunden.")
+                return None
 
+            filtered_keyframes_data = selected_keyframes(
+                [snapshot for snapshot in snapshots
+                 if snapshot.data_path.startswith('pose.bones[') and snapshot.data_path.split('"')[1] in filtered_bones])
 
-import bpy
-import math
+        else:
+            # Channel-basierte Filterung (Original-Logik)
+            filtered_keyframes_data = selected_keyframes(snapshots, lambda snapshot: neighbour_differs(snapshot.co[:, 0]))
 
+        if not filtered_keyframes_data:
+            self.report({'WARNING'}, "Keine Keyframes mit unterschiedlichen Nachbarwerten gefunden.")
+            return None
 
+        self._selection = select_keyframes(filtered_keyframes_data)
+        self._random_draws = RandomDraws(self._selection, bone_paths_only=True)
+        return (self._selection,)
 
-class OBJECT_OT_manipulate_handles(bpy.types.Operator):
-    bl_idname = "object.handle_manipulator"
-    bl_label = "Manipulate Handles"
-    bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for left or right. Extrude handles"
-    
-    _timer = None
-    initial_mouse_x = None
-    _mode = 'LEFT_HANDLE' # Starte im linken Modus
-    initial_handle_vectors = {}
-    initial_handle_types = {}
-    initial_keyframe_data = {}
-    _initial_frame_start = None
-    _initial_frame_end = None
-    
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
-    
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            # Maus-Warping bleibt unverändert
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-            
-            if event.mouse_y < 5 or event.mouse_y > context.window.height - 5:
-                if event.mouse_y < 5:
-                    new_y = context.window.height - 10
-                else:
-                    new_y = 10
-                self.initial_mouse_y += (new_y - event.mouse_y)
-                context.window.cursor_warp(event.mouse_x, new_y)
-
-            delta_x_px = event.mouse_x - self.initial_mouse_x
-            
-            for key, initial_data in self.initial_keyframe_data.items():
-                data_path, keyframe_index, array_index = key
-                
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if not fcurve:
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                
-                initial_vectors = self.initial_handle_vectors[key]
-                vec_left_initial = initial_vectors['left']
-                vec_right_initial = initial_vectors['right']
-
-                # Berechne den Skalierungsfaktor
-                # Die 200 ist ein beliebiger Wert für die Empfindlichkeit, du kannst sie anpassen
-                factor = 1.0 + (delta_x_px / 200.0) 
-                
-                if self._mode == 'LEFT_HANDLE':
-                    # Skaliere den linken Handle
-                    new_vec_left_x = vec_left_initial[0] * factor
-                    new_vec_left_y = vec_left_initial[1] * factor
-                    keyframe.handle_left[0] = keyframe.co[0] + new_vec_left_x
-                    keyframe.handle_left[1] = keyframe.co[1] + new_vec_left_y
-                    
-                    # Setze den rechten Handle auf den ursprünglichen Zustand zurück
-                    keyframe.handle_right[0] = keyframe.co[0] + vec_right_initial[0]
-                    keyframe.handle_right[1] = keyframe.co[1] + vec_right_initial[1]
-
-                elif self._mode == 'RIGHT_HANDLE':
-                    # Skaliere den rechten Handle
-                    new_vec_right_x = vec_right_initial[0] * factor
-                    new_vec_right_y = vec_right_initial[1] * factor
-                    keyframe.handle_right[0] = keyframe.co[0] + new_vec_right_x
-                    keyframe.handle_right[1] = keyframe.co[1] + new_vec_right_y
-
-                    # Setze den linken Handle auf den ursprünglichen Zustand zurück
-                    keyframe.handle_left[0] = keyframe.co[0] + vec_left_initial[0]
-                    keyframe.handle_left[1] = keyframe.co[1] + vec_left_initial[1]
-
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-        
-        elif event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
-            # Wechsle zwischen den Modi
-            self._mode = 'RIGHT_HANDLE' if self._mode == 'LEFT_HANDLE' else 'LEFT_HANDLE'
-            self.report({'INFO'}, f"{self._mode}")
-            self.initial_mouse_x = event.mouse_x
-            
-        elif event.type == 'LEFTMOUSE':
-            # Bestätige die Änderungen
-            for key, types in self.initial_handle_types.items():
-                data_path, keyframe_index, array_index = key
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                if fcurve:
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.interpolation = 'BEZIER'
-                    keyframe.handle_left_type = 'ALIGNED' if keyframe.handle_left_type == 'FREE' else keyframe.handle_left_type
-                    keyframe.handle_right_type = 'ALIGNED' if keyframe.handle_right_type == 'FREE' else keyframe.handle_right_type
-
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'FINISHED'}
-            
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            # Abbrechen und die Handles auf den Ausgangszustand zurücksetzen
-            for key, initial_vectors in self.initial_handle_vectors.items():
-                data_path, keyframe_index, array_index = key
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                if fcurve:
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.handle_left[0] = keyframe.co[0] + initial_vectors['left'][0]
-                    keyframe.handle_left[1] = keyframe.co[1] + initial_vectors['left'][1]
-                    keyframe.handle_right[0] = keyframe.co[0] + initial_vectors['right'][0]
-                    keyframe.handle_right[1] = keyframe.co[1] + initial_vectors['right'][1]
-
-                    types = self.initial_handle_types[key]
-                    keyframe.handle_left_type = types['left']
-                    keyframe.handle_right_type = types['right']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}
-            
-        return {'RUNNING_MODAL'}
-        
-    def invoke(self, context, event):
-        self.report({'INFO'}, f"{self._mode}")
-        if context.active_object is None or context.active_object.animation_data is None:
-            self.report({'WARNING'}, "Kein aktives Objekt oder keine Animationsdaten.")
-            return {'CANCELLED'}
-        
-        if not context.selected_visible_fcurves:
-            self.report({'WARNING'}, "Keine F-Kurven im Graph Editor sichtbar und ausgewählt.")
-            return {'CANCELLED'}
-
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-            
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
-
-        self.initial_mouse_x = event.mouse_x
-        self.initial_mouse_y = event.mouse_y # Auch diese Zeile wieder eingefügt
-        self._mode = 'LEFT_HANDLE'
-        self.initial_handle_vectors.clear()
-        self.initial_handle_types.clear()
-        self.initial_keyframe_data.clear()
-        
-        selected_keyframes_found = False
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe.select_control_point:
-                    selected_keyframes_found = True
-                    key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-                    
-                    self.initial_handle_vectors[key] = {
-                        'left': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                        'right': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1]),
-                    }
-                    
-                    self.initial_handle_types[key] = {
-                        'left': keyframe.handle_left_type,
-                        'right': keyframe.handle_right_type
-                    }
-                    
-                    self.initial_keyframe_data[key] = {
-                        'co_x': keyframe.co[0],
-                        'co_y': keyframe.co[1],
-                    }
-
-        if not selected_keyframes_found:
-            self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
-            return {'CANCELLED'}
-        
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
-
-
-
-class OBJECT_OT_randomize_keys(bpy.types.Operator):
-    bl_idname = "object.randomize_keys"
-    bl_label = "Randomize Keyframes"
-    bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for seed. Randomize keyframes Y-Value"
-
-    _timer = None
-    initial_mouse_x = None
-    initial_keyframe_data = {}
-    
-    _current_strength = 0.0
-    _current_seed = 0
-
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
-
-    def _apply_randomization(self, context, strength):
-        random.seed(self._current_seed)
-        
-        # Dictionary zum Speichern der Zufallswerte pro Knochen
-        bone_random_offsets = {}
-        
-        for (data_path, keyframe_index, array_index), initial_data in self.initial_keyframe_data.items():
-            fcurve = None
-            for fc in context.active_object.animation_data.action.fcurves:
-                if fc.data_path == data_path and fc.array_index == array_index:
-                    fcurve = fc
-                    break
-
-            if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                continue
-            
-            keyframe = fcurve.keyframe_points[keyframe_index]
-            
-            # Neue Logik: Zufalls-Offset basierend auf der Eigenschaft
-            if context.scene.use_bone_randomization:
-                # Extrahiere Knochennamen aus dem data_path
-                try:
-                    bone_name = data_path.split('"')[1]
-                except IndexError:
-                    bone_name = None # Fallback für nicht-Knochen-Pfade
-                
-                if bone_name not in bone_random_offsets:
-                    # Berechne den Offset nur einmal pro Knochen
-                    bone_random_offsets[bone_name] = random.uniform(-strength, strength)
-                
-                random_offset_y = bone_random_offsets.get(bone_name, 0.0)
-            else:
-                # Ursprüngliche Logik: Zufalls-Offset pro Kanal
-                random_offset_y = random.uniform(-strength, strength)
-                
-            keyframe.co[1] = initial_data['co_y'] + random_offset_y
-
-            # Die Handle-Vektoren werden basierend auf der neuen Keyframe-Position neu berechnet.
-            keyframe.handle_left[0] = keyframe.co[0] + initial_data['handle_left_vec'][0]
-            keyframe.handle_left[1] = keyframe.co[1] + initial_data['handle_left_vec'][1]
-            keyframe.handle_right[0] = keyframe.co[0] + initial_data['handle_right_vec'][0]
-            keyframe.handle_right[1] = keyframe.co[1] + initial_data['handle_right_vec'][1]
-        
-        for area in context.screen.areas:
-            if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                area.tag_redraw()
-
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-                
-            base_divisor = 1000.0 if event.alt else 200.0
-            delta_x = event.mouse_x - self.initial_mouse_x
-            delta_x = max(0.0, delta_x)
-            power_exponent = 2.0
-            abs_delta_x = abs(delta_x)
-            strength = (abs_delta_x / base_divisor) ** power_exponent
-            if delta_x < 0:
-                strength *= -1.0
-            
-            self._current_strength = strength
-            self._apply_randomization(context, self._current_strength)
-            
-            return {'RUNNING_MODAL'}
-            
-        elif event.type == 'WHEELUPMOUSE':
-            self._current_seed += 1
-            self._apply_randomization(context, self._current_strength)
-            self.report({'INFO'}, f"Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-        
-        elif event.type == 'WHEELDOWNMOUSE':
-            self._current_seed -= 1
-            self._apply_randomization(context, self._current_strength)
-            self.report({'INFO'}, f"Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-
-        elif event.type == 'LEFTMOUSE':
-            for (data_path, keyframe_index, array_index), initial_data in self.initial_keyframe_data.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.interpolation = 'BEZIER'
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'FINISHED'}
-        
-    
-
-
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            for (data_path, keyframe_index, array_index), initial_data in self.initial_keyframe_data.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.co[1] = initial_data['co_y']
-                    keyframe.handle_left[0] = initial_data['co_x'] + initial_data['handle_left_vec'][0]
-                    keyframe.handle_left[1] = initial_data['co_y'] + initial_data['handle_left_vec'][1]
-                    keyframe.handle_right[0] = initial_data['co_x'] + initial_data['handle_right_vec'][0]
-                    keyframe.handle_right[1] = initial_data['co_y'] + initial_data['handle_right_vec'][1]
-                    keyframe.handle_left_type = initial_data['handle_left_type']
-                    keyframe.handle_right_type = initial_data['handle_right_type']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-                        
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}
-
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        if context.active_object is None or context.active_object.animation_data is None:
-            self.report({'WARNING'}, "Kein aktives Objekt oder keine Animationsdaten.")
-            return {'CANCELLED'}
-
-        if not context.selected_visible_fcurves:
-            self.report({'WARNING'}, "Keine F-Kurven im Graph Editor sichtbar und ausgewählt.")
-            return {'CANCELLED'}
-        
-        # Filtern der Keyframes in der invoke-Methode
-        filtered_keyframes_data = []
-        epsilon = 1e-6
-        
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe.select_control_point:
-                    current_value = keyframe.co[1]
-                    has_different_neighbor = False
-                    
-                    # Prüfen auf vorherigen Keyframe
-                    if keyframe_index > 0:
-                        prev_keyframe = fcurve.keyframe_points[keyframe_index - 1]
-                        if abs(prev_keyframe.co[1] - current_value) > epsilon:
-                            has_different_neighbor = True
-                    
-                    # Prüfen auf nächsten Keyframe
-                    if not has_different_neighbor and keyframe_index < len(fcurve.keyframe_points) - 1:
-                        next_keyframe = fcurve.keyframe_points[keyframe_index + 1]
-                        if abs(next_keyframe.co[1] - current_value) > epsilon:
-                            has_different_neighbor = True
-                    
-                    if has_different_neighbor:
-                        filtered_keyframes_data.append({
-                            'fcurve': fcurve,
-                            'keyframe': keyframe,
-                            'keyframe_index': keyframe_index
-                        })
-
-        if not filtered_keyframes_data:
-            self.report({'WARNING'}, "Keine Keyframes gefunden, die unterschiedliche Nachbarwerte haben.")
-            return {'CANCELLED'}
-
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-
-        self.initial_mouse_x = event.mouse_x
-        self.initial_keyframe_data.clear()
-        
-        self._current_strength = 0.0
-        self._current_seed = 0
-        
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
-
-        # Speichern nur der gefilterten Keyframes
-        for data in filtered_keyframes_data:
-            fcurve = data['fcurve']
-            keyframe = data['keyframe']
-            keyframe_index = data['keyframe_index']
-            
-            key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-            
-            self.initial_keyframe_data[key] = {
-                'co_x': keyframe.co[0], 
-                'co_y': keyframe.co[1],
-                'handle_left_type': keyframe.handle_left_type,
-                'handle_right_type': keyframe.handle_right_type,
-                'handle_left_vec': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                'handle_right_vec': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1])
-            }
-        
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
-
-
-
-
-class OBJECT_OT_random_x_pos(bpy.types.Operator):
-    bl_idname = "object.random_x_pos"
-    bl_label = "Randomize Keyframes"
-    bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for seed. Randomize keyframes X-Value"
-                     
-
-    _timer = None
-    initial_mouse_x = None
-    initial_keyframe_data = {}
-    
-    _current_strength = 0.0
-    _current_seed = 0
-    
-    _initial_frame_start = 0
-    _initial_frame_end = 0
-
-    # Neuer Schalter für die Randomisierungs-Art
-    
-    
-
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                any(kf.select_control_point for fc in context.selected_visible_fcurves for kf in fc.keyframe_points))
-
-    def _apply_randomization(self, context, strength):
-        random.seed(self._current_seed)
-        
-        if self.use_bone_randomization:
-            # Logic for per-bone randomization
-            bone_offsets = {}
-            for (data_path, _, _), _ in self.initial_keyframe_data.items():
-                if data_path.startswith('pose.bones['):
-                    bone_name = data_path.split('"')[1]
-                    if bone_name not in bone_offsets:
-                        bone_offsets[bone_name] = random.uniform(-strength, strength)
-
-            for (data_path, keyframe_index, array_index), initial_data in self.initial_keyframe_data.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves
-                               if fc.data_path == data_path and fc.array_index == array_index), None)
-                
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                offset_x = bone_offsets.get(data_path.split('"')[1], 0.0) if data_path.startswith('pose.bones[') else 0.0
-                
-                keyframe.co[0] = initial_data['co_x'] + offset_x
-                keyframe.handle_left[0] = initial_data['co_x'] + initial_data['handle_left_vec'][0] + offset_x
-                keyframe.handle_right[0] = initial_data['co_x'] + initial_data['handle_right_vec'][0] + offset_x
-
-        else:
-            # Logic for per-channel randomization (original logic)
-            for (data_path, keyframe_index, array_index), initial_data in self.initial_keyframe_data.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves
-                               if fc.data_path == data_path and fc.array_index == array_index), None)
-                
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                random_offset_x = random.uniform(-strength, strength)
-                
-                keyframe.co[0] = initial_data['co_x'] + random_offset_x
-                keyframe.handle_left[0] = initial_data['co_x'] + initial_data['handle_left_vec'][0] + random_offset_x
-                keyframe.handle_right[0] = initial_data['co_x'] + initial_data['handle_right_vec'][0] + random_offset_x
-
-        for area in context.screen.areas:
-            if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                area.tag_redraw()
-
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                new_x = context.window.width - 10 if event.mouse_x < 5 else 10
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-                
-            base_divisor = 1000.0 if event.alt else 200.0
-            delta_x = event.mouse_x - self.initial_mouse_x
-            delta_x = max(0.0, delta_x)
-            power_exponent = 2.0
-            strength = abs(delta_x / base_divisor) ** power_exponent
-            strength = strength if delta_x >= 0 else -strength
-            
-            self._current_strength = strength
-            self._apply_randomization(context, self._current_strength)
-            return {'RUNNING_MODAL'}
-            
-        elif event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
-            self._current_seed += 1 if event.type == 'WHEELUPMOUSE' else -1
-            self._apply_randomization(context, self._current_strength)
-            self.report({'INFO'}, f"Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-
-        elif event.type == 'LEFTMOUSE':
-            for (data_path, keyframe_index, array_index), initial_data in self.initial_keyframe_data.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves
-                               if fc.data_path == data_path and fc.array_index == array_index), None)
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.interpolation = 'BEZIER'
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer: context.window_manager.event_timer_remove(self._timer)
-            return {'FINISHED'}
-            
-        elif event.type in {'RIGHTMOUSE', 'ESC'}:
-            for (data_path, keyframe_index, array_index), initial_data in self.initial_keyframe_data.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves
-                               if fc.data_path == data_path and fc.array_index == array_index), None)
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.co[0] = initial_data['co_x']
-                    keyframe.co[1] = initial_data['co_y']
-                    keyframe.handle_left[0] = initial_data['co_x'] + initial_data['handle_left_vec'][0]
-                    keyframe.handle_left[1] = initial_data['co_y'] + initial_data['handle_left_vec'][1]
-                    keyframe.handle_right[0] = initial_data['co_x'] + initial_data['handle_right_vec'][0]
-                    keyframe.handle_right[1] = initial_data['co_y'] + initial_data['handle_right_vec'][1]
-                    keyframe.handle_left_type = initial_data['handle_left_type']
-                    keyframe.handle_right_type = initial_data['handle_right_type']
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer: context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}
-
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        if not self.poll(context):
-            self.report({'WARNING'}, "Voraussetzungen nicht erfüllt.")
-            return {'CANCELLED'}
-        
-        filtered_keyframes_data = []
-        self.use_bone_randomization = context.scene.use_bone_randomization
-        
-        if self.use_bone_randomization:
-            # Bone-basierte Filterung
-            filtered_bones = set()
-            for fcurve in context.selected_visible_fcurves:
-                if not fcurve.data_path.startswith('pose.bones['): continue
-                for kf_idx, kf in enumerate(fcurve.keyframe_points):
-                    if kf.select_control_point:
-                        if (kf_idx > 0 and abs(fcurve.keyframe_points[kf_idx - 1].co[0] - kf.co[0]) > 1e-6) or \
-                           (kf_idx < len(fcurve.keyframe_points) - 1 and abs(fcurve.keyframe_points[kf_idx + 1].co[0] - kf.co[0]) > 1e-6):
-                            filtered_bones.add(fcurve.data_path.split('"')[1])
-                            break
-            
-            if not filtered_bones:
-                self.report({'WARNING'}, "Keine Keyframes von Bones mit unterschiedlichen Nachbarn gefunden.")
-                return {'CANCELLED'}
-
-            for fcurve in context.selected_visible_fcurves:
-                if fcurve.data_path.startswith('pose.bones[') and fcurve.data_path.split('"')[1] in filtered_bones:
-                    for kf_idx, kf in enumerate(fcurve.keyframe_points):
-                        if kf.select_control_point:
-                            filtered_keyframes_data.append({'fcurve': fcurve, 'keyframe': kf, 'keyframe_index': kf_idx})
-        
-        else:
-            # Channel-basierte Filterung (Original-Logik)
-            for fcurve in context.selected_visible_fcurves:
-                for kf_idx, kf in enumerate(fcurve.keyframe_points):
-                    if kf.select_control_point:
-                        if (kf_idx > 0 and abs(fcurve.keyframe_points[kf_idx - 1].co[0] - kf.co[0]) > 1e-6) or \
-                           (kf_idx < len(fcurve.keyframe_points) - 1 and abs(fcurve.keyframe_points[kf_idx + 1].co[0] - kf.co[0]) > 1e-6):
-                            filtered_keyframes_data.append({'fcurve': fcurve, 'keyframe': kf, 'keyframe_index': kf_idx})
-
-        if not filtered_keyframes_data:
-            self.report({'WARNING'}, "Keine Keyframes mit unterschiedlichen Nachbarwerten gefunden.")
-            return {'CANCELLED'}
-
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-
-        self.initial_mouse_x = event.mouse_x
-        self.initial_keyframe_data.clear()
-        self._current_strength = 0.0
-        self._current_seed = 0
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
-
-        for data in filtered_keyframes_data:
-            fcurve, kf, kf_idx = data['fcurve'], data['keyframe'], data['keyframe_index']
-            key = (fcurve.data_path, kf_idx, fcurve.array_index)
-            self.initial_keyframe_data[key] = {
-                'co_x': kf.co[0], 'co_y': kf.co[1],
-                'handle_left_type': kf.handle_left_type, 'handle_right_type': kf.handle_right_type,
-                'handle_left_vec': (kf.handle_left[0] - kf.co[0], kf.handle_left[1] - kf.co[1]),
-                'handle_right_vec': (kf.handle_right[0] - kf.co[0], kf.handle_right[1] - kf.co[1])
-            }
-        
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
-
-
-class OBJECT_OT_randomize_handle_rotation(bpy.types.Operator):
-    bl_idname = "object.randomize_handle_rotation"
-    bl_label = "Randomize Handle Rotation" # label for button
-    bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for seed. Randomize handle rotation"
-
-    _timer = None
-    initial_mouse_x = None
-    initial_handle_vectors = {}
-    initial_handle_types = {}
-    _current_strength = 0.0
-    _current_seed = 0
-    _initial_frame_start = 0
-    _initial_frame_end = 0
-
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
-
-    def _apply_randomized_extrusion(self, context, strength):
-        random.seed(self._current_seed)
-        
-        # Dictionary zum Speichern der Zufallswerte pro Knochen
-        bone_random_rotations = {}
-
-        for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-            fcurve = None
-            for fc in context.active_object.animation_data.action.fcurves:
-                if fc.data_path == data_path and fc.array_index == array_index:
-                    fcurve = fc
-                    break
-
-            if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                continue
-            
-            keyframe = fcurve.keyframe_points[keyframe_index]
-            
-            # Neue Logik: Zufallsrotation basierend auf der Eigenschaft
-            if context.scene.use_bone_randomization:
-                # Extrahiere Knochennamen aus dem data_path
-                try:
-                    bone_name = data_path.split('"')[1]
-                except IndexError:
-                    bone_name = None  # Fallback für nicht-Knochen-Pfade
-                
-                if bone_name not in bone_random_rotations:
-                    # Berechne den Rotationswert nur einmal pro Knochen
-                    bone_random_rotations[bone_name] = random.uniform(-strength * math.pi, strength * math.pi)
-                
-                random_rotation_rad = bone_random_rotations.get(bone_name, 0.0)
-            else:
-                # Ursprüngliche Logik: Zufallsrotation pro Kanal
-                random_rotation_rad = random.uniform(-strength * math.pi, strength * math.pi)
-
-            # Linkes Handle
-            vec_left_initial = initial_vectors['left']
-            length_left_initial = math.sqrt(vec_left_initial[0]**2 + vec_left_initial[1]**2)
-            
-            if length_left_initial > 0:
-                initial_angle_left = math.atan2(vec_left_initial[1], vec_left_initial[0])
-                new_angle_left = initial_angle_left + random_rotation_rad
-                
-                new_x_left = keyframe.co[0] + length_left_initial * math.cos(new_angle_left)
-                new_y_left = keyframe.co[1] + length_left_initial * math.sin(new_angle_left)
-                keyframe.handle_left[0] = new_x_left
-                keyframe.handle_left[1] = new_y_left
-
-            # Rechtes Handle
-            vec_right_initial = initial_vectors['right']
-            length_right_initial = math.sqrt(vec_right_initial[0]**2 + vec_right_initial[1]**2)
-
-            if length_right_initial > 0:
-                initial_angle_right = math.atan2(vec_right_initial[1], vec_right_initial[0])
-                new_angle_right = initial_angle_right + random_rotation_rad
-                
-                new_x_right = keyframe.co[0] + length_right_initial * math.cos(new_angle_right)
-                new_y_right = keyframe.co[1] + length_right_initial * math.sin(new_angle_right)
-                keyframe.handle_right[0] = new_x_right
-                keyframe.handle_right[1] = new_y_right
-        
-        for area in context.screen.areas:
-            if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                area.tag_redraw()
-
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-            
-            base_divisor = 1000.0 if event.alt else 200.0
-            delta_x = (event.mouse_x - self.initial_mouse_x) * 0.1
-            
-            # Verhindere, dass delta_x negativ wird
-            delta_x = max(0.0, delta_x)
-            
-            power_exponent = 2.0
-            strength = (delta_x / base_divisor) ** power_exponent
-            
-            self._current_strength = strength
-            self._apply_randomized_extrusion(context, self._current_strength)
-            #self.report({'INFO'}, f"Strength: {10000 *self._current_strength:.2f}, Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-            
-        elif event.type == 'WHEELUPMOUSE':
-            self._current_seed += 1
-            self._apply_randomized_extrusion(context, self._current_strength)
-            self.report({'INFO'}, f"Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-        
-        elif event.type == 'WHEELDOWNMOUSE':
-            self._current_seed -= 1
-            self._apply_randomized_extrusion(context, self._current_strength)
-            self.report({'INFO'}, f"Strength: {self._current_strength:.6f}, Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-
-        elif event.type == 'LEFTMOUSE':
-            # Iteriere über alle initial gespeicherten Keyframes
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                # Wenn der Keyframe noch existiert, setze die Handle-Typen
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
-
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-
-            context.window.cursor_set('DEFAULT')
-            return {'FINISHED'}
-        
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                initial_types = self.initial_handle_types[(data_path, keyframe_index, array_index)]
-                
-                keyframe.handle_left[0] = keyframe.co[0] + initial_vectors['left'][0]
-                keyframe.handle_left[1] = keyframe.co[1] + initial_vectors['left'][1]
-                keyframe.handle_right[0] = keyframe.co[0] + initial_vectors['right'][0]
-                keyframe.handle_right[1] = keyframe.co[1] + initial_vectors['right'][1]
-                
-                keyframe.handle_left_type = initial_types['left']
-                keyframe.handle_right_type = initial_types['right']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}
-
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        if not context.selected_visible_fcurves or not [kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]:
-            self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
-            return {'CANCELLED'}
-        
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-        
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
-        
-        self.initial_mouse_x = event.mouse_x
-        self.initial_handle_vectors.clear()
-        self.initial_handle_types.clear()
-        self._current_strength = 0.0
-        self._current_seed = 0
-
-        selected_keyframes_found = False
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe.select_control_point:
-                    
-                    # Wert des aktuellen Keyframes
-                    current_value = keyframe.co[1]
-                    
-                    # Checke, ob der Wert des vorherigen oder nächsten Keyframes anders ist
-                    has_different_neighbor = False
-                    num_decimals = 6  # Definiere die Anzahl der Nachkommastellen
-
-                    # Runde den aktuellen Wert für den Vergleich
-                    rounded_current_value = round(current_value, num_decimals)
-
-                    if keyframe_index > 0:
-                        prev_keyframe = fcurve.keyframe_points[keyframe_index - 1]
-                        # Runde auch den Wert des vorherigen Keyframes
-                        rounded_prev_value = round(prev_keyframe.co[1], num_decimals)
-                        
-                        if rounded_prev_value != rounded_current_value:
-                            has_different_neighbor = True
-
-                    if keyframe_index < len(fcurve.keyframe_points) - 1:
-                        next_keyframe = fcurve.keyframe_points[keyframe_index + 1]
-                        # Runde auch den Wert des nächsten Keyframes
-                        rounded_next_value = round(next_keyframe.co[1], num_decimals)
-                        
-                        if rounded_next_value != rounded_current_value:
-                            has_different_neighbor = True
-                    
-                    if has_different_neighbor:
-                        selected_keyframes_found = True
-                        key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-                        
-                        self.initial_handle_types[key] = {
-                            'left': keyframe.handle_left_type,
-                            'right': keyframe.handle_right_type
-                        }
-                        self.initial_handle_vectors[key] = {
-                            'left': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                            'right': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1]),
-                        }
-
-        if not selected_keyframes_found:
-            self.report({'WARNING'}, "Neighbouring keys have the same value")
-            return {'CANCELLED'}
-        
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
-
-
-class OBJECT_OT_slide_handles(bpy.types.Operator):
-    bl_idname = "object.slide_manipulator"
-    bl_label = "Slide Handles"
-    bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Slide handles"
-    
-    _timer = None
-    initial_mouse_x = None
-    initial_handle_vectors = {}
-    initial_handle_types = {}
-    initial_keyframe_data = {}
-
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
-
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-            
-            delta_x = event.mouse_x - self.initial_mouse_x
-            
-            # Neue Logik: Das Verschieben der Maus steuert das Verhältnis
-            # Vergrößerung/Schrumpfung
-            ratio = max(min(delta_x / 200.0, 1.0), -1.0) # Begrenzt auf [-1, 1]
-
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-
-                if not fcurve:
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                
-                vec_right_initial = initial_vectors['right']
-                vec_left_initial = initial_vectors['left']
-
-                length_right_initial = (vec_right_initial[0]**2 + vec_right_initial[1]**2)**0.5
-                length_left_initial = (vec_left_initial[0]**2 + vec_left_initial[1]**2)**0.5
-                
-                # Gesamtlänge bleibt konstant
-                total_length = length_right_initial + length_left_initial
-                
-                # Berechne die neue Länge für den rechten Handle
-                new_length_right = length_right_initial * (1.0 + ratio)
-                
-                # Begrenze die neue Länge, um negativen oder zu hohen Werten vorzubeugen
-                if new_length_right < 0:
-                    new_length_right = 0
-                if new_length_right > total_length:
-                    new_length_right = total_length
-                
-                # Die neue Länge des linken Handles ist die Differenz zur Gesamtlänge
-                new_length_left = total_length - new_length_right
-                
-                # Aktualisiere die Handles basierend auf den neuen Längen und den ursprünglichen Vektoren
-                if length_right_initial > 0:
-                    unit_vector_right = (vec_right_initial[0] / length_right_initial, vec_right_initial[1] / length_right_initial)
-                    keyframe.handle_right[0] = keyframe.co[0] + unit_vector_right[0] * new_length_right
-                    keyframe.handle_right[1] = keyframe.co[1] + unit_vector_right[1] * new_length_right
-                
-                if length_left_initial > 0:
-                    unit_vector_left = (vec_left_initial[0] / length_left_initial, vec_left_initial[1] / length_left_initial)
-                    keyframe.handle_left[0] = keyframe.co[0] + unit_vector_left[0] * new_length_left
-                    keyframe.handle_left[1] = keyframe.co[1] + unit_vector_left[1] * new_length_left
-            
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-
-        elif event.type == 'LEFTMOUSE':
-            for (data_path, keyframe_index, array_index), types in self.initial_handle_types.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if fcurve:
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.interpolation = 'BEZIER'
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'FINISHED'}
-        
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-
-                if not fcurve:
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                
-                vec_right_initial = initial_vectors['right']
-                keyframe.handle_right[0] = keyframe.co[0] + vec_right_initial[0]
-                keyframe.handle_right[1] = keyframe.co[1] + vec_right_initial[1]
-
-                vec_left_initial = initial_vectors['left']
-                keyframe.handle_left[0] = keyframe.co[0] + vec_left_initial[0]
-                keyframe.handle_left[1] = keyframe.co[1] + vec_left_initial[1]
-                
-                types = self.initial_handle_types[(data_path, keyframe_index, array_index)]
-                keyframe.handle_left_type = types['left']
-                keyframe.handle_right_type = types['right']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}          
-        
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        if context.active_object is None or context.active_object.animation_data is None:
-            self.report({'WARNING'}, "No active object or animation data.")
-            return {'CANCELLED'}
-
-        if context.active_object is None or context.active_object.animation_data is None:
-            self.report({'WARNING'}, "Kein aktives Objekt oder keine Animationsdaten.")
-            return {'CANCELLED'}
-
-        if not context.selected_visible_fcurves:
-            self.report({'WARNING'}, "Keine F-Kurven im Graph Editor sichtbar und ausgewählt.")
-            return {'CANCELLED'}
-        
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-            
-        # --- NEUE FUNKTION HIER AUFRUFEN ---
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-
-        self.initial_mouse_x = event.mouse_x
-        self.initial_handle_vectors.clear()
-        self.initial_handle_types.clear()
-        self.initial_keyframe_data.clear()
-        
-        if context.screen.is_animation_playing:
-            # Cursor zum Start der Timeline springen lassen
-            context.scene.frame_current = context.scene.frame_start
-
-        
-        selected_keyframes_found = False
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe.select_control_point:
-                    selected_keyframes_found = True
-                    key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-                    
-                    self.initial_keyframe_data[key] = {
-                        'co_x': keyframe.co[0],
-                    }
-                    
-                    self.initial_handle_types[key] = {
-                        'left': keyframe.handle_left_type,
-                        'right': keyframe.handle_right_type
-                    }
-                    
-                    self.initial_handle_vectors[key] = {
-                        'left': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                        'right': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1]),
-                    }
-
-        if not selected_keyframes_found:
-            self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
-            return {'CANCELLED'}
-
-        context.window.cursor_set('SCROLL_X')
-        self._timer = context.window_manager.event_timer_add(0.01, window=context.window)
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
-
-
-
-import bpy
-import math
-
-# Hilfsfunktionen sind hier nicht gezeigt, aber sie sollten vorhanden sein.
-# set_handles_aligned
-# reset_handles
-# set_timeline_range_to_selected
-
-class OBJECT_OT_manipulate_right_handles(bpy.types.Operator):
-    bl_idname = "object.manipulate_right_handles"
-    bl_label = "Manipulate Right Handles"
-    bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Extrude right handles"
-    
-    mode: bpy.props.EnumProperty(
-        items=[
-            ('EXTRUDE', "Extrude", "Extrudes the handles"),
-            ('SLIDE', "Slide", "Slides the handles")
-        ],
-        name="Mode",
-        default='EXTRUDE'
-    )
-    
-    _timer = None
-    initial_mouse_x = None
-    initial_mouse_y = None
-    
-    initial_vectors_left_batch = {}
-    initial_types_left_batch = {}
-    initial_keyframe_coords_left_batch = {}
-    initial_partner_x_coords_left = {}
-    initial_keyframe_distances_left = {}
-    
-    initial_vectors_right_batch = {}
-    initial_types_right_batch = {}
-    initial_keyframe_coords_right_batch = {}
-    initial_partner_x_coords_right = {}
-    initial_keyframe_distances_right = {}
-    
-    
-
-    @classmethod
-    def poll(cls, context):
-        if not (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves):
-            return False
-        
-        for fcurve in context.selected_visible_fcurves:
-            selected_keyframes_in_fcurve = [kf for kf in fcurve.keyframe_points if kf.select_control_point]
-            if len(selected_keyframes_in_fcurve) >= 2:
-                return True
-        return False
-    
-    def modal(self, context, event):
-        extrude_sensitivity = 0.1
-        if event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
-        # Wechsel den Modus bei Tastendruck 'X'
-        #if event.type == 'X' and event.value == 'PRESS':
-            if self.mode == 'EXTRUDE':
-                self.mode = 'SLIDE'
-                self.report({'INFO'}, "Switched to Slide Mode")
-                context.window.cursor_set('SCROLL_Y')  # Besser passender Cursor
-            elif self.mode == 'SLIDE':
-                self.mode = 'EXTRUDE'
-                self.report({'INFO'}, "Switched to Extrude Mode")
-                context.window.cursor_set('SCROLL_X') # Besser passender Cursor
-            
-            # Setze die Maus-Position neu
-            self.initial_mouse_x = event.mouse_x
-            self.initial_mouse_y = event.mouse_y
-            return {'RUNNING_MODAL'}
-        
-        if event.type == 'MOUSEMOVE':
-            # Cursor-Warping-Logik
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-            
-            delta_x = event.mouse_x - self.initial_mouse_x
-            
-            # Gemeinsame Logik für beide Modi
-            # left batch (handle right)
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_vectors_left_batch.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves if fc.data_path == data_path and fc.array_index == array_index), None)
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points): continue
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                vec_right_initial = initial_vectors['right']
-                length_right_initial = math.sqrt(vec_right_initial[0]**2 + vec_right_initial[1]**2)
-                
-                # Modus-spezifische Logik für die Anpassung der Länge
-                if self.mode == 'EXTRUDE':
-                    adjustment_amount = (delta_x * extrude_sensitivity)
-                elif self.mode == 'SLIDE':
-                    adjustment_amount = (delta_x * extrude_sensitivity)
-
-                keyframe_x_distance = self.initial_keyframe_distances_left.get((data_path, keyframe_index, array_index), 1.0)
-                if keyframe_x_distance < 1.0: keyframe_x_distance = 1.0
-                min_length = 0.001 * keyframe_x_distance
-                
-                new_length_right = max(length_right_initial + adjustment_amount, min_length)
-                
-                if length_right_initial > 1e-6:
-                    factor = new_length_right / length_right_initial
-                    new_x_right_unlimited = keyframe.co[0] + vec_right_initial[0] * factor
-                    new_y_right_unlimited = keyframe.co[1] + vec_right_initial[1] * factor
-                else:
-                    new_x_right_unlimited = keyframe.co[0] + new_length_right
-                    new_y_right_unlimited = keyframe.co[1]
-
-                partner_x_coord = self.initial_partner_x_coords_left.get((data_path, keyframe_index, array_index), keyframe.co[0])
-                new_x_right = max(min(new_x_right_unlimited, partner_x_coord), keyframe.co[0])
-                
-                dx_initial = initial_vectors['right'][0]
-                dy_initial = initial_vectors['right'][1]
-
-                if abs(dx_initial) > 1e-6:
-                    new_y_right = keyframe.co[1] + (new_x_right - keyframe.co[0]) * (dy_initial / dx_initial)
-                else:
-                    if dy_initial > 0:
-                        new_y_right = keyframe.co[1] + math.sqrt((new_x_right - keyframe.co[0])**2 + (new_y_right_unlimited - keyframe.co[1])**2)
-                    else:
-                        new_y_right = keyframe.co[1] - math.sqrt((new_x_right - keyframe.co[0])**2 + (new_y_right_unlimited - keyframe.co[1])**2)
-
-                keyframe.handle_right[0] = new_x_right
-                keyframe.handle_right[1] = new_y_right
-
-            # right batch (handle left)
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_vectors_right_batch.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves if fc.data_path == data_path and fc.array_index == array_index), None)
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points): continue
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                vec_left_initial = initial_vectors['left']
-                length_left_initial = math.sqrt(vec_left_initial[0]**2 + vec_left_initial[1]**2)
-
-                # Modus-spezifische Logik für die Anpassung der Länge
-                if self.mode == 'EXTRUDE':
-                    adjustment_amount = (delta_x * extrude_sensitivity)
-                elif self.mode == 'SLIDE':
-                    adjustment_amount = -(delta_x * extrude_sensitivity)  # HIER WIRD DIE RICHTUNG UMGEKEHRT
-
-                keyframe_x_distance = self.initial_keyframe_distances_right.get((data_path, keyframe_index, array_index), 1.0)
-                if keyframe_x_distance < 1.0: keyframe_x_distance = 1.0
-                min_length = 0.001 * keyframe_x_distance
-
-                new_length_left = max(length_left_initial + adjustment_amount, min_length)
-                
-                if length_left_initial > 1e-6:
-                    factor = new_length_left / length_left_initial
-                    new_x_left_unlimited = keyframe.co[0] + vec_left_initial[0] * factor
-                    new_y_left_unlimited = keyframe.co[1] + vec_left_initial[1] * factor
-                else:
-                    new_x_left_unlimited = keyframe.co[0] - new_length_left
-                    new_y_left_unlimited = keyframe.co[1]
-                
-                partner_x_coord = self.initial_partner_x_coords_right.get((data_path, keyframe_index, array_index), keyframe.co[0])
-                new_x_left = min(max(new_x_left_unlimited, partner_x_coord), keyframe.co[0])
-                
-                dx_initial = initial_vectors['left'][0]
-                dy_initial = initial_vectors['left'][1]
-
-                if abs(dx_initial) > 1e-6:
-                    new_y_left = keyframe.co[1] + (new_x_left - keyframe.co[0]) * (dy_initial / dx_initial)
-                else:
-                    if dy_initial > 0:
-                        new_y_left = keyframe.co[1] + math.sqrt((new_x_left - keyframe.co[0])**2 + (new_y_left_unlimited - keyframe.co[1])**2)
-                    else:
-                        new_y_left = keyframe.co[1] - math.sqrt((new_x_left - keyframe.co[0])**2 + (new_y_left_unlimited - keyframe.co[1])**2)
-
-                keyframe.handle_left[0] = new_x_left
-                keyframe.handle_left[1] = new_y_left
-            
-            # Finalize changes for both modes
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-            
-            return {'RUNNING_MODAL'}
-            
-        elif event.type == 'LEFTMOUSE':
-            set_handles_aligned(context, self.initial_types_left_batch)
-            set_handles_aligned(context, self.initial_types_right_batch)
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'FINISHED'}
-        
-        elif event.type in {'RIGHTMOUSE', 'ESC'}:
-            reset_handles(context, self.initial_vectors_left_batch, self.initial_types_left_batch, self.initial_keyframe_coords_left_batch)
-            reset_handles(context, self.initial_vectors_right_batch, self.initial_types_right_batch, self.initial_keyframe_coords_right_batch)
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}
-
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        self.mode = 'EXTRUDE'
-        if not self.poll(context):
-            self.report({'WARNING'}, "No active object or matching keyframes found.")
-            return {'CANCELLED'}
-        
-        # Den Modus nicht explizit auf "EXTRUDE" setzen.
-        # Er wird automatisch auf den Standardwert des EnumProperty gesetzt,
-        # wenn der Operator zum ersten Mal ausgeführt wird,
-        # und behält seinen Wert danach bei, bis er geändert wird.
-
-        self.initial_mouse_x = event.mouse_x
-        self.initial_mouse_y = event.mouse_y
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        # Clear all dictionaries
-        self.initial_vectors_left_batch.clear()
-        self.initial_types_left_batch.clear()
-        self.initial_keyframe_coords_left_batch.clear()
-        self.initial_partner_x_coords_left.clear()
-        self.initial_keyframe_distances_left.clear()
-        self.initial_vectors_right_batch.clear()
-        self.initial_types_right_batch.clear()
-        self.initial_keyframe_coords_right_batch.clear()
-        self.initial_partner_x_coords_right.clear()
-        self.initial_keyframe_distances_right.clear()
-        
-        has_valid_pair = False
-        for fcurve in context.selected_visible_fcurves:
-            selected_keyframes_with_indices = [(index, kf) for index, kf in enumerate(fcurve.keyframe_points) if kf.select_control_point]
-            if len(selected_keyframes_with_indices) >= 2:
-                has_valid_pair = True
-                selected_keyframes_with_indices.sort(key=lambda item: item[1].co[0])
-                first_keyframe_index, first_keyframe = selected_keyframes_with_indices[0]
-                last_keyframe_index, last_keyframe = selected_keyframes_with_indices[-1]
-
-                keyframe_x_distance = last_keyframe.co[0] - first_keyframe.co[0]
-                self.initial_keyframe_distances_left[(fcurve.data_path, first_keyframe_index, fcurve.array_index)] = keyframe_x_distance
-                self.initial_keyframe_distances_right[(fcurve.data_path, last_keyframe_index, fcurve.array_index)] = keyframe_x_distance
-
-                key_first = (fcurve.data_path, first_keyframe_index, fcurve.array_index)
-                key_last = (fcurve.data_path, last_keyframe_index, fcurve.array_index)
-                
-                self.initial_types_left_batch[key_first] = {'left': first_keyframe.handle_left_type, 'right': first_keyframe.handle_right_type}
-                self.initial_vectors_left_batch[key_first] = {'left': (first_keyframe.handle_left[0] - first_keyframe.co[0], first_keyframe.handle_left[1] - first_keyframe.co[1]),
-                                                             'right': (first_keyframe.handle_right[0] - first_keyframe.co[0], first_keyframe.handle_right[1] - first_keyframe.co[1])}
-                self.initial_keyframe_coords_left_batch[key_first] = {'co_x': first_keyframe.co[0], 'co_y': first_keyframe.co[1]}
-                self.initial_partner_x_coords_left[key_first] = last_keyframe.co[0]
-
-                self.initial_types_right_batch[key_last] = {'left': last_keyframe.handle_left_type, 'right': last_keyframe.handle_right_type}
-                self.initial_vectors_right_batch[key_last] = {'left': (last_keyframe.handle_left[0] - last_keyframe.co[0], last_keyframe.handle_left[1] - last_keyframe.co[1]),
-                                                             'right': (last_keyframe.handle_right[0] - last_keyframe.co[0], last_keyframe.handle_right[1] - last_keyframe.co[1])}
-                self.initial_keyframe_coords_right_batch[key_last] = {'co_x': last_keyframe.co[0], 'co_y': last_keyframe.co[1]}
-                self.initial_partner_x_coords_right[key_last] = first_keyframe.co[0]
-
-        if not has_valid_pair:
-            self.report({'WARNING'}, "Es wurden keine F-Kurven gefunden, die mindestens zwei ausgewählte Keyframes enthalten.")
-            return {'CANCELLED'}
-
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
+    def randomize(self, context):
+        # Per-bone randomization only moves keys of pose bones, per-channel all keys
+        selection = self._selection
+        offsets_x = self._current_strength * self._random_draws.unit(self._current_seed, self.use_bone_randomization)
 
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+        co = selection.co.copy()
+        co[:, 0] += offsets_x
+        selection.write_co(co)
+        selection.write_handles(co + selection.handle_left_vec, co + selection.handle_right_vec)
 
-from mathutils import Vector
 
-class OBJECT_OT_scale_handles(bpy.types.Operator):
-    bl_idname = "object.scale_handles"
-    bl_label = "scale handles"
+class OBJECT_OT_randomize_handle_rotation(KeyframeRandomizeOperator, bpy.types.Operator):
+    bl_idname = "object.randomize_handle_rotation"
+    bl_label = "Randomize Handle Rotation" # label for button
     bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for Y- or X-Axis"
-    
-    _timer = None
-    initial_mouse_x = None
-    initial_mouse_y = None
-    _mode = 'X_AXIS'
-    initial_handle_vectors = {}
-    initial_handle_types = {}
-    initial_keyframe_data = {}
-    _initial_frame_start = None
-    _initial_frame_end = None
-
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
-    
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            # Maus-Warping für unendliche Bewegung
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-
-            if event.mouse_y < 5 or event.mouse_y > context.window.height - 5:
-                if event.mouse_y < 5:
-                    new_y = context.window.height - 10
-                else:
-                    new_y = 10
-                self.initial_mouse_y += (new_y - event.mouse_y)
-                context.window.cursor_warp(event.mouse_x, new_y)
-
-            delta_x = event.mouse_x - self.initial_mouse_x
-            delta_y = event.mouse_y - self.initial_mouse_y
-            
-            if self._mode == 'X_AXIS':
-                factor = delta_x / 200.0
-            elif self._mode == 'Y_AXIS':
-                factor = delta_x / 200.0
-            else: # 'XY_AXIS'
-                factor = delta_x / 200.0
-
-            for key, initial_vectors in self.initial_handle_vectors.items():
-                data_path, keyframe_index, array_index = key
-
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-
-                if not fcurve:
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                vec_left_initial = Vector(initial_vectors['left'])
-                vec_right_initial = Vector(initial_vectors['right'])
-
-                if self._mode == 'X_AXIS':
-                    # Skalierung nur in X-Richtung
-                    new_x_left = keyframe.co[0] + vec_left_initial.x * (1.0 + factor)
-                    new_y_left = keyframe.co[1] + vec_left_initial.y
-                    keyframe.handle_left[0] = new_x_left
-                    keyframe.handle_left[1] = new_y_left
-                    
-                    new_x_right = keyframe.co[0] + vec_right_initial.x * (1.0 + factor)
-                    new_y_right = keyframe.co[1] + vec_right_initial.y
-                    keyframe.handle_right[0] = new_x_right
-                    keyframe.handle_right[1] = new_y_right
-
-                elif self._mode == 'Y_AXIS':
-                    # Skalierung nur in Y-Richtung
-                    new_x_left = keyframe.co[0] + vec_left_initial.x
-                    new_y_left = keyframe.co[1] + vec_left_initial.y * (1.0 + factor)
-                    keyframe.handle_left[0] = new_x_left
-                    keyframe.handle_left[1] = new_y_left
-                    
-                    new_x_right = keyframe.co[0] + vec_right_initial.x
-                    new_y_right = keyframe.co[1] + vec_right_initial.y * (1.0 + factor)
-                    keyframe.handle_right[0] = new_x_right
-                    keyframe.handle_right[1] = new_y_right
-                
-                elif self._mode == 'XY_AXIS':
-                    # Proportionale Skalierung in X und Y
-                    new_vec_left = vec_left_initial * (1.0 + factor)
-                    new_vec_right = vec_right_initial * (1.0 + factor)
-                    
-                    keyframe.handle_left = keyframe.co + new_vec_left
-                    keyframe.handle_right = keyframe.co + new_vec_right
-                    
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-
-        elif event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
-            self.initial_mouse_x = event.mouse_x
-            self.initial_mouse_y = event.mouse_y
-            
-            if self._mode == 'X_AXIS':    
-                self._mode = 'XY_AXIS'
-                context.window.cursor_set('SCROLL_X')
-                self.report({'INFO'}, f"Initial-Axis")
-            elif self._mode == 'Y_AXIS':
-                self._mode = 'X_AXIS'
-                context.window.cursor_set('SCROLL_X')
-                self.report({'INFO'}, f"X-Axis")
-            else:
-                self._mode = 'Y_AXIS'
-                context.window.cursor_set('SCROLL_X')
-                self.report({'INFO'}, f"Y-Axis")
-                
-            
-            
-        elif event.type == 'LEFTMOUSE':
-            for key, types in self.initial_handle_types.items():
-                data_path, keyframe_index, array_index = key
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if fcurve:
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.interpolation = 'BEZIER'
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-                    
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'FINISHED'}
-        
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            for key, initial_vectors in self.initial_handle_vectors.items():
-                data_path, keyframe_index, array_index = key
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-
-                if not fcurve:
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                
-                vec_right_initial = initial_vectors['right']
-                keyframe.handle_right[0] = keyframe.co[0] + vec_right_initial[0]
-                keyframe.handle_right[1] = keyframe.co[1] + vec_right_initial[1]
-
-                vec_left_initial = initial_vectors['left']
-                keyframe.handle_left[0] = keyframe.co[0] + vec_left_initial[0]
-                keyframe.handle_left[1] = keyframe.co[1] + vec_left_initial[1]
-                
-                types = self.initial_handle_types[key]
-                keyframe.handle_left_type = types['left']
-                keyframe.handle_right_type = types['right']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}          
-        
-        return {'RUNNING_MODAL'}
-
-    def invoke(self, context, event):
-        self.report({'INFO'}, f"Initial-Axis")
-        if context.active_object is None or context.active_object.animation_data is None:
-            self.report({'WARNING'}, "Kein aktives Objekt oder keine Animationsdaten.")
-            return {'CANCELLED'}
-
-        if not context.selected_visible_fcurves:
-            self.report({'WARNING'}, "Keine F-Kurven im Graph Editor sichtbar und ausgewählt.")
-            return {'CANCELLED'}
-        
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-
-        self.initial_mouse_x = event.mouse_x
-        self.initial_mouse_y = event.mouse_y
-        self._mode = 'XY_AXIS'
-        self.initial_handle_vectors.clear()
-        self.initial_handle_types.clear()
-        self.initial_keyframe_data.clear()
-        
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
+    bl_description = "Mousewheel for seed. Randomize handle rotation"
 
-        selected_keyframes_found = False
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe.select_control_point:
-                    selected_keyframes_found = True
-                    key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-                    
-                    self.initial_keyframe_data[key] = {
-                        'co_x': keyframe.co[0],
-                    }
-                    
-                    self.initial_handle_types[key] = {
-                        'left': keyframe.handle_left_type,
-                        'right': keyframe.handle_right_type
-                    }
-                    
-                    self.initial_handle_vectors[key] = {
-                        'left': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                        'right': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1]),
-                    }
+    session_attributes = ('_selection', '_polar', '_random_draws')
+    _polar = None
+    _delta_scale = 0.1
 
-        if not selected_keyframes_found:
+    def prepare(self, context, snapshots):
+        if not any(snapshot.select.any() for snapshot in snapshots):
             self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
-            return {'CANCELLED'}
-
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+            return None
 
+        num_decimals = 6  # Definiere die Anzahl der Nachkommastellen
 
+        # Checke, ob der gerundete Wert des vorherigen oder nächsten Keyframes anders ist
+        entries = selected_keyframes(
+            snapshots, lambda snapshot: neighbour_differs(np.round(snapshot.co[:, 1], num_decimals), 0.0))
+        if not entries:
+            self.report({'WARNING'}, "Neighbouring keys have the same value")
+            return None
 
+        self._selection = select_keyframes(entries)
+        self._polar = HandlePolar(self._selection)
+        self._random_draws = RandomDraws(self._selection)
+        return (self._selection,)
 
+    def randomize(self, context):
+        # Zufallsrotation pro Knochen oder pro Kanal, je nach Eigenschaft
+        selection = self._selection
+        random_rotations = self._current_strength * math.pi * self._random_draws.unit(
+            self._current_seed, context.scene.use_bone_randomization)
 
+        # Handles ohne Länge bleiben auf dem Key liegen
+        polar = self._polar
+        selection.write_handles(polar_handles(selection.co, polar.left_length, polar.left_angle + random_rotations),
+                                polar_handles(selection.co, polar.right_length, polar.right_angle + random_rotations))
 
 
-class OBJECT_OT_extrude_slide_handles_between_frames(bpy.types.Operator):
-    bl_idname = "object.extrude_slide_handles_between_frames"
-    bl_label = "slide batches"
+class OBJECT_OT_slide_handles(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.slide_manipulator"
+    bl_label = "Slide Handles"
     bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Select two consecutive keyframes. Mousewheel for Extrude or Slide on X-Axis. Hold ALT for Y-Axis"
-    
-    _timer = None
-    initial_mouse_x = None
-    initial_mouse_y = None
-    initial_vectors_left_batch = {}
-    initial_types_left_batch = {}
-    initial_vectors_right_batch = {}
-    initial_types_right_batch = {}
-    initial_keyframe_coords_left_batch = {}
-    initial_keyframe_coords_right_batch = {}
-    initial_keyframe_distances = {}
-    
-    # Variable für den Umschalt-Modus
-    invert_effect = False
-
-    @classmethod
-    def poll(cls, context):
-        if not (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves):
-            return False
-        
-        for fcurve in context.selected_visible_fcurves:
-            selected_keyframes_in_fcurve = [kf for kf in fcurve.keyframe_points if kf.select_control_point]
-            if len(selected_keyframes_in_fcurve) >= 2:
-                return True
-        return False
-    
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            # Cursor-Warping-Logik
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-
-            delta_x = event.mouse_x - self.initial_mouse_x
-            delta_y = event.mouse_y - self.initial_mouse_y
-            
-            angle_sensitivity = 0.005
-            translate_sensitivity = 0.05
-
-            if event.alt:
-                x_movement_factor = 0.0
-                y_movement_factor = 1.0
-            else:
-                x_movement_factor = 1.0
-                y_movement_factor = 0.0
-
-            # Verarbeitung für den linken Keyframe (Handle Right)
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_vectors_left_batch.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves if fc.data_path == data_path and fc.array_index == array_index), None)
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                
-                # Verschieben des inneren (rechten) Handles
-                vec_right_initial = initial_vectors['right']
-                keyframe_x_distance = self.initial_keyframe_distances[(data_path, keyframe_index, array_index)]
-                initial_handle_x = keyframe.co[0] + vec_right_initial[0]
-                new_x_right = initial_handle_x + (delta_x * translate_sensitivity * x_movement_factor)
-                min_x = keyframe.co[0]
-                max_x = keyframe.co[0] + keyframe_x_distance
-                new_x_right_clamped = max(min_x, min(max_x, new_x_right))
-
-                initial_angle_rad_right = math.atan2(vec_right_initial[1], vec_right_initial[0])
-                adjustment_sign_right = 1.0 if vec_right_initial[1] >= 0 else -1.0
-                angle_adjustment_right = math.radians(delta_y * angle_sensitivity * y_movement_factor * adjustment_sign_right)
-                new_angle_rad_right = initial_angle_rad_right + angle_adjustment_right
-                
-                length_right_initial = math.sqrt(vec_right_initial[0]**2 + vec_right_initial[1]**2)
-                
-                keyframe.handle_right[0] = new_x_right_clamped
-                keyframe.handle_right[1] = keyframe.co[1] + length_right_initial * math.sin(new_angle_rad_right)
-
-                # NEUE LOGIK: Setze den äußeren (linken) Handle relativ zum inneren
-                vec_left_initial = initial_vectors['left']
-                length_left_initial = math.sqrt(vec_left_initial[0]**2 + vec_left_initial[1]**2)
-                
-                # Verwende den neuen Winkel des inneren Handles + 180 Grad
-                new_angle_rad_left = math.atan2(keyframe.handle_right[1] - keyframe.co[1], keyframe.handle_right[0] - keyframe.co[0]) + math.pi
-                
-                keyframe.handle_left[0] = keyframe.co[0] + length_left_initial * math.cos(new_angle_rad_left)
-                keyframe.handle_left[1] = keyframe.co[1] + length_left_initial * math.sin(new_angle_rad_left)
-
-            # Verarbeitung für den rechten Keyframe (Handle Left)
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_vectors_right_batch.items():
-                fcurve = next((fc for fc in context.active_object.animation_data.action.fcurves if fc.data_path == data_path and fc.array_index == array_index), None)
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                left_keyframe = fcurve.keyframe_points[keyframe_index - 1]
-                
-                # Verschieben des inneren (linken) Handles
-                vec_left_initial = initial_vectors['left']
-                initial_handle_x = keyframe.co[0] + vec_left_initial[0]
-                
-                if self.invert_effect:
-                    new_x_left = initial_handle_x + (delta_x * translate_sensitivity * x_movement_factor)
-         
-                else:
-                    new_x_left = initial_handle_x - (delta_x * translate_sensitivity * x_movement_factor)
-                
-                min_x = left_keyframe.co[0]
-                max_x = keyframe.co[0]
-                new_x_left_clamped = max(min_x, min(max_x, new_x_left))
-                
-                initial_angle_rad_left = math.atan2(vec_left_initial[1], vec_left_initial[0])
-                adjustment_sign_left = -1.0 if vec_left_initial[1] >= 0 else 1.0
-                
-                if self.invert_effect:
-                    angle_adjustment_left = math.radians(delta_y * angle_sensitivity * y_movement_factor * adjustment_sign_left)
-                else:
-                    angle_adjustment_left = math.radians(-delta_y * angle_sensitivity * y_movement_factor * adjustment_sign_left)
-                        
-                new_angle_rad_left = initial_angle_rad_left + angle_adjustment_left
-                length_left_initial = math.sqrt(vec_left_initial[0]**2 + vec_left_initial[1]**2)
+    bl_description = "Slide handles"
 
-                keyframe.handle_left[0] = new_x_left_clamped
-                keyframe.handle_left[1] = keyframe.co[1] + length_left_initial * math.sin(new_angle_rad_left)
-                
-                # NEUE LOGIK: Setze den äußeren (rechten) Handle relativ zum inneren
-                vec_right_initial = initial_vectors['right']
-                length_right_initial = math.sqrt(vec_right_initial[0]**2 + vec_right_initial[1]**2)
-                
-                # Verwende den neuen Winkel des inneren Handles + 180 Grad
-                new_angle_rad_right = math.atan2(keyframe.handle_left[1] - keyframe.co[1], keyframe.handle_left[0] - keyframe.co[0]) + math.pi
-                
-                keyframe.handle_right[0] = keyframe.co[0] + length_right_initial * math.cos(new_angle_rad_right)
-                keyframe.handle_right[1] = keyframe.co[1] + length_right_initial * math.sin(new_angle_rad_right)
+    confirm_bezier = True
+    session_attributes = ('_selection',)
 
+    _selection = None
 
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-            
-            return {'RUNNING_MODAL'}
-        
-        elif event.type == 'WHEELUPMOUSE' or event.type == 'WHEELDOWNMOUSE':
-            self.invert_effect = not self.invert_effect
-            if self.invert_effect == 0:
-                self.report({'INFO'}, "EXTRUDE")
-            else:
-                self.report({'INFO'}, "SLIDE")
-                
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-            return {'RUNNING_MODAL'}
-        
-        elif event.type == 'LEFTMOUSE':
-            set_handles_aligned(context, self.initial_types_left_batch)
-            set_handles_aligned(context, self.initial_types_right_batch)
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            self.invert_effect = False
-            return {'FINISHED'}
-        
-        elif event.type in {'RIGHTMOUSE', 'ESC'}:
-            reset_handles(context, self.initial_vectors_left_batch, self.initial_types_left_batch, self.initial_keyframe_coords_left_batch)
-            reset_handles(context, self.initial_vectors_right_batch, self.initial_types_right_batch, self.initial_keyframe_coords_right_batch)
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            self.invert_effect = False
-            return {'CANCELLED'}
+    def prepare(self, context, snapshots):
+        entries = selected_keyframes(snapshots)
+        if not entries:
+            self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
+            return None
+        self._selection = select_keyframes(entries)
+        return (self._selection,)
 
-        return {'RUNNING_MODAL'}
+    def transform(self, context, event, delta_x, delta_y):
+        # Das Verschieben der Maus steuert das Verhältnis Vergrößerung/Schrumpfung
+        ratio = max(min(delta_x / 200.0, 1.0), -1.0) # Begrenzt auf [-1, 1]
 
-    def invoke(self, context, event):
-        self.report({'INFO'}, "EXTRUDE")
-         
-        if context.active_object is None or context.active_object.animation_data is None:
-            self.report({'WARNING'}, "Kein aktives Objekt oder keine Animationsdaten gefunden.")
-            return {'CANCELLED'}
+        selection = self._selection
+        vec_left_initial = selection.handle_left_vec
+        vec_right_initial = selection.handle_right_vec
 
-        if not context.selected_visible_fcurves:
-            self.report({'WARNING'}, "Keine F-Kurven im Graph Editor sichtbar und ausgewählt.")
-            return {'CANCELLED'}
+        length_right_initial = np.hypot(vec_right_initial[:, 0], vec_right_initial[:, 1])
+        length_left_initial = np.hypot(vec_left_initial[:, 0], vec_left_initial[:, 1])
 
-        self.initial_vectors_left_batch.clear()
-        self.initial_types_left_batch.clear()
-        self.initial_vectors_right_batch.clear()
-        self.initial_types_right_batch.clear()
-        self.initial_keyframe_coords_left_batch.clear()
-        self.initial_keyframe_coords_right_batch.clear()
-        self.initial_keyframe_distances.clear()
-        
-        has_valid_pair = False
-        
-        for fcurve in context.selected_visible_fcurves:
-            selected_keyframes_with_indices = [
-                (index, kf) for index, kf in enumerate(fcurve.keyframe_points) if kf.select_control_point
-            ]
+        # Gesamtlänge bleibt konstant
+        total_length = length_right_initial + length_left_initial
 
-            if len(selected_keyframes_with_indices) >= 2:
-                has_valid_pair = True
-                
-                selected_keyframes_with_indices.sort(key=lambda item: item[1].co[0])
-                
-                first_keyframe_index, first_keyframe = selected_keyframes_with_indices[0]
-                last_keyframe_index, last_keyframe = selected_keyframes_with_indices[-1]
+        # Neue Länge für den rechten Handle, begrenzt auf [0, Gesamtlänge]
+        new_length_right = np.clip(length_right_initial * (1.0 + ratio), 0.0, total_length)
 
-                keyframe_x_distance = last_keyframe.co[0] - first_keyframe.co[0]
-                self.initial_keyframe_distances[(fcurve.data_path, first_keyframe_index, fcurve.array_index)] = keyframe_x_distance
+        # Die neue Länge des linken Handles ist die Differenz zur Gesamtlänge
+        new_length_left = total_length - new_length_right
 
-                key_first = (fcurve.data_path, first_keyframe_index, fcurve.array_index)
-                key_last = (fcurve.data_path, last_keyframe_index, fcurve.array_index)
-                
-                self.initial_types_left_batch[key_first] = {
-                    'left': first_keyframe.handle_left_type,
-                    'right': first_keyframe.handle_right_type
-                }
-                self.initial_vectors_left_batch[key_first] = {
-                    'left': (first_keyframe.handle_left[0] - first_keyframe.co[0], first_keyframe.handle_left[1] - first_keyframe.co[1]),
-                    'right': (first_keyframe.handle_right[0] - first_keyframe.co[0], first_keyframe.handle_right[1] - first_keyframe.co[1]),
-                }
-                self.initial_keyframe_coords_left_batch[key_first] = {'co_x': first_keyframe.co[0], 'co_y': first_keyframe.co[1]}
-                
-                self.initial_types_right_batch[key_last] = {
-                    'left': last_keyframe.handle_left_type,
-                    'right': last_keyframe.handle_right_type
-                }
-                self.initial_vectors_right_batch[key_last] = {
-                    'left': (last_keyframe.handle_left[0] - last_keyframe.co[0], last_keyframe.handle_left[1] - last_keyframe.co[1]),
-                    'right': (last_keyframe.handle_right[0] - last_keyframe.co[0], last_keyframe.handle_right[1] - last_keyframe.co[1]),
-                }
-                self.initial_keyframe_coords_right_batch[key_last] = {'co_x': last_keyframe.co[0], 'co_y': last_keyframe.co[1]}
-        
-        if not has_valid_pair:
+        # Handles entlang der ursprünglichen Richtung skalieren; Handles der Länge 0 bleiben unverändert
+        scale_right = np.divide(new_length_right, length_right_initial, out=np.ones_like(new_length_right), where=length_right_initial > 0)
+        scale_left = np.divide(new_length_left, length_left_initial, out=np.ones_like(new_length_left), where=length_left_initial > 0)
+
+        selection.write_handles(selection.co + vec_left_initial * scale_left[:, None],
+                                selection.co + vec_right_initial * scale_right[:, None])
+
+
+
+import bpy
+import math
+
+class OBJECT_OT_manipulate_right_handles(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.manipulate_right_handles"
+    bl_label = "Manipulate Right Handles"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_description = "Extrude right handles"
+
+    mode: bpy.props.EnumProperty(
+        items=[
+            ('EXTRUDE', "Extrude", "Extrudes the handles"),
+            ('SLIDE', "Slide", "Slides the handles")
+        ],
+        name="Mode",
+        default='EXTRUDE'
+    )
+
+    min_selected_per_curve = 2
+    confirm_bezier = True
+    jump_to_frame_start = False
+    session_attributes = ('_left_batch', '_right_batch', '_left_polar', '_right_polar',
+                          '_keyframe_distances', '_partner_x_left', '_partner_x_right')
+
+    # Erster ausgewählter Key jeder F-Curve (rechter Handle) und letzter (linker Handle)
+    _left_batch = None
+    _right_batch = None
+    # Pro Zeile: Frame-Abstand des Paares und X-Position des Partner-Keys
+    _keyframe_distances = None
+    _partner_x_left = None
+    _partner_x_right = None
+    _left_polar = None
+    _right_polar = None
+
+    @staticmethod
+    def _extrude_along_slope(co, vectors, length, unit, adjustment_amount, min_length, partner_x, direction):
+        """Verlängert die Handles entlang ihrer Richtung, auf X begrenzt durch den Partner-Key."""
+        co_x = co[:, 0]
+        co_y = co[:, 1]
+        new_length = np.maximum(length + adjustment_amount, min_length)
+
+        has_length = (length > 1e-6)[:, None]
+        unlimited = co + np.where(has_length, unit, (direction, 0.0)) * new_length[:, None]
+
+        if direction > 0:
+            new_x = np.maximum(np.minimum(unlimited[:, 0], partner_x), co_x)
+        else:
+            new_x = np.minimum(np.maximum(unlimited[:, 0], partner_x), co_x)
+
+        # Y folgt der ursprünglichen Steigung; senkrechte Handles behalten ihre Länge
+        dx_initial = vectors[:, 0]
+        dy_initial = vectors[:, 1]
+        has_slope = np.abs(dx_initial) > 1e-6
+        slope = np.divide(dy_initial, dx_initial, out=np.zeros_like(dx_initial), where=has_slope)
+        vertical = np.copysign(np.hypot(new_x - co_x, unlimited[:, 1] - co_y), np.where(dy_initial > 0, 1.0, -1.0))
+        new_y = co_y + np.where(has_slope, (new_x - co_x) * slope, vertical)
+        return np.column_stack((new_x, new_y))
+
+    def prepare(self, context, snapshots):
+        self.mode = 'EXTRUDE'
+
+        batches = select_keyframe_bounds(snapshots)
+        if batches is None:
             self.report({'WARNING'}, "Es wurden keine F-Kurven gefunden, die mindestens zwei ausgewählte Keyframes enthalten.")
-            return {'CANCELLED'}
+            return None
 
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
+        self._left_batch, self._right_batch = batches
+        self._partner_x_left = self._right_batch.co[:, 0]
+        self._partner_x_right = self._left_batch.co[:, 0]
+        self._keyframe_distances = self._partner_x_left - self._partner_x_right
+        self._left_polar = HandlePolar(self._left_batch)
+        self._right_polar = HandlePolar(self._right_batch)
+        return batches
 
+    def transform(self, context, event, delta_x, delta_y):
+        extrude_sensitivity = 0.1
+        keyframe_x_distance = np.maximum(self._keyframe_distances, 1.0)
+        min_length = 0.001 * keyframe_x_distance
+
+        # left batch (handle right)
+        adjustment_amount = delta_x * extrude_sensitivity
+        handle_right = self._extrude_along_slope(
+            self._left_batch.co, self._left_batch.handle_right_vec, self._left_polar.right_length, self._left_polar.right_unit,
+            adjustment_amount, min_length, self._partner_x_left, direction=1.0)
+        self._left_batch.write_handles(right=handle_right)
+
+        # right batch (handle left)
+        if self.mode == 'SLIDE':
+            adjustment_amount = -adjustment_amount  # HIER WIRD DIE RICHTUNG UMGEKEHRT
+        handle_left = self._extrude_along_slope(
+            self._right_batch.co, self._right_batch.handle_left_vec, self._right_polar.left_length, self._right_polar.left_unit,
+            adjustment_amount, min_length, self._partner_x_right, direction=-1.0)
+        self._right_batch.write_handles(left=handle_left)
+
+    def wheel(self, context, event):
+        if self.mode == 'EXTRUDE':
+            self.mode = 'SLIDE'
+            self.report({'INFO'}, "Switched to Slide Mode")
+            context.window.cursor_set('SCROLL_Y')  # Besser passender Cursor
+        elif self.mode == 'SLIDE':
+            self.mode = 'EXTRUDE'
+            self.report({'INFO'}, "Switched to Extrude Mode")
+            context.window.cursor_set('SCROLL_X') # Besser passender Cursor
+
+        # Setze die Maus-Position neu
         self.initial_mouse_x = event.mouse_x
-        self.initial_mouse_y = event.mouse_y # Neu hinzugefügt
-        
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
-        
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+        self.initial_mouse_y = event.mouse_y
 
 
-class OBJECT_OT_extrude_handles_between_frames(bpy.types.Operator):
-    bl_idname = "object.extrude_handles_between_frames"
-    bl_label = "extrude_handles_between_frames"
+class OBJECT_OT_scale_handles(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.scale_handles"
+    bl_label = "scale handles"
     bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for Extrude or Slide on Initial-Axis. Select two consecutive keyframes"
-    
-    _timer = None
-    initial_mouse_x = None
-    
-    initial_vectors_left_batch = {}
-    initial_types_left_batch = {}
-    initial_keyframe_coords_left_batch = {}
-    initial_partner_x_coords_left = {}
-    
-    initial_vectors_right_batch = {}
-    initial_types_right_batch = {}
-    initial_keyframe_coords_right_batch = {}
-    initial_partner_x_coords_right = {}
-    
-    initial_keyframe_distances = {}
-
-    invert_effect = True
+    bl_description = "Mousewheel for Y- or X-Axis"
 
-    @classmethod
-    def poll(cls, context):
-        if not (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves):
-            return False
-        
-        for fcurve in context.selected_visible_fcurves:
-            selected_keyframes_in_fcurve = [kf for kf in fcurve.keyframe_points if kf.select_control_point]
-            if len(selected_keyframes_in_fcurve) >= 2:
-                return True
-        return False
+    warp_y = True
+    confirm_bezier = True
+    session_attributes = ('_selection',)
 
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-            
-            delta_x = event.mouse_x - self.initial_mouse_x
-            
-            # Verarbeitung für den linken Keyframe (Handle Right)
-            # Diese Logik bleibt immer gleich, unabhängig vom invert_effect
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_vectors_left_batch.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-
-                if not fcurve: continue
-                if keyframe_index >= len(fcurve.keyframe_points): continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                vec_right_initial = initial_vectors['right']
-                length_right_initial = math.sqrt(vec_right_initial[0]**2 + vec_right_initial[1]**2)
+    _selection = None
+    _mode = 'X_AXIS'
 
-                keyframe_x_distance = self.initial_keyframe_distances.get((data_path, keyframe_index, array_index), 1.0)
-                if keyframe_x_distance < 1.0: keyframe_x_distance = 1.0
+    def prepare(self, context, snapshots):
+        self.report({'INFO'}, f"Initial-Axis")
+        self._mode = 'XY_AXIS'
 
-                min_length = 0.001 * keyframe_x_distance
+        entries = selected_keyframes(snapshots)
+        if not entries:
+            self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
+            return None
+        self._selection = select_keyframes(entries)
+        return (self._selection,)
+
+    def transform(self, context, event, delta_x, delta_y):
+        factor = delta_x / 200.0
+
+        if self._mode == 'X_AXIS':
+            # Skalierung nur in X-Richtung
+            scale = np.array((1.0 + factor, 1.0))
+        elif self._mode == 'Y_AXIS':
+            # Skalierung nur in Y-Richtung
+            scale = np.array((1.0, 1.0 + factor))
+        else:
+            # Proportionale Skalierung in X und Y
+            scale = np.array((1.0 + factor, 1.0 + factor))
 
-                # Standard-Extrusion: Länge erhöht sich mit positivem delta_x
-                adjustment_amount = (delta_x * keyframe_x_distance * 0.005)
+        selection = self._selection
+        selection.write_handles(selection.co + selection.handle_left_vec * scale,
+                                selection.co + selection.handle_right_vec * scale)
 
-                new_length_right = length_right_initial + adjustment_amount
+    def wheel(self, context, event):
+        self.initial_mouse_x = event.mouse_x
+        self.initial_mouse_y = event.mouse_y
 
-                new_length_right = max(new_length_right, min_length)
+        if self._mode == 'X_AXIS':
+            self._mode = 'XY_AXIS'
+            self.report({'INFO'}, f"Initial-Axis")
+        elif self._mode == 'Y_AXIS':
+            self._mode = 'X_AXIS'
+            self.report({'INFO'}, f"X-Axis")
+        else:
+            self._mode = 'Y_AXIS'
+            self.report({'INFO'}, f"Y-Axis")
 
-                if length_right_initial > 1e-6:
-                    new_x_right_unlimited = keyframe.co[0] + vec_right_initial[0] / length_right_initial * new_length_right
-                    new_y_right_unlimited = keyframe.co[1] + vec_right_initial[1] / length_right_initial * new_length_right
-                else:
-                    new_length_right = max(new_length_right, min_length)
-                    if new_length_right > 0:
-                        vec_right = (1.0, 0.0)
-                        new_x_right_unlimited = keyframe.co[0] + vec_right[0] * new_length_right
-                        new_y_right_unlimited = keyframe.co[1] + vec_right[1] * new_length_right
-                    else:
-                        new_x_right_unlimited = keyframe.co[0]
-                        new_y_right_unlimited = keyframe.co[1]
-                
-                partner_x_coord = self.initial_partner_x_coords_left.get((data_path, keyframe_index, array_index), keyframe.co[0])
-                
-                new_x_right = max(min(new_x_right_unlimited, partner_x_coord), keyframe.co[0])
-                
-                dx = new_x_right - keyframe.co[0]
-                dy = (vec_right_initial[1] / vec_right_initial[0]) * dx if abs(vec_right_initial[0]) > 1e-6 else 0
-                new_y_right = keyframe.co[1] + dy
-                
-                keyframe.handle_right[0] = new_x_right
-                keyframe.handle_right[1] = new_y_right
 
-            
-            # Verarbeitung für den rechten Keyframe (Handle Left)
-            # Hier wird die Logik basierend auf invert_effect umgeschaltet
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_vectors_right_batch.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-
-                if not fcurve: continue
-                if keyframe_index >= len(fcurve.keyframe_points): continue
-
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                vec_left_initial = initial_vectors['left']
-                length_left_initial = math.sqrt(vec_left_initial[0]**2 + vec_left_initial[1]**2)
-                
-                keyframe_x_distance = self.initial_keyframe_distances.get((data_path, keyframe_index, array_index), 1.0)
-                if keyframe_x_distance < 1.0: keyframe_x_distance = 1.0
-                
-                min_length = 0.001 * keyframe_x_distance
 
-                # KORREKTUR: Jetzt nur hier die Anpassung der Richtung
-                if not self.invert_effect:
-                    # Standard: Länge verringert sich mit positivem delta_x
-                    adjustment_amount = (-delta_x * keyframe_x_distance * 0.005)
-                else:
-                    # Invertiert: Länge verringert sich mit negativem delta_x
-                    adjustment_amount = (delta_x * keyframe_x_distance * 0.005)
-                
-                new_length_left = length_left_initial + adjustment_amount
 
-                new_length_left = max(new_length_left, min_length)
 
-                if length_left_initial > 1e-6:
-                    new_x_left_unlimited = keyframe.co[0] + vec_left_initial[0] / length_left_initial * new_length_left
-                    new_y_left_unlimited = keyframe.co[1] + vec_left_initial[1] / length_left_initial * new_length_left
-                else:
-                    new_length_left = max(new_length_left, min_length)
-                    if new_length_left > 0:
-                        vec_left = (-1.0, 0.0)
-                        new_x_left_unlimited = keyframe.co[0] + vec_left[0] * new_length_left
-                        new_y_left_unlimited = keyframe.co[1] + vec_left[1] * new_length_left
-                    else:
-                        new_x_left_unlimited = keyframe.co[0]
-                        new_y_left_unlimited = keyframe.co[1]
 
-                partner_x_coord = self.initial_partner_x_coords_right.get((data_path, keyframe_index, array_index), keyframe.co[0])
-                
-                new_x_left = min(max(new_x_left_unlimited, partner_x_coord), keyframe.co[0])
-                
-                dx = new_x_left - keyframe.co[0]
-                dy = (vec_left_initial[1] / vec_left_initial[0]) * dx if abs(vec_left_initial[0]) > 1e-6 else 0
-                new_y_left = keyframe.co[1] + dy
-                
-                keyframe.handle_left[0] = new_x_left
-                keyframe.handle_left[1] = new_y_left
 
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-            
-            return {'RUNNING_MODAL'}
-        
-        elif event.type == 'WHEELUPMOUSE' or event.type == 'WHEELDOWNMOUSE':
-            self.invert_effect = not self.invert_effect
-            # KORREKTUR: Setze die Initialmausposition zurück, um ein Springen zu verhindern
-            self.initial_mouse_x = event.mouse_x
-            if self.invert_effect == 1:
-                self.report({'INFO'}, "EXTRUDE")
-            else:
-                self.report({'INFO'}, "SLIDE")
-            for area in context.screen.areas:
-                if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                    area.tag_redraw()
-            return {'RUNNING_MODAL'}
-        
-        elif event.type == 'LEFTMOUSE':
-            set_handles_aligned(context, self.initial_types_left_batch)
-            set_handles_aligned(context, self.initial_types_right_batch)
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            self.invert_effect = False
-            return {'FINISHED'}
-        
-        elif event.type in {'RIGHTMOUSE', 'ESC'}:
-            reset_handles(context, self.initial_vectors_left_batch, self.initial_types_left_batch, self.initial_keyframe_coords_left_batch)
-            reset_handles(context, self.initial_vectors_right_batch, self.initial_types_right_batch, self.initial_keyframe_coords_right_batch)
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            self.invert_effect = False
-            return {'CANCELLED'}
+class OBJECT_OT_extrude_slide_handles_between_frames(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.extrude_slide_handles_between_frames"
+    bl_label = "slide batches"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_description = "Select two consecutive keyframes. Mousewheel for Extrude or Slide on X-Axis. Hold ALT for Y-Axis"
 
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        self.report({'INFO'}, "EXTRUDE")
-        # ... (dein restlicher invoke Code bleibt unverändert) ...
-        if context.active_object is None or context.active_object.animation_data is None:
-            self.report({'WARNING'}, "No active object")
-            return {'CANCELLED'}
+    min_selected_per_curve = 2
+    confirm_bezier = True
+    session_attributes = ('_left_batch', '_right_batch', '_left_polar', '_right_polar',
+                          '_keyframe_distances', '_previous_keyframe_x')
 
-        if not context.selected_visible_fcurves:
-            self.report({'WARNING'}, "No f-curves visible")
-            return {'CANCELLED'}
-        
-        self.initial_vectors_left_batch.clear()
-        self.initial_types_left_batch.clear()
-        self.initial_keyframe_coords_left_batch.clear()
-        self.initial_partner_x_coords_left.clear()
-        
-        self.initial_vectors_right_batch.clear()
-        self.initial_types_right_batch.clear()
-        self.initial_keyframe_coords_right_batch.clear()
-        self.initial_partner_x_coords_right.clear()
-        
-        self.initial_keyframe_distances.clear()
-        
-        has_valid_pair = False
-        
-        for fcurve in context.selected_visible_fcurves:
-            selected_keyframes_with_indices = [(index, kf) for index, kf in enumerate(fcurve.keyframe_points) if kf.select_control_point]
+    # Erster ausgewählter Key jeder F-Curve (rechter Handle) und letzter (linker Handle)
+    _left_batch = None
+    _right_batch = None
+    _keyframe_distances = None
+    _previous_keyframe_x = None
+    _left_polar = None
+    _right_polar = None
 
-            if len(selected_keyframes_with_indices) >= 2:
-                has_valid_pair = True
-                
-                selected_keyframes_with_indices.sort(key=lambda item: item[1].co[0])
-                
-                first_keyframe_index, first_keyframe = selected_keyframes_with_indices[0]
-                last_keyframe_index, last_keyframe = selected_keyframes_with_indices[-1]
+    # Variable für den Umschalt-Modus
+    invert_effect = False
 
-                keyframe_x_distance = last_keyframe.co[0] - first_keyframe.co[0]
-                self.initial_keyframe_distances[(fcurve.data_path, first_keyframe_index, fcurve.array_index)] = keyframe_x_distance
-                self.initial_keyframe_distances[(fcurve.data_path, last_keyframe_index, fcurve.array_index)] = keyframe_x_distance
+    def prepare(self, context, snapshots):
+        self.report({'INFO'}, "EXTRUDE")
 
-                key_first = (fcurve.data_path, first_keyframe_index, fcurve.array_index)
-                key_last = (fcurve.data_path, last_keyframe_index, fcurve.array_index)
-                
-                self.initial_types_left_batch[key_first] = {
-                    'left': first_keyframe.handle_left_type,
-                    'right': first_keyframe.handle_right_type
-                }
-                self.initial_vectors_left_batch[key_first] = {
-                    'left': (first_keyframe.handle_left[0] - first_keyframe.co[0], first_keyframe.handle_left[1] - first_keyframe.co[1]),
-                    'right': (first_keyframe.handle_right[0] - first_keyframe.co[0], first_keyframe.handle_right[1] - first_keyframe.co[1]),
-                }
-                self.initial_keyframe_coords_left_batch[key_first] = {'co_x': first_keyframe.co[0], 'co_y': first_keyframe.co[1]}
-                self.initial_partner_x_coords_left[key_first] = last_keyframe.co[0]
-                
-                self.initial_types_right_batch[key_last] = {
-                    'left': last_keyframe.handle_left_type,
-                    'right': last_keyframe.handle_right_type
-                }
-                self.initial_vectors_right_batch[key_last] = {
-                    'left': (last_keyframe.handle_left[0] - last_keyframe.co[0], last_keyframe.handle_left[1] - last_keyframe.co[1]),
-                    'right': (last_keyframe.handle_right[0] - last_keyframe.co[0], last_keyframe.handle_right[1] - last_keyframe.co[1]),
-                }
-                self.initial_keyframe_coords_right_batch[key_last] = {'co_x': last_keyframe.co[0], 'co_y': last_keyframe.co[1]}
-                self.initial_partner_x_coords_right[key_last] = first_keyframe.co[0]
-        
-        if not has_valid_pair:
+        batches = select_keyframe_bounds(snapshots)
+        if batches is None:
             self.report({'WARNING'}, "Es wurden keine F-Kurven gefunden, die mindestens zwei ausgewählte Keyframes enthalten.")
-            return {'CANCELLED'}
-        
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
+            return None
+
+        self._left_batch, self._right_batch = batches
+        self._keyframe_distances = self._right_batch.co[:, 0] - self._left_batch.co[:, 0]
+        self._previous_keyframe_x = self._right_batch.neighbour_co(-1)[0][:, 0]
+        self._left_polar = HandlePolar(self._left_batch)
+        self._right_polar = HandlePolar(self._right_batch)
+        return batches
+
+    def transform(self, context, event, delta_x, delta_y):
+        angle_sensitivity = 0.005
+        translate_sensitivity = 0.05
+
+        if event.alt:
+            x_movement_factor = 0.0
+            y_movement_factor = 1.0
+        else:
+            x_movement_factor = 1.0
+            y_movement_factor = 0.0
+
+        translate_x = delta_x * translate_sensitivity * x_movement_factor
+        angle_y = np.radians(delta_y * angle_sensitivity * y_movement_factor)
+
+        # Verarbeitung für den linken Keyframe (Handle Right)
+        batch = self._left_batch
+        polar = self._left_polar
+        co = batch.co
+
+        # Verschieben des inneren (rechten) Handles
+        new_x_right = co[:, 0] + batch.handle_right_vec[:, 0] + translate_x
+        new_x_right_clamped = np.clip(new_x_right, co[:, 0], co[:, 0] + self._keyframe_distances)
+
+        adjustment_sign_right = np.where(batch.handle_right_vec[:, 1] >= 0, 1.0, -1.0)
+        new_angle_rad_right = polar.right_angle + angle_y * adjustment_sign_right
+        new_y_right = co[:, 1] + polar.right_length * np.sin(new_angle_rad_right)
+
+        # Setze den äußeren (linken) Handle relativ zum inneren
+        # Verwende den neuen Winkel des inneren Handles + 180 Grad
+        new_angle_rad_left = np.arctan2(new_y_right - co[:, 1], new_x_right_clamped - co[:, 0]) + math.pi
+        batch.write_handles(polar_handles(co, polar.left_length, new_angle_rad_left),
+                            np.column_stack((new_x_right_clamped, new_y_right)))
+
+        # Verarbeitung für den rechten Keyframe (Handle Left)
+        batch = self._right_batch
+        polar = self._right_polar
+        co = batch.co
+
+        # Verschieben des inneren (linken) Handles
+        initial_handle_x = co[:, 0] + batch.handle_left_vec[:, 0]
+        if self.invert_effect:
+            new_x_left = initial_handle_x + translate_x
+        else:
+            new_x_left = initial_handle_x - translate_x
+        new_x_left_clamped = np.clip(new_x_left, self._previous_keyframe_x, co[:, 0])
 
-        self.initial_mouse_x = event.mouse_x
+        adjustment_sign_left = np.where(batch.handle_left_vec[:, 1] >= 0, -1.0, 1.0)
+        if self.invert_effect:
+            angle_adjustment_left = angle_y * adjustment_sign_left
+        else:
+            angle_adjustment_left = -angle_y * adjustment_sign_left
+        new_angle_rad_left = polar.left_angle + angle_adjustment_left
+        new_y_left = co[:, 1] + polar.left_length * np.sin(new_angle_rad_left)
 
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
+        # Setze den äußeren (rechten) Handle relativ zum inneren
+        # Verwende den neuen Winkel des inneren Handles + 180 Grad
+        new_angle_rad_right = np.arctan2(new_y_left - co[:, 1], new_x_left_clamped - co[:, 0]) + math.pi
+        batch.write_handles(np.column_stack((new_x_left_clamped, new_y_left)),
+                            polar_handles(co, polar.right_length, new_angle_rad_right))
 
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+    def wheel(self, context, event):
+        self.invert_effect = not self.invert_effect
+        self.report({'INFO'}, "SLIDE" if self.invert_effect else "EXTRUDE")
 
 
-class OBJECT_OT_randomize_handle_extrusion(bpy.types.Operator):
-    bl_idname = "object.randomize_handle_extrusion"
-    bl_label = "Randomize Handle Extrusion"
+class OBJECT_OT_extrude_handles_between_frames(KeyframeTransformOperator, bpy.types.Operator):
+    bl_idname = "object.extrude_handles_between_frames"
+    bl_label = "extrude_handles_between_frames"
     bl_options = {'REGISTER', 'UNDO'}
-    bl_description = "Mousewheel for seed. Randomize handle extrusion"
+    bl_description = "Mousewheel for Extrude or Slide on Initial-Axis. Select two consecutive keyframes"
 
-    _timer = None
-    initial_mouse_x = None
-    initial_handle_vectors = {}
-    initial_handle_types = {}
-    _current_strength = 0.0
-    _current_seed = 0
-    _initial_frame_start = 0
-    _initial_frame_end = 0
+    min_selected_per_curve = 2
+    confirm_bezier = True
+    session_attributes = ('_left_batch', '_right_batch', '_keyframe_distances', '_partner_x_left', '_partner_x_right')
 
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object and
-                context.active_object.animation_data and
-                context.active_object.animation_data.action and
-                context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
+    # Erster ausgewählter Key jeder F-Curve (rechter Handle) und letzter (linker Handle)
+    _left_batch = None
+    _right_batch = None
+    # Pro Zeile: Frame-Abstand des Paares (mindestens 1) und X-Position des Partner-Keys
+    _keyframe_distances = None
+    _partner_x_left = None
+    _partner_x_right = None
 
-    def _apply_randomized_extrusion(self, context, strength):
-        random.seed(self._current_seed)
-        
-        # Dictionary, um Zufallswerte pro Knochen zu speichern
-        bone_random_factors = {}
-
-        for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-            fcurve = None
-            for fc in context.active_object.animation_data.action.fcurves:
-                if fc.data_path == data_path and fc.array_index == array_index:
-                    fcurve = fc
-                    break
-
-            if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                continue
-            
-            keyframe = fcurve.keyframe_points[keyframe_index]
-            
-            # Neue Logik: Zufallsfaktor pro Knochen
-            if context.scene.use_bone_randomization:
-                # Extrahiere Knochennamen aus dem data_path
-                # Zum Beispiel 'pose.bones["BoneName"].location' -> "BoneName"
-                try:
-                    bone_name = data_path.split('"')[1]
-                except IndexError:
-                    bone_name = None # Fallback für nicht-Knochen-Pfade
-                
-                if bone_name not in bone_random_factors:
-                    # Berechne den Zufallsfaktor nur einmal pro Knochen
-                    bone_random_factors[bone_name] = random.uniform(-strength, strength)
-                
-                random_factor = bone_random_factors.get(bone_name, 0.0)
-            else:
-                # Ursprüngliche Logik: Zufallsfaktor pro Kanal
-                random_factor = random.uniform(-strength, strength)
-
-            # Linkes Handle
-            vec_left_initial = initial_vectors['left']
-            length_left_initial = math.sqrt(vec_left_initial[0]**2 + vec_left_initial[1]**2)
-            if length_left_initial > 0:
-                new_length_left = length_left_initial * (1.0 + random_factor)
-                new_x_left = keyframe.co[0] + vec_left_initial[0] / length_left_initial * new_length_left
-                new_y_left = keyframe.co[1] + vec_left_initial[1] / length_left_initial * new_length_left
-                keyframe.handle_left[0] = new_x_left
-                keyframe.handle_left[1] = new_y_left
-
-            # Rechtes Handle
-            vec_right_initial = initial_vectors['right']
-            length_right_initial = math.sqrt(vec_right_initial[0]**2 + vec_right_initial[1]**2)
-            if length_right_initial > 0:
-                new_length_right = length_right_initial * (1.0 + random_factor)
-                new_x_right = keyframe.co[0] + vec_right_initial[0] / length_right_initial * new_length_right
-                new_y_right = keyframe.co[1] + vec_right_initial[1] / length_right_initial * new_length_right
-                keyframe.handle_right[0] = new_x_right
-                keyframe.handle_right[1] = new_y_right
-        
-        for area in context.screen.areas:
-            if area.type in {'GRAPH_EDITOR', 'VIEW_3D'}:
-                area.tag_redraw()
+    invert_effect = True
 
-    def modal(self, context, event):
-        if event.type == 'MOUSEMOVE':
-            
-            if event.mouse_x < 5 or event.mouse_x > context.window.width - 5:
-                if event.mouse_x < 5:
-                    new_x = context.window.width - 10
-                else:
-                    new_x = 10
-                self.initial_mouse_x += (new_x - event.mouse_x)
-                context.window.cursor_warp(new_x, event.mouse_y)
-            
-            base_divisor = 1000.0 if event.alt else 200.0
-            delta_x = event.mouse_x - self.initial_mouse_x
-            
-            delta_x = max(0.0, delta_x)
-            
-            power_exponent = 2.0
-            abs_delta_x = abs(delta_x)
-            strength = (abs_delta_x / base_divisor) ** power_exponent
-            if delta_x < 0:
-                strength *= -1.0
-            
-            self._current_strength = strength
-            self._apply_randomized_extrusion(context, self._current_strength)
-            #self.report({'INFO'}, f"Strength: {self._current_strength:.4f}, Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-            
-        elif event.type == 'WHEELUPMOUSE':
-            self._current_seed += 1
-            self._apply_randomized_extrusion(context, self._current_strength)
-            self.report({'INFO'}, f"Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
-        
-        elif event.type == 'WHEELDOWNMOUSE':
-            self._current_seed -= 1
-            self._apply_randomized_extrusion(context, self._current_strength)
-            self.report({'INFO'}, f"Seed: {self._current_seed}")
-            return {'RUNNING_MODAL'}
+    def prepare(self, context, snapshots):
+        self.report({'INFO'}, "EXTRUDE")
 
-        elif event.type == 'LEFTMOUSE':
-            # Iteriere über alle initial gespeicherten Keyframes
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                # Wenn der Keyframe noch existiert, setze die Handle-Typen
-                if fcurve and keyframe_index < len(fcurve.keyframe_points):
-                    keyframe = fcurve.keyframe_points[keyframe_index]
-                    keyframe.handle_left_type = 'ALIGNED'
-                    keyframe.handle_right_type = 'ALIGNED'
+        batches = select_keyframe_bounds(snapshots)
+        if batches is None:
+            self.report({'WARNING'}, "Es wurden keine F-Kurven gefunden, die mindestens zwei ausgewählte Keyframes enthalten.")
+            return None
+
+        self._left_batch, self._right_batch = batches
+        self._partner_x_left = self._right_batch.co[:, 0]
+        self._partner_x_right = self._left_batch.co[:, 0]
+        self._keyframe_distances = np.maximum(self._partner_x_left - self._partner_x_right, 1.0)
+        return batches
+
+    def transform(self, context, event, delta_x, delta_y):
+        keyframe_x_distance = self._keyframe_distances
+        min_length = 0.001 * keyframe_x_distance
+
+        # Verarbeitung für den linken Keyframe (Handle Right)
+        # Diese Logik bleibt immer gleich, unabhängig vom invert_effect
+        left_batch = self._left_batch
+        co = left_batch.co
+        vec_right_initial = left_batch.handle_right_vec
+        length_right_initial = np.hypot(vec_right_initial[:, 0], vec_right_initial[:, 1])
+
+        # Standard-Extrusion: Länge erhöht sich mit positivem delta_x
+        new_length_right = np.maximum(length_right_initial + delta_x * keyframe_x_distance * 0.005, min_length)
+
+        # Handles ohne Länge werden entlang der X-Achse ausgezogen
+        has_length = length_right_initial > 1e-6
+        direction_x = np.divide(vec_right_initial[:, 0], length_right_initial, out=np.ones_like(length_right_initial), where=has_length)
+        new_x_right = np.maximum(np.minimum(co[:, 0] + direction_x * new_length_right, self._partner_x_left), co[:, 0])
+
+        has_slope = np.abs(vec_right_initial[:, 0]) > 1e-6
+        slope = np.divide(vec_right_initial[:, 1], vec_right_initial[:, 0], out=np.zeros_like(length_right_initial), where=has_slope)
+        handle_right = np.column_stack((new_x_right, co[:, 1] + slope * (new_x_right - co[:, 0])))
+        left_batch.write_handles(right=handle_right)
+
+        # Verarbeitung für den rechten Keyframe (Handle Left)
+        # Hier wird die Logik basierend auf invert_effect umgeschaltet
+        right_batch = self._right_batch
+        co = right_batch.co
+        vec_left_initial = right_batch.handle_left_vec
+        length_left_initial = np.hypot(vec_left_initial[:, 0], vec_left_initial[:, 1])
+
+        # Standard: Länge verringert sich mit positivem delta_x, invertiert mit negativem
+        adjustment_x = delta_x if self.invert_effect else -delta_x
+        new_length_left = np.maximum(length_left_initial + adjustment_x * keyframe_x_distance * 0.005, min_length)
+
+        has_length = length_left_initial > 1e-6
+        direction_x = np.divide(vec_left_initial[:, 0], length_left_initial, out=-np.ones_like(length_left_initial), where=has_length)
+        new_x_left = np.minimum(np.maximum(co[:, 0] + direction_x * new_length_left, self._partner_x_right), co[:, 0])
+
+        has_slope = np.abs(vec_left_initial[:, 0]) > 1e-6
+        slope = np.divide(vec_left_initial[:, 1], vec_left_initial[:, 0], out=np.zeros_like(length_left_initial), where=has_slope)
+        handle_left = np.column_stack((new_x_left, co[:, 1] + slope * (new_x_left - co[:, 0])))
+        right_batch.write_handles(left=handle_left)
+
+    def wheel(self, context, event):
+        self.invert_effect = not self.invert_effect
+        # Setze die Initialmausposition zurück, um ein Springen zu verhindern
+        self.initial_mouse_x = event.mouse_x
+        self.report({'INFO'}, "EXTRUDE" if self.invert_effect else "SLIDE")
 
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
 
-            context.window.cursor_set('DEFAULT')
-            return {'FINISHED'}
-        
-        elif event.type == 'RIGHTMOUSE' or event.type == 'ESC':
-            for (data_path, keyframe_index, array_index), initial_vectors in self.initial_handle_vectors.items():
-                fcurve = None
-                for fc in context.active_object.animation_data.action.fcurves:
-                    if fc.data_path == data_path and fc.array_index == array_index:
-                        fcurve = fc
-                        break
-                
-                if not fcurve or keyframe_index >= len(fcurve.keyframe_points):
-                    continue
-                
-                keyframe = fcurve.keyframe_points[keyframe_index]
-                initial_types = self.initial_handle_types[(data_path, keyframe_index, array_index)]
-                
-                keyframe.handle_left[0] = keyframe.co[0] + initial_vectors['left'][0]
-                keyframe.handle_left[1] = keyframe.co[1] + initial_vectors['left'][1]
-                keyframe.handle_right[0] = keyframe.co[0] + initial_vectors['right'][0]
-                keyframe.handle_right[1] = keyframe.co[1] + initial_vectors['right'][1]
-                
-                keyframe.handle_left_type = initial_types['left']
-                keyframe.handle_right_type = initial_types['right']
-            
-            context.scene.frame_start = self._initial_frame_start
-            context.scene.frame_end = self._initial_frame_end
-            
-            context.window.cursor_set('DEFAULT')
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-            return {'CANCELLED'}
+class OBJECT_OT_randomize_handle_extrusion(KeyframeRandomizeOperator, bpy.types.Operator):
+    bl_idname = "object.randomize_handle_extrusion"
+    bl_label = "Randomize Handle Extrusion"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_description = "Mousewheel for seed. Randomize handle extrusion"
 
-        return {'RUNNING_MODAL'}
-    
-    def invoke(self, context, event):
-        if not context.selected_visible_fcurves or not [kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]:
-            self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
-            return {'CANCELLED'}
-        
-        self._initial_frame_start = context.scene.frame_start
-        self._initial_frame_end = context.scene.frame_end
-        
-        if not context.scene.keep_framerange and context.screen.is_animation_playing:
-            set_timeline_range_to_selected(context)
-        
-        if context.screen.is_animation_playing:
-            context.scene.frame_current = context.scene.frame_start
-        
-        self.initial_mouse_x = event.mouse_x
-        self.initial_handle_vectors.clear()
-        self.initial_handle_types.clear()
-        self._current_strength = 0.0
-        self._current_seed = 0
+    session_attributes = ('_selection', '_polar', '_random_draws')
+    _polar = None
 
-        selected_keyframes_found = False
-        for fcurve in context.selected_visible_fcurves:
-            for keyframe_index, keyframe in enumerate(fcurve.keyframe_points):
-                if keyframe.select_control_point:
-                    selected_keyframes_found = True
-                    key = (fcurve.data_path, keyframe_index, fcurve.array_index)
-                    
-                    self.initial_handle_types[key] = {
-                        'left': keyframe.handle_left_type,
-                        'right': keyframe.handle_right_type
-                    }
-                    self.initial_handle_vectors[key] = {
-                        'left': (keyframe.handle_left[0] - keyframe.co[0], keyframe.handle_left[1] - keyframe.co[1]),
-                        'right': (keyframe.handle_right[0] - keyframe.co[0], keyframe.handle_right[1] - keyframe.co[1]),
-                    }
-
-        if not selected_keyframes_found:
+    def prepare(self, context, snapshots):
+        entries = selected_keyframes(snapshots)
+        if not entries:
             self.report({'WARNING'}, "Keine Keyframes in den aktiven, sichtbaren Kurven ausgewählt.")
-            return {'CANCELLED'}
-        
-        context.window.cursor_set('SCROLL_X')
-        context.window_manager.modal_handler_add(self)
-        return {'RUNNING_MODAL'}
+            return None
+
+        self._selection = select_keyframes(entries)
+        self._polar = HandlePolar(self._selection)
+        self._random_draws = RandomDraws(self._selection)
+        return (self._selection,)
+
+    def randomize(self, context):
+        # Zufallsfaktor pro Knochen oder pro Kanal, je nach Eigenschaft
+        selection = self._selection
+        random_factors = self._current_strength * self._random_draws.unit(
+            self._current_seed, context.scene.use_bone_randomization)
+
+        # Länge entlang der ursprünglichen Richtung skalieren; Handles ohne Länge bleiben auf dem Key
+        polar = self._polar
+        scale = 1.0 + random_factors
+        selection.write_handles(selection.co + polar.left_unit * (polar.left_length * scale)[:, None],
+                                selection.co + polar.right_unit * (polar.right_length * scale)[:, None])
 
 
 class OBJECT_OT_move_keys_to_cursor(bpy.types.Operator):
@@ -3795,9 +2689,11 @@ class OBJECT_OT_move_keys_to_cursor(bpy.types.Operator):
                 context.active_object.animation_data and
                 context.active_object.animation_data.action and
                 context.selected_visible_fcurves and
-                len([kf for fc in context.selected_visible_fcurves for kf in fc.keyframe_points if kf.select_control_point]) > 0)
+                selection_summary(context).has_selected_keys)
 
+    @timed_execute
     def execute(self, context):
+        navigation_undo.flush()
         
         selected_keyframes = []
         for fcurve in context.selected_visible_fcurves:
@@ -3943,6 +2839,73 @@ class GRAPH_PT_sub_options2(bpy.types.Panel):
         row = col.row(align=True)
         row.prop(scene, "additional_preframes", text="Preframes")
         row.prop(scene, "additional_postframes", text="Postframes")
+
+        row = col.row(align=True)
+        row.prop(scene, "coalesce_navigation_undo", toggle=True, text="Merge Nav Undo", icon='LOOP_BACK')
+        row.prop(scene, "navigation_undo_delay", text="Delay")
+
+        row = col.row(align=True)
+        row.prop(scene, "modal_tick_budget", text="Tick Budget (ms)")
+        row.prop(scene, "background_redraw_rate", text="Other Views (Hz)")
+
+        row = col.row(align=True)
+        row.prop(scene, "preview_visible_keys", toggle=True, text="Cull Preview", icon='HIDE_OFF')
+        row.prop(scene, "progressive_preview_keys", text="Progressive Above")
+
+
+class GRAPH_OT_clear_operator_timings(bpy.types.Operator):
+    """Clear the recorded operator timings"""
+    bl_idname = "graph.clear_operator_timings"
+    bl_label = "Clear Timings"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        operator_timings.clear()
+        for area in context.screen.areas:
+            if area.type == 'GRAPH_EDITOR':
+                area.tag_redraw()
+        return {'FINISHED'}
+
+
+class GRAPH_PT_sub_performance(bpy.types.Panel):
+    bl_label = "Performance"
+    bl_idname = "GRAPH_PT_sub_options_performance"  # Eindeutige ID
+    bl_parent_id = "GRAPH_PT_handle_manipulator"
+    bl_space_type = 'GRAPH_EDITOR'
+    bl_region_type = 'UI'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        row = layout.row(align=True)
+        row.prop(scene, "record_operator_timings", toggle=True, text="Record Timings", icon='SORTTIME')
+        row.operator(GRAPH_OT_clear_operator_timings.bl_idname, text="", icon='TRASH')
+
+        col = layout.column(align=True)
+        row = col.row(align=True)
+        row.prop(scene, "profile_next_session", toggle=True, text="Profile Next Drag", icon='REC')
+        row.prop(scene, "profile_top_allocations", text="Top")
+        col.prop(scene, "profile_output_dir", text="")
+
+        if not operator_timings:
+            layout.label(text="No timings recorded")
+            return
+
+        # Pro Operator: letzte, mittlere und p95-Dauer jeder Phase in ms
+        for bl_idname, phases in operator_timings.items():
+            box = layout.box()
+            box.label(text=bl_idname)
+            col = box.column(align=True)
+            row = col.row(align=True)
+            for header in ("Phase", "Last", "Avg", "P95"):
+                row.label(text=header)
+            for phase, samples in phases.items():
+                row = col.row(align=True)
+                row.label(text=phase)
+                for value in timing_summary(samples):
+                    row.label(text=f"{value:.2f} ms")
         
         
         
@@ -4026,6 +2989,8 @@ class GRAPH_PT_handle_manipulator(bpy.types.Panel):
     bl_category = "Tools"
 
     def draw(self, context):
+        # Die Button-Polls dieses Redraws (auch der Unterpanels) teilen sich eine neu gelesene SelectionSummary
+        invalidate_selection_summary()
         layout = self.layout
         scene = context.scene 
         button_height_scale = 1.4
@@ -4090,6 +3055,8 @@ def register():
     bpy.utils.register_class(OBJECT_OT_toggle_bones_isolation)
     bpy.utils.register_class(GRAPH_PT_sub_options2)
     bpy.utils.register_class(GRAPH_PT_sub_options1)
+    bpy.utils.register_class(GRAPH_OT_clear_operator_timings)
+    bpy.utils.register_class(GRAPH_PT_sub_performance)
     #bpy.utils.register_class(GRAPH_PT_sub_options3)
     #bpy.utils.register_class(GRAPH_PT_sub_options4)
     #bpy.utils.register_class(GRAPH_PT_sub_options5)
@@ -4126,6 +3093,10 @@ def register():
         description="Frames after last selection"
     )
     
+    # Poll-Cache bei Änderungen an Auswahl und Keyframes verwerfen
+    bpy.app.handlers.depsgraph_update_post.append(_selection_summary_depsgraph_handler)
+    for handler_list, handler in NAVIGATION_UNDO_HANDLERS:
+        getattr(bpy.app.handlers, handler_list).append(handler)
     
     kc = bpy.context.window_manager.keyconfigs.addon
     if kc:
@@ -4197,6 +3168,8 @@ def unregister():
     bpy.utils.unregister_class(OBJECT_OT_toggle_bones_isolation)
     bpy.utils.unregister_class(GRAPH_PT_sub_options1)
     bpy.utils.unregister_class(GRAPH_PT_sub_options2)
+    bpy.utils.unregister_class(GRAPH_PT_sub_performance)
+    bpy.utils.unregister_class(GRAPH_OT_clear_operator_timings)
     #bpy.utils.unregister_class(GRAPH_PT_sub_options3)
     #bpy.utils.unregister_class(GRAPH_PT_sub_options4)
     #bpy.utils.unregister_class(GRAPH_PT_sub_options5)
@@ -4213,6 +3186,15 @@ def unregister():
     del bpy.types.Scene.filter_y
     del bpy.types.Scene.filter_z
     
+    if _selection_summary_depsgraph_handler in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_selection_summary_depsgraph_handler)
+    invalidate_selection_summary()
+    navigation_undo.flush()
+    for handler_list, handler in NAVIGATION_UNDO_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_list)
+        if handler in handlers:
+            handlers.remove(handler)
+    
     for km in addon_keymaps:
         bpy.context.window_manager.keyconfigs.addon.keymaps.remove(km)
     
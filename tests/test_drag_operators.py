@@ -0,0 +1,115 @@
+"""Drag operators on the bpy stand-in: ESC restores the curves, confirm only changes what it should.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+sys.path.insert(0, ROOT)
+
+from synthetic import BenchContext, build_action  # noqa: E402
+from replay import replay, scripted_drag  # noqa: E402
+from bench_operators import drag_operators  # noqa: E402
+
+import handle_manipulator  # noqa: E402
+
+# Keyframe-Attribut -> (dtype, Breite) für foreach_get
+KEYFRAME_ATTRIBUTES = {
+    'co': (np.float32, 2),
+    'handle_left': (np.float32, 2),
+    'handle_right': (np.float32, 2),
+    'handle_left_type': (np.int32, 1),
+    'handle_right_type': (np.int32, 1),
+    'interpolation': (np.int32, 1),
+    'select_control_point': (np.bool_, 1),
+}
+POSITIONS = ('co', 'handle_left', 'handle_right')
+
+DRAG_OPERATORS = drag_operators()
+
+
+def capture(obj):
+    """Alle Keyframe-Attribute jeder F-Curve, {(curve, attribute): array}."""
+    arrays = {}
+    for curve, fcurve in enumerate(obj.animation_data.action.fcurves):
+        points = fcurve.keyframe_points
+        for attribute, (dtype, width) in KEYFRAME_ATTRIBUTES.items():
+            values = np.empty(len(points) * width, dtype=dtype)
+            points.foreach_get(attribute, values)
+            arrays[curve, attribute] = values.reshape(-1, width) if width > 1 else values
+    return arrays
+
+
+def drag_and_back(ticks=20, step=5, start=(800, 500)):
+    """Drag ``ticks`` moves to the right and the same way back, then confirm at the start position."""
+    events = scripted_drag(ticks, step, start=start)[:-1]
+    return events + scripted_drag(ticks, -step, start=(start[0] + ticks * step, start[1]))[1:]
+
+
+@pytest.fixture
+def action_object():
+    return build_action(bones=2, channels=3, keys=40, selected=6, seed=1)
+
+
+@pytest.mark.parametrize('operator_class', DRAG_OPERATORS, ids=lambda operator_class: operator_class.__name__)
+@pytest.mark.parametrize('playing', [False, True], ids=['stopped', 'playing'])
+def test_cancel_restores_curves(action_object, operator_class, playing):
+    context = BenchContext(action_object)
+    context.screen.is_animation_playing = playing
+    frame_range = (context.scene.frame_start, context.scene.frame_end)
+    before = capture(action_object)
+
+    result = replay(operator_class, context, scripted_drag(20, 5, wheel_every=7, finish='cancel'))
+
+    assert result.result == {'CANCELLED'}
+    after = capture(action_object)
+    for key, values in before.items():
+        np.testing.assert_array_equal(after[key], values, err_msg=f"{key}")
+    assert (context.scene.frame_start, context.scene.frame_end) == frame_range
+
+
+@pytest.mark.parametrize('operator_class', DRAG_OPERATORS, ids=lambda operator_class: operator_class.__name__)
+def test_confirm_leaves_unselected_keys(action_object, operator_class):
+    context = BenchContext(action_object)
+    before = capture(action_object)
+
+    result = replay(operator_class, context, scripted_drag(20, 5, wheel_every=7))
+
+    assert result.result == {'FINISHED'}
+    after = capture(action_object)
+    for curve in range(len(action_object.animation_data.action.fcurves)):
+        selected = before[curve, 'select_control_point']
+        unselected = ~selected
+        following = np.zeros_like(selected)
+        if operator_class is handle_manipulator.GRAPH_OT_scale_keyframes_x:
+            # Die Keys nach der Auswahl wandern alle um dieselbe Verschiebung auf X mit
+            frames = before[curve, 'co'][:, 0]
+            following = unselected & (frames > frames[selected].max())
+            unselected &= ~following
+        for attribute in POSITIONS:
+            np.testing.assert_array_equal(after[curve, attribute][unselected], before[curve, attribute][unselected],
+                                          err_msg=f"{attribute} of unselected keys on curve {curve}")
+            moved = after[curve, attribute][following] - before[curve, attribute][following]
+            if len(moved):
+                assert np.all(moved[:, 1] == 0.0)
+                np.testing.assert_allclose(moved[:, 0], moved[0, 0], atol=1e-4)
+    assert any(not np.array_equal(after[key], values) for key, values in before.items())
+
+
+@pytest.mark.parametrize('operator_class', DRAG_OPERATORS, ids=lambda operator_class: operator_class.__name__)
+def test_confirm_at_start_keeps_positions(action_object, operator_class):
+    context = BenchContext(action_object)
+    before = capture(action_object)
+
+    result = replay(operator_class, context, drag_and_back())
+
+    assert result.result == {'FINISHED'}
+    after = capture(action_object)
+    for key, values in before.items():
+        if key[1] in POSITIONS:
+            np.testing.assert_allclose(after[key], values, atol=1e-4, err_msg=f"{key}")
@@ -0,0 +1,153 @@
+"""Helpers of the drag operators: seeded random draws and MOUSEMOVE coalescing.
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+sys.path.insert(0, ROOT)
+
+from synthetic import BenchContext, BenchEvent, build_action  # noqa: E402
+
+import handle_manipulator  # noqa: E402
+
+DATA_PATHS = ['pose.bones["Arm"].location', 'pose.bones["Arm"].location', 'pose.bones["Leg"].scale',
+              'location', 'pose.bones["Arm"].scale', 'pose.bones["Leg"].location']
+
+
+class _Selection:
+    def __init__(self, data_paths):
+        self._data_paths = data_paths
+
+    def data_paths(self):
+        return list(self._data_paths)
+
+
+def reference_offsets(seed, strength, per_bone, bone_paths_only=False):
+    """Offsets wie vor RandomDraws: random.seed und uniform(-strength, strength) je Zeile bzw. Knochen."""
+    random.seed(seed)
+    bone_offsets = {}
+    offsets = []
+    for data_path in DATA_PATHS:
+        if not per_bone:
+            offsets.append(random.uniform(-strength, strength))
+        elif bone_paths_only and not data_path.startswith('pose.bones['):
+            offsets.append(0.0)
+        else:
+            bone_name = handle_manipulator._bone_name(data_path)
+            if bone_name not in bone_offsets:
+                bone_offsets[bone_name] = random.uniform(-strength, strength)
+            offsets.append(bone_offsets[bone_name])
+    return np.array(offsets)
+
+
+@pytest.mark.parametrize('per_bone', [False, True], ids=['per-channel', 'per-bone'])
+@pytest.mark.parametrize('bone_paths_only', [False, True])
+@pytest.mark.parametrize('strength', [0.0, 0.25, 1.0, 3.5])
+def test_random_draws_scale_to_reference(per_bone, bone_paths_only, strength):
+    draws = handle_manipulator.RandomDraws(_Selection(DATA_PATHS), bone_paths_only=bone_paths_only)
+    for seed in (0, 7, 12345):
+        np.testing.assert_allclose(strength * draws.unit(seed, per_bone),
+                                   reference_offsets(seed, strength, per_bone, bone_paths_only), atol=1e-12)
+
+
+def test_random_draws_least_recently_used_seed_is_evicted():
+    draws = handle_manipulator.RandomDraws(_Selection(DATA_PATHS), maxsize=2)
+    first = draws.unit(1)
+    second = draws.unit(2)
+    assert draws.unit(1) is first
+
+    # Seed 2 ist am längsten unbenutzt und fliegt zuerst raus
+    draws.unit(3)
+    assert draws.unit(1) is first
+    recomputed = draws.unit(2)
+    assert recomputed is not second
+    np.testing.assert_array_equal(recomputed, second)
+
+
+class _Recorder:
+    """Zieh-Operator, der nur die Events mitschreibt, die modal() erreichen."""
+
+    def __init__(self):
+        self.events = []
+
+    @handle_manipulator.coalesce_mousemove
+    def modal(self, context, event):
+        self.events.append((event.type, event.mouse_x))
+        if event.type == 'LEFTMOUSE':
+            return {'FINISHED'}
+        if event.type in {'RIGHTMOUSE', 'ESC'}:
+            return {'CANCELLED'}
+        return {'RUNNING_MODAL'}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Steuerbare perf_counter-Zeit in Sekunden."""
+    now = [100.0]
+    monkeypatch.setattr(handle_manipulator.time, 'perf_counter', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def context(monkeypatch):
+    context = BenchContext(build_action(bones=1, channels=1, keys=4, selected=1))
+    monkeypatch.setattr(context.scene, 'modal_tick_budget', 10.0)
+    return context
+
+
+def moves(*positions):
+    return [BenchEvent('MOUSEMOVE', mouse_x=x) for x in positions]
+
+
+def test_first_move_runs_at_once_later_moves_wait_for_timer(context, clock):
+    operator = _Recorder()
+    for event in moves(10, 20, 30):
+        assert operator.modal(context, event) == {'RUNNING_MODAL'}
+    assert operator.events == [('MOUSEMOVE', 10)]
+
+    # Nur die letzte zurückgestellte Bewegung wird nachgeholt
+    clock[0] += 0.011
+    operator.modal(context, BenchEvent('TIMER'))
+    assert operator.events == [('MOUSEMOVE', 10), ('MOUSEMOVE', 30)]
+
+    clock[0] += 0.011
+    operator.modal(context, moves(40)[0])
+    assert operator.events[-1] == ('MOUSEMOVE', 40)
+
+
+def test_confirm_applies_pending_move_first(context, clock):
+    operator = _Recorder()
+    for event in moves(10, 20, 30):
+        operator.modal(context, event)
+
+    assert operator.modal(context, BenchEvent('LEFTMOUSE', 'PRESS', mouse_x=30)) == {'FINISHED'}
+    # Dieselbe Endposition wie ohne Bündelung
+    assert operator.events == [('MOUSEMOVE', 10), ('MOUSEMOVE', 30), ('LEFTMOUSE', 30)]
+    assert operator._scheduler is None
+
+
+@pytest.mark.parametrize('cancel', ['ESC', 'RIGHTMOUSE'])
+def test_cancel_drops_pending_move(context, clock, cancel):
+    operator = _Recorder()
+    for event in moves(10, 20):
+        operator.modal(context, event)
+
+    assert operator.modal(context, BenchEvent(cancel, 'PRESS', mouse_x=20)) == {'CANCELLED'}
+    assert operator.events == [('MOUSEMOVE', 10), (cancel, 20)]
+    assert operator._scheduler is None
+
+
+def test_moves_after_budget_run_at_once(context, clock):
+    operator = _Recorder()
+    for event in moves(10, 20, 30):
+        operator.modal(context, event)
+        clock[0] += 0.011
+    assert operator.events == [('MOUSEMOVE', 10), ('MOUSEMOVE', 20), ('MOUSEMOVE', 30)]
+    assert operator._scheduler.pending is None
@@ -0,0 +1,298 @@
+"""Key navigation: multi-steps and to-cursor against repeated single steps, timeline range, merged undo steps.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+sys.path.insert(0, ROOT)
+
+from synthetic import BenchContext, bpy, operator_proxy  # noqa: E402
+import fake_bpy  # noqa: E402
+
+import handle_manipulator  # noqa: E402
+
+SELECT_ATTRIBUTES = ('select_control_point', 'select_left_handle', 'select_right_handle')
+
+# (Frames, Indizes der ausgewählten Keys, Kanal ausgewählt) je F-Curve
+CURVES = [
+    ([0, 2, 4, 6, 8, 10, 12, 14], [2, 3], True),
+    # Läuft nach einem Schritt in beide Richtungen aus Keys, der Nachbar-Key liegt weit weg
+    ([0, 50], [0], True),
+    ([50, 60, 100], [1], True),
+    # Unsortiert, mehrere Keys auf einem Frame
+    ([6, 2, 2, 10, 4, 8, 8, 0], [4], True),
+    ([6, 2, 2, 10, 4, 8, 8, 0], [0, 3], True),
+    # Ohne Auswahl: der letzte bzw. erste Key wird ausgewählt
+    ([3, 9, 1], [], True),
+    ([], [], True),
+    # Kanal nicht ausgewählt: bleibt unberührt
+    ([0, 1, 2, 3], [1], False),
+]
+
+
+def navigation_object(curves=CURVES):
+    action = bpy.data.actions.new("Navigation")
+    for index, (frames, selected, channel_selected) in enumerate(curves):
+        fcurve = action.fcurves.new('location', index=index)
+        fcurve.select = channel_selected
+        points = fcurve.keyframe_points
+        points.add(len(frames))
+        points.foreach_set('co', np.column_stack((frames, np.zeros(len(frames)))).astype(np.float32).ravel())
+        select = np.zeros(len(frames), dtype=bool)
+        select[selected] = True
+        for attribute in SELECT_ATTRIBUTES:
+            points.foreach_set(attribute, select)
+    obj = bpy.data.objects.new("Navigation", None)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.animation_data_create().action = action
+    return obj
+
+
+def capture_selection(obj):
+    return [[tuple(getattr(key, attribute) for attribute in SELECT_ATTRIBUTES) for key in fcurve.keyframe_points]
+            for fcurve in obj.animation_data.action.fcurves]
+
+
+def _select(key, state):
+    for attribute in SELECT_ATTRIBUTES:
+        setattr(key, attribute, state)
+
+
+def reference_curve_step(fcurve, forward):
+    """Ein Einzelschritt auf einer F-Curve wie vor CurveFrameIndex, Frame des neuen Keys oder None."""
+    keys = list(fcurve.keyframe_points)
+    selected = [key for key in keys if key.select_control_point]
+    if not selected:
+        if not keys:
+            return None
+        key = (max if forward else min)(keys, key=lambda key: key.co[0])
+        _select(key, True)
+        return key.co[0]
+
+    min_frame = min(key.co[0] for key in selected)
+    max_frame = max(key.co[0] for key in selected)
+    new_key = None
+    for key in keys:
+        if forward and key.co[0] > max_frame and (new_key is None or key.co[0] < new_key.co[0]):
+            new_key = key
+        elif not forward and key.co[0] < min_frame and (new_key is None or key.co[0] > new_key.co[0]):
+            new_key = key
+    if new_key is None:
+        return None
+    dropped_frame = min_frame if forward else max_frame
+    _select(next(key for key in selected if key.co[0] == dropped_frame), False)
+    _select(new_key, True)
+    return new_key.co[0]
+
+
+def reference_step(obj, scene, forward):
+    """select_next_keys / select_previous_keys mit einem Schritt wie vor CurveFrameIndex."""
+    new_frames = [frame for frame in (reference_curve_step(fcurve, forward)
+                                      for fcurve in obj.animation_data.action.fcurves if fcurve.select)
+                  if frame is not None]
+    if new_frames:
+        scene.frame_current = int(max(new_frames) if forward else min(new_frames))
+
+
+def navigation_operator(forward, **properties):
+    operator_class = (handle_manipulator.GRAPH_OT_select_next_keys if forward
+                      else handle_manipulator.GRAPH_OT_select_previous_keys)
+    operator = operator_proxy(operator_class)()
+    for name, value in properties.items():
+        setattr(operator, name, value)
+    return operator
+
+
+@pytest.fixture
+def scene(monkeypatch):
+    scene = bpy.context.scene
+    monkeypatch.setattr(scene, 'frame_current', 7)
+    monkeypatch.setattr(scene, 'keep_framerange', False)
+    monkeypatch.setattr(scene, 'coalesce_navigation_undo', False)
+    yield scene
+    handle_manipulator.navigation_undo.cancel()
+
+
+@pytest.mark.parametrize('forward', [True, False], ids=['next', 'previous'])
+@pytest.mark.parametrize('steps', [1, 2, 3, 7])
+def test_steps_match_single_steps(scene, forward, steps):
+    expected_object = navigation_object()
+    for _ in range(steps):
+        reference_step(expected_object, scene, forward)
+    expected_frame = scene.frame_current
+
+    scene.frame_current = 7
+    obj = navigation_object()
+    result = navigation_operator(forward, steps=steps).execute(BenchContext(obj))
+
+    assert result == {'FINISHED'}
+    assert capture_selection(obj) == capture_selection(expected_object)
+    assert scene.frame_current == expected_frame
+
+
+@pytest.mark.parametrize('forward', [True, False], ids=['next', 'previous'])
+def test_frame_after_curves_run_out_of_keys(scene, forward):
+    # Die zweite Kurve kommt nur einen Schritt weit, ihr Key auf 50 darf den Frame nicht bestimmen
+    curves = [([0, 2, 4, 6, 8], [0] if forward else [4], True),
+              ([0, 50] if forward else [-50, 8], [0] if forward else [1], True)]
+    obj = navigation_object(curves)
+
+    navigation_operator(forward, steps=3).execute(BenchContext(obj))
+
+    assert scene.frame_current == (6 if forward else 2)
+
+
+@pytest.mark.parametrize('forward', [True, False], ids=['next', 'previous'])
+@pytest.mark.parametrize('cursor', [-5, 3, 7, 9, 100])
+def test_to_cursor_matches_single_steps_per_curve(scene, forward, cursor):
+    expected_object = navigation_object()
+    for fcurve in expected_object.animation_data.action.fcurves:
+        if not fcurve.select:
+            continue
+        frames = {key.co[0] for key in fcurve.keyframe_points}
+        selected = [key.co[0] for key in fcurve.keyframe_points if key.select_control_point]
+        # Einzelschritte, bis der vorderste ausgewählte Key der letzte vor bzw. erste nach dem Cursor ist
+        if not selected:
+            steps = 1
+        elif forward:
+            steps = len([frame for frame in frames if max(selected) < frame <= cursor])
+        else:
+            steps = len([frame for frame in frames if cursor <= frame < min(selected)])
+        for _ in range(steps):
+            reference_curve_step(fcurve, forward)
+
+    scene.frame_current = cursor
+    obj = navigation_object()
+    navigation_operator(forward, to_cursor=True).execute(BenchContext(obj))
+
+    assert capture_selection(obj) == capture_selection(expected_object)
+
+
+def reference_timeline_range(fcurves):
+    """Timeline-Bereich ohne Vor- und Nachlauf wie im alten set_timeline_range_to_selected."""
+    selected_frames = [key.co[0] for fcurve in fcurves for key in fcurve.keyframe_points if key.select_control_point]
+    if not selected_frames:
+        return None
+    start, end = min(selected_frames), max(selected_frames)
+    if any(len([key for key in fcurve.keyframe_points if key.select_control_point]) > 1 for fcurve in fcurves):
+        return start, end
+    visible_frames = sorted({key.co[0] for fcurve in fcurves for key in fcurve.keyframe_points})
+    start_index, end_index = visible_frames.index(start), visible_frames.index(end)
+    return (visible_frames[start_index - 1] if start_index > 0 else start,
+            visible_frames[end_index + 1] if end_index < len(visible_frames) - 1 else end)
+
+
+@pytest.mark.parametrize('curves', [
+    CURVES,
+    [([0, 10, 20], [1], True), ([5, 15, 25], [1], True), ([12], [], True)],
+    [([0, 10, 20], [0], True), ([20, 30], [1], True)],
+    [([0, 10], [], True)],
+], ids=['multi-key', 'single-keys', 'at-ends', 'unselected'])
+def test_timeline_range_matches_reference(curves):
+    fcurves = list(navigation_object(curves).animation_data.action.fcurves)
+    expected = reference_timeline_range(fcurves)
+
+    from_curves = handle_manipulator.TimelineFrameIndex(handle_manipulator.CurveFrameIndex(fcurve) for fcurve in fcurves)
+    from_snapshots = handle_manipulator.TimelineFrameIndex.from_snapshots(handle_manipulator.snapshot_curves(fcurves))
+
+    assert from_curves.timeline_range() == expected
+    assert from_snapshots.timeline_range() == expected
+
+
+@pytest.fixture
+def undo_session(monkeypatch, scene):
+    """Interaktive Sitzung: Fenster und Screen im Kontext, ed.undo_push nimmt Schritte auf."""
+    monkeypatch.setattr(bpy.app, 'background', False)
+    monkeypatch.setattr(bpy.context, 'window', object())
+    monkeypatch.setattr(bpy.context, 'screen', object())
+    monkeypatch.setattr(fake_bpy, 'undo_pushes', [])
+    monkeypatch.setattr(scene, 'coalesce_navigation_undo', True)
+    monkeypatch.setattr(scene, 'navigation_undo_delay', 0.5)
+    return BenchContext(navigation_object())
+
+
+def run_timers():
+    bpy.app.timers.process(time.monotonic() + 10.0)
+
+
+def test_undo_burst_is_one_step(undo_session):
+    navigation_undo = handle_manipulator.navigation_undo
+    for _ in range(3):
+        navigation_undo.push(undo_session, "Next")
+    assert fake_bpy.undo_pushes == []
+
+    run_timers()
+    assert fake_bpy.undo_pushes == ["Next"]
+    assert not navigation_undo.pending
+
+
+def test_undo_burst_of_mixed_operators(undo_session):
+    handle_manipulator.navigation_undo.push(undo_session, "Next")
+    handle_manipulator.navigation_undo.push(undo_session, "Previous")
+    handle_manipulator.navigation_undo.flush()
+    assert fake_bpy.undo_pushes == ["Key Navigation"]
+
+
+def test_undo_without_coalescing(undo_session):
+    undo_session.scene.coalesce_navigation_undo = False
+    handle_manipulator.navigation_undo.push(undo_session, "Next")
+    handle_manipulator.navigation_undo.push(undo_session, "Next")
+    assert fake_bpy.undo_pushes == ["Next", "Next"]
+
+
+def test_undo_flush_and_cancel(undo_session):
+    navigation_undo = handle_manipulator.navigation_undo
+    navigation_undo.push(undo_session, "Next")
+    navigation_undo.flush()
+    navigation_undo.flush()
+    assert fake_bpy.undo_pushes == ["Next"]
+
+    navigation_undo.push(undo_session, "Next")
+    navigation_undo.cancel()
+    run_timers()
+    assert fake_bpy.undo_pushes == ["Next"]
+
+
+@pytest.mark.parametrize('handler', ['_navigation_flush_handler', '_navigation_cancel_handler'],
+                         ids=['undo', 'load'])
+def test_undo_pending_step_on_undo_and_load(undo_session, handler):
+    handle_manipulator.navigation_undo.push(undo_session, "Next")
+    getattr(handle_manipulator, handler)(undo_session.scene)
+    run_timers()
+    # Vor Strg+Z wird der ausstehende Schritt gesetzt, beim Laden verworfen
+    assert fake_bpy.undo_pushes == (["Next"] if handler == '_navigation_flush_handler' else [])
+
+
+def test_undo_pushed_before_other_changes(undo_session):
+    navigation_operator(True).execute(undo_session)
+    assert undo_session.scene.frame_current != 7
+
+    # Das Depsgraph-Update des eigenen Framewechsels setzt keinen Schritt, das nächste schon
+    handle_manipulator._navigation_depsgraph_handler(undo_session.scene)
+    assert fake_bpy.undo_pushes == []
+    handle_manipulator._navigation_frame_change_handler(undo_session.scene)
+    handle_manipulator._navigation_depsgraph_handler(undo_session.scene)
+    assert fake_bpy.undo_pushes == [handle_manipulator.GRAPH_OT_select_next_keys.bl_label]
+
+
+@pytest.mark.parametrize('coalesce', [False, True], ids=['direct', 'merged'])
+def test_undo_skipped_without_window(undo_session, monkeypatch, coalesce):
+    undo_session.scene.coalesce_navigation_undo = coalesce
+    undo_session.window = None
+    monkeypatch.setattr(bpy.context, 'window', None)
+    handle_manipulator.navigation_undo.push(undo_session, "Next")
+    run_timers()
+    assert fake_bpy.undo_pushes == []
+
+    monkeypatch.setattr(bpy.app, 'background', True)
+    monkeypatch.setattr(bpy.context, 'window', object())
+    handle_manipulator.navigation_undo.push(undo_session, "Next")
+    run_timers()
+    assert fake_bpy.undo_pushes == []
@@ -0,0 +1,83 @@
+"""Poll cache: sidebar polls of one redraw read the key selection once, keymap polls every time."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+sys.path.insert(0, ROOT)
+
+from synthetic import BenchContext, build_action  # noqa: E402
+
+import handle_manipulator  # noqa: E402
+
+CURVES = 6
+POLLED_OPERATORS = [
+    handle_manipulator.GRAPH_OT_add_next_keys,
+    handle_manipulator.GRAPH_OT_subtract_keys,
+    handle_manipulator.OBJECT_OT_move_keys_to_cursor,
+    handle_manipulator.OBJECT_OT_rotate_keys,
+    handle_manipulator.OBJECT_OT_manipulate_right_handles,
+]
+
+
+@pytest.fixture
+def context():
+    handle_manipulator.invalidate_selection_summary()
+    return BenchContext(build_action(bones=2, channels=3, keys=20, selected=4))
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Zählt die foreach_get-Aufrufe für select_control_point."""
+    calls = []
+    read = handle_manipulator._read_keyframe_attribute
+
+    def counting_read(keyframe_points, attribute, *args, **kwargs):
+        if attribute == 'select_control_point':
+            calls.append(attribute)
+        return read(keyframe_points, attribute, *args, **kwargs)
+
+    monkeypatch.setattr(handle_manipulator, '_read_keyframe_attribute', counting_read)
+    return calls
+
+
+def poll_all(context, repeat=3):
+    return [operator_class.poll(context) for _ in range(repeat) for operator_class in POLLED_OPERATORS]
+
+
+def test_sidebar_polls_of_one_redraw_read_once(context, reads):
+    context.region = context.area.regions[0]
+    handle_manipulator.invalidate_selection_summary()  # Anfang von GRAPH_PT_handle_manipulator.draw()
+
+    assert all(poll_all(context))
+    # Einmal die sichtbaren F-Curves, einmal alle F-Curves der Auswahl
+    assert len(reads) == 2 * CURVES
+
+
+def test_next_redraw_reads_again(context, reads):
+    context.region = context.area.regions[0]
+    handle_manipulator.invalidate_selection_summary()
+    poll_all(context)
+    handle_manipulator.invalidate_selection_summary()
+    poll_all(context)
+    assert len(reads) == 4 * CURVES
+
+
+def test_keymap_polls_read_every_time(context, reads):
+    assert context.region.type == 'WINDOW'
+    poll_all(context, repeat=2)
+    assert len(reads) == 2 * len(POLLED_OPERATORS) * CURVES
+
+
+def test_keymap_poll_sees_click_select_without_redraw(context):
+    context.region = context.area.regions[0]
+    handle_manipulator.invalidate_selection_summary()
+    assert handle_manipulator.GRAPH_OT_subtract_keys.poll(context)
+
+    # Klick ins Leere im Graph Editor: alles abgewählt, nur ein Notifier, kein Redraw der Sidebar
+    for fcurve in context.selected_visible_fcurves:
+        fcurve.keyframe_points.foreach_set('select_control_point', [False] * len(fcurve.keyframe_points))
+    context.region = context.area.regions[1]
+    assert not handle_manipulator.GRAPH_OT_subtract_keys.poll(context)